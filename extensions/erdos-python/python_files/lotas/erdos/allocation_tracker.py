@@ -0,0 +1,182 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""tracemalloc snapshots around cell executions, summarized by the user-code line that allocated."""
+
+from __future__ import annotations
+
+import linecache
+import os
+import sys
+import sysconfig
+import tracemalloc
+from typing import Any, Dict, Optional, Tuple
+
+# Sites whose retained bytes grew in this many consecutive snapshots are flagged as growing
+GROWTH_STREAK = 3
+
+# Sites smaller than this are not reported
+MIN_SITE_BYTES = 1024
+
+_OTHER_SITE = ("<other>", 0)
+
+
+class AllocationTracker:
+    """
+    Traces allocations with tracemalloc and attributes them to user code.
+    
+    Each allocation is charged to the innermost frame of its traceback that is
+    user code (a cell, or a file outside the standard library, site-packages
+    and Erdos itself), so memory allocated inside a library is reported at the
+    line that called it, as long as that line is within the traced depth (the
+    frames setting); the rest is reported as other_bytes.
+    
+    Snapshots are taken after every snapshot_every-th execution, since one
+    costs time proportional to the number of live allocations. Each report
+    lists the sites retaining the most memory, how much that changed since the
+    previous snapshot, and whether the site has grown for GROWTH_STREAK
+    snapshots in a row.
+    """
+    
+    def __init__(self):
+        self.frames = 4
+        self.snapshot_every = 1
+        self.top_sites = 10
+        
+        self._started_tracing = False
+        self._executions = 0
+        # site -> bytes retained at the last snapshot / consecutive snapshots it grew in
+        self._retained: Dict[Tuple[str, int], int] = {}
+        self._streaks: Dict[Tuple[str, int], int] = {}
+        self._excluded_prefixes = _library_prefixes()
+    
+    @property
+    def active(self) -> bool:
+        return self._started_tracing
+    
+    def start(self, frames: Optional[int] = None) -> None:
+        """Start tracing (restarting it if the traceback depth changes)."""
+        if frames is not None:
+            frames = max(1, min(int(frames), 64))
+            if self._started_tracing and frames != self.frames:
+                self.stop()
+            self.frames = frames
+        if tracemalloc.is_tracing():
+            if not self._started_tracing:
+                # Someone else's trace; share it rather than reset it
+                self.frames = tracemalloc.get_traceback_limit()
+            return
+        tracemalloc.start(self.frames)
+        self._started_tracing = True
+        self._retained.clear()
+        self._streaks.clear()
+    
+    def stop(self) -> None:
+        """Stop tracing, if this tracker started it, and forget the baselines."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self._retained.clear()
+        self._streaks.clear()
+    
+    def before_execution(self) -> None:
+        # reset_peak is new in Python 3.9; before that the peak covers the whole trace
+        if self._started_tracing and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+    
+    def after_execution(self) -> Optional[Dict[str, Any]]:
+        """Return the report for the execution that just finished, or None when not tracing."""
+        if not self._started_tracing or not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        report: Dict[str, Any] = {
+            "traced_bytes": current,
+            "peak_traced_bytes": peak if hasattr(tracemalloc, 'reset_peak') else None,
+            "snapshot": False,
+            "sites": [],
+            "growing": [],
+            "other_bytes": None,
+        }
+        self._executions += 1
+        if self._executions % self.snapshot_every:
+            return report
+        
+        retained = self._retained_by_site()
+        other = retained.pop(_OTHER_SITE, 0)
+        sites = []
+        for site, size in retained.items():
+            delta = size - self._retained.get(site, 0)
+            if site in self._retained and delta > 0:
+                self._streaks[site] = self._streaks.get(site, 0) + 1
+            else:
+                self._streaks.pop(site, None)
+            sites.append((site, size, delta))
+        for site in self._retained.keys() - retained.keys():
+            self._streaks.pop(site, None)
+        self._retained = retained
+        
+        sites.sort(key=lambda item: item[1], reverse=True)
+        report["snapshot"] = True
+        # Memory allocated with no user code on the traced part of the stack
+        report["other_bytes"] = other
+        report["sites"] = [
+            self._format_site(site, size, delta)
+            for site, size, delta in sites[:self.top_sites]
+            if size >= MIN_SITE_BYTES
+        ]
+        # Growing sites are reported even if they are not among the largest yet
+        reported = {(entry["filename"], entry["line"]) for entry in report["sites"]}
+        report["growing"] = [
+            self._format_site(site, size, delta)
+            for site, size, delta in sites
+            if self._streaks.get(site, 0) >= GROWTH_STREAK and site not in reported
+        ]
+        return report
+    
+    def _retained_by_site(self) -> Dict[Tuple[str, int], int]:
+        snapshot = tracemalloc.take_snapshot()
+        
+        retained: Dict[Tuple[str, int], int] = {}
+        user_files: Dict[str, bool] = {}
+        # Grouping by traceback builds one object per distinct stack, not per trace
+        for statistic in snapshot.statistics('traceback'):
+            site = _OTHER_SITE
+            # Tracebacks run from the oldest frame to the most recent
+            for frame in reversed(statistic.traceback):
+                is_user = user_files.get(frame.filename)
+                if is_user is None:
+                    is_user = user_files[frame.filename] = self._is_user_file(frame.filename)
+                if is_user:
+                    site = (frame.filename, frame.lineno)
+                    break
+            retained[site] = retained.get(site, 0) + statistic.size
+        return retained
+    
+    def _is_user_file(self, filename: str) -> bool:
+        if filename.startswith('<') and not filename.startswith('<ipython-input-'):
+            # <frozen ...>, <string>, <unknown>
+            return False
+        return not filename.startswith(self._excluded_prefixes)
+    
+    def _format_site(self, site: Tuple[str, int], size: int, delta: int) -> Dict[str, Any]:
+        filename, line = site
+        streak = self._streaks.get(site, 0)
+        return {
+            "filename": filename,
+            "line": line,
+            "code": linecache.getline(filename, line).strip() if line else "",
+            "retained_bytes": size,
+            "delta_bytes": delta,
+            "growth_streak": streak,
+            "growing": streak >= GROWTH_STREAK,
+        }
+
+
+def _library_prefixes() -> Tuple[str, ...]:
+    """Directory prefixes whose files are not user code."""
+    paths = sysconfig.get_paths()
+    directories = {paths.get(key) for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+    directories.update(path for path in sys.path if 'site-packages' in path or 'dist-packages' in path)
+    # Erdos's own package
+    directories.add(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return tuple(os.path.join(directory, '') for directory in directories if directory)
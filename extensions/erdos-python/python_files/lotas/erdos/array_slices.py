@@ -0,0 +1,161 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Raw binary slices of numeric arrays, in bounded chunks, for array viewers."""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bytes per chunk event
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# Largest slice served by one request
+MAX_SLICE_BYTES = 256 * 1024 * 1024
+
+# dtype kinds sent as raw buffers: bool, signed, unsigned, float, complex, datetime, timedelta
+NUMERIC_KINDS = "biufcMm"
+
+ENCODINGS = ("buffers", "base64")
+
+
+class ArraySlice:
+    """
+    A selected region of a numeric array, ready to be sent in chunks.
+
+    The selection is a basic (start, stop, step) slice per axis, so it is a view
+    of the array and nothing is copied up front. A C-contiguous view is sent as
+    memoryview slices of the array's own memory. Any other view is copied one
+    chunk at a time with np.ascontiguousarray, so at most CHUNK_BYTES of copies
+    exist at once. Chunks concatenate to the C-order bytes of the slice.
+    """
+
+    def __init__(self, view: Any, chunk_bytes: int = CHUNK_BYTES):
+        self.view = view
+        self.chunk_bytes = max(1, chunk_bytes)
+
+    @property
+    def zero_copy(self) -> bool:
+        return bool(self.view.flags.c_contiguous)
+
+    @property
+    def num_chunks(self) -> int:
+        if self.view.nbytes == 0:
+            return 0
+        if self.zero_copy:
+            return -(-self.view.nbytes // self.chunk_bytes)
+        return sum(1 for _ in _strided_blocks(self.view, self.chunk_bytes))
+
+    def header(self) -> Dict[str, Any]:
+        """Describe the slice: dtype (numpy typestr), shape, total bytes and chunk count."""
+        return {
+            "dtype": self.view.dtype.str,
+            "shape": list(self.view.shape),
+            "nbytes": int(self.view.nbytes),
+            "chunks": self.num_chunks,
+            "chunk_bytes": self.chunk_bytes,
+            "zero_copy": self.zero_copy,
+        }
+
+    def chunks(self) -> Iterator[memoryview]:
+        """Yield the slice's bytes in C order, at most chunk_bytes per chunk."""
+        import numpy as np
+
+        if self.view.nbytes == 0:
+            return
+        if self.zero_copy:
+            # Viewed as bytes, since memoryview rejects datetime dtypes
+            data = memoryview(self.view.reshape(-1).view(np.uint8))
+            for offset in range(0, len(data), self.chunk_bytes):
+                yield data[offset:offset + self.chunk_bytes]
+            return
+
+        for block in _strided_blocks(self.view, self.chunk_bytes):
+            yield memoryview(np.ascontiguousarray(block).reshape(-1).view(np.uint8))
+
+
+def select_array_slice(
+    obj: Any,
+    selection: Optional[Sequence[Optional[Sequence[Optional[int]]]]] = None,
+    max_bytes: int = MAX_SLICE_BYTES,
+    chunk_bytes: int = CHUNK_BYTES
+) -> ArraySlice:
+    """
+    Select a region of a numeric array.
+
+    Args:
+        obj: A numpy array, or an object exposing the array interface without copying.
+        selection: One [start, stop, step] list (or None for the whole axis) per
+            leading axis; missing axes are taken whole.
+        max_bytes: Requests for larger slices are refused.
+        chunk_bytes: Size of each chunk.
+    """
+    import numpy as np
+
+    if isinstance(obj, np.ndarray):
+        array = obj
+    elif hasattr(obj, "__array_interface__") or hasattr(obj, "__array_struct__"):
+        array = np.asarray(obj)
+    elif type(obj).__module__.partition(".")[0] == "torch" and hasattr(obj, "numpy"):
+        # CPU tensors share their memory with the returned array
+        array = obj.detach().numpy()
+    else:
+        raise TypeError(f"{type(obj).__name__} is not a numeric array")
+
+    if array.dtype.kind not in NUMERIC_KINDS:
+        raise TypeError(f"Arrays of dtype {array.dtype} cannot be sent as raw buffers")
+
+    selection = list(selection or [])
+    if len(selection) > array.ndim:
+        raise ValueError(f"Selection has {len(selection)} axes, array has {array.ndim}")
+    view = array[tuple(slice(*axis) if axis is not None else slice(None) for axis in selection)]
+
+    if view.nbytes > max_bytes:
+        raise ValueError(
+            f"Slice of {view.nbytes} bytes exceeds the limit of {max_bytes}; "
+            "select fewer elements or use a step"
+        )
+    return ArraySlice(view, chunk_bytes)
+
+
+def chunk_message(
+    transfer_id: str,
+    index: int,
+    offset: int,
+    chunk: memoryview,
+    encoding: str
+) -> Tuple[Dict[str, Any], Optional[List[memoryview]]]:
+    """
+    Build the params and message buffers of one chunk event.
+
+    With the "buffers" encoding the chunk travels as the message's only buffer;
+    with "base64" it is embedded in the params as a "data" string.
+    """
+    params: Dict[str, Any] = {
+        "transfer_id": transfer_id,
+        "index": index,
+        "offset": offset,
+        "nbytes": len(chunk),
+    }
+    if encoding == "base64":
+        params["data"] = base64.b64encode(chunk).decode("ascii")
+        return params, None
+    return params, [chunk]
+
+
+def _strided_blocks(view: Any, chunk_bytes: int) -> Iterator[Any]:
+    """Split a non-contiguous view into sub-views of at most chunk_bytes, in C order."""
+    if view.ndim == 0 or view.nbytes <= chunk_bytes:
+        yield view
+        return
+
+    row_bytes = view.nbytes // len(view)
+    if row_bytes <= chunk_bytes:
+        rows = max(1, chunk_bytes // row_bytes)
+        for start in range(0, len(view), rows):
+            yield view[start:start + rows]
+    else:
+        for row in view:
+            yield from _strided_blocks(row, chunk_bytes)
+
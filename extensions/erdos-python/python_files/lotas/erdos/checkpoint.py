@@ -0,0 +1,693 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Namespace checkpoints: save user variables to disk and restore them in parallel into a fresh kernel."""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import importlib
+import json
+import logging
+import operator
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from .inspectors import Inspector, register_inspector
+from .offload import load_table, storage_kind, write_table
+
+logger = logging.getLogger(__name__)
+
+# Checkpoints are saved under this directory unless another one is given
+DEFAULT_CHECKPOINT_DIR = str(Path("~", ".erdos", "checkpoints", "default").expanduser())
+
+# Stored arrays and tables larger than this are restored on first use instead of up front
+DEFER_THRESHOLD = 64 * 1024 * 1024
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+# Every pickled variable is written to this one stream, so objects they share stay shared
+PICKLE_STREAM_NAME = "variables.pkl"
+
+_NOT_LOADED = object()
+
+
+class DeferredVariable:
+    """
+    Placeholder bound in the namespace for a large variable that has not been loaded yet.
+
+    The Variables service loads it before any cell that mentions its name runs.
+    Code that reaches it another way (through a function defined earlier, say)
+    loads it on first use: public attribute access, calls, len(), iteration,
+    indexing, arithmetic and numpy conversion all load the value and forward to it.
+    """
+
+    def __init__(self, manager: CheckpointManager, entry: dict[str, Any]):
+        self._manager = manager
+        self._entry = entry
+        self._value = _NOT_LOADED
+        self._lock = threading.Lock()
+
+    @property
+    def checkpoint_entry(self) -> dict[str, Any]:
+        """The manifest entry of the stored variable."""
+        return self._entry
+
+    def load(self) -> Any:
+        """Load the value (once) and rebind every name bound to this placeholder."""
+        with self._lock:
+            if self._value is _NOT_LOADED:
+                value, error = _load_entry(self._entry)
+                if error is not None:
+                    raise RuntimeError(
+                        f"Failed to load {self._entry['name']} from checkpoint: {error}"
+                    )
+                self._value = value
+                self._manager.bind_loaded(self, value)
+        return self._value
+
+    def __getattr__(self, attr: str) -> Any:
+        # Private and dunder lookups (display hooks, inspectors) must not trigger a load
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        size_mb = self._entry.get("size", 0) / (1024 * 1024)
+        return (
+            f"<deferred {self._entry.get('type', 'object')} ({size_mb:.1f} MB), loads on first use>"
+        )
+
+
+def _forward(function: Callable[..., Any]) -> Callable[..., Any]:
+    def method(self: DeferredVariable, *args: Any, **kwargs: Any) -> Any:
+        return function(self.load(), *args, **kwargs)
+
+    return method
+
+
+def _forward_reflected(function: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    def method(self: DeferredVariable, other: Any) -> Any:
+        return function(other, self.load())
+
+    return method
+
+
+def _call(value: Any, *args: Any, **kwargs: Any) -> Any:
+    return value(*args, **kwargs)
+
+
+def _array(value: Any, *args: Any, **kwargs: Any) -> Any:
+    return value.__array__(*args, **kwargs)
+
+
+# Special methods are looked up on the type, so __getattr__ never sees them. Equality
+# and hashing stay by identity so placeholders can still be tracked in dicts and sets.
+_FORWARDED_METHODS: dict[str, Callable[..., Any]] = {
+    "__call__": _call,
+    "__array__": _array,
+    "__len__": len,
+    "__iter__": iter,
+    "__bool__": bool,
+    "__int__": int,
+    "__float__": float,
+    "__index__": operator.index,
+    "__contains__": operator.contains,
+    "__getitem__": operator.getitem,
+    "__setitem__": operator.setitem,
+    "__delitem__": operator.delitem,
+    "__neg__": operator.neg,
+    "__pos__": operator.pos,
+    "__abs__": abs,
+    "__invert__": operator.invert,
+    "__lt__": operator.lt,
+    "__le__": operator.le,
+    "__gt__": operator.gt,
+    "__ge__": operator.ge,
+}
+
+_BINARY_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "matmul": operator.matmul,
+    "truediv": operator.truediv,
+    "floordiv": operator.floordiv,
+    "mod": operator.mod,
+    "divmod": divmod,
+    "pow": operator.pow,
+    "lshift": operator.lshift,
+    "rshift": operator.rshift,
+    "and": operator.and_,
+    "xor": operator.xor,
+    "or": operator.or_,
+}
+
+for _name, _function in _FORWARDED_METHODS.items():
+    setattr(DeferredVariable, _name, _forward(_function))
+for _name, _function in _BINARY_OPERATORS.items():
+    setattr(DeferredVariable, f"__{_name}__", _forward(_function))
+    setattr(DeferredVariable, f"__r{_name}__", _forward_reflected(_function))
+
+
+class DeferredVariableInspector(Inspector):
+    """Restored variables not loaded yet, described from their manifest entry without loading."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return repr(obj), False
+
+    def display_type(self, obj: Any) -> str:
+        return obj.checkpoint_entry.get("type", "object")
+
+    def size(self, obj: Any) -> int:
+        return obj.checkpoint_entry.get("size", 0)
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        # The placeholder only references the manager, which reaches the whole namespace
+        return (), 0
+
+    def length(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        # Loading rebinds the names to a new object, which changes the binding anyway
+        return None
+
+
+register_inspector(DeferredVariable, DeferredVariableInspector())
+
+
+class CheckpointManager:
+    """
+    Saves the user namespace to a checkpoint directory and restores it.
+
+    Each variable is stored with the cheapest serializer for its type: numpy
+    arrays as raw .npy buffers, pandas/polars/Arrow tables as Arrow IPC files,
+    modules as the name to import again, and everything else by pickle
+    (cloudpickle when installed, so functions and classes defined in the session
+    survive). Variables that cannot be stored are listed in the report with the
+    reason. Names bound to the same object are stored once and restored as
+    aliases again.
+
+    Pickled variables share one stream written by one pickler, so objects they
+    share are restored shared, and they refer to arrays and tables stored in
+    their own files by name. Functions defined in the session are stored without
+    their globals and restored with the namespace they are restored into as
+    their globals, so they see the same variables as the rest of the session.
+
+    Restores load arrays and tables on a thread pool while the pickle stream is
+    read, and bind placeholders for arrays and tables above DEFER_THRESHOLD,
+    which load on first use.
+    """
+
+    def __init__(self, defer_threshold: int = DEFER_THRESHOLD, max_workers: int | None = None):
+        self.defer_threshold = defer_threshold
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        # Placeholders not loaded yet, by name
+        self._deferred: dict[str, DeferredVariable] = {}
+        self._namespace: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def deferred_names(self) -> list[str]:
+        with self._lock:
+            return sorted(self._deferred)
+
+    def save(self, namespace: dict[str, Any], directory: str | None = None) -> dict[str, Any]:
+        """
+        Save the variables of namespace to directory, replacing any checkpoint there.
+
+        The checkpoint is written to a temporary sibling directory and moved into
+        place at the end, so a failed save never clobbers an existing checkpoint.
+        Returns {"directory", "saved", "skipped", "size", "seconds"}.
+        """
+        started = time.perf_counter()
+        target = Path(directory or DEFAULT_CHECKPOINT_DIR).resolve()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".checkpoint-", dir=target.parent))
+
+        # Each distinct object is stored under the first name bound to it
+        distinct: list[tuple[str, Any]] = []
+        aliases: list[dict[str, Any]] = []
+        first_names: dict[int, str] = {}
+        for name, value in sorted(namespace.items()):
+            obj = value
+            if isinstance(obj, DeferredVariable):
+                # Still on disk from the last restore; load it so the new checkpoint is complete
+                obj = obj.load()
+            if id(obj) in first_names:
+                aliases.append({"name": name, "alias_of": first_names[id(obj)]})
+                continue
+            first_names[id(obj)] = name
+            distinct.append((name, obj))
+
+        entries: list[dict[str, Any]] = []
+        skipped: list[dict[str, str]] = []
+        try:
+            # Arrays, tables and modules first, so pickled variables can refer to them by name
+            references: dict[int, str] = {}
+            pickled: list[tuple[str, Any]] = []
+            for name, obj in distinct:
+                if not isinstance(obj, types.ModuleType) and storage_kind(obj) is None:
+                    pickled.append((name, obj))
+                    continue
+                try:
+                    entry = _save_variable(obj, staging, f"{len(entries)}")
+                except Exception as e:
+                    skipped.append(_skipped(name, obj, e))
+                    continue
+                entry["name"] = name
+                entries.append(entry)
+                references[id(obj)] = name
+
+            if pickled:
+                pickled_entries, pickle_skipped = _pickle_variables(pickled, references, staging)
+                entries.extend(pickled_entries)
+                skipped.extend(pickle_skipped)
+
+            saved = {entry["name"] for entry in entries}
+            entries.extend(alias for alias in aliases if alias["alias_of"] in saved)
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "created": time.time(),
+                "entries": entries,
+                "skipped": skipped,
+            }
+            with (staging / MANIFEST_NAME).open("w") as f:
+                json.dump(manifest, f)
+
+            # Swap the new checkpoint in
+            if target.is_dir():
+                shutil.rmtree(target)
+            staging.replace(target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        size = sum(entry.get("size", 0) for entry in entries)
+        logger.info(
+            f"[CHECKPOINT] Saved {len(entries)} variables ({size} bytes) to {target}, "
+            f"skipped {len(skipped)}"
+        )
+        return {
+            "directory": str(target),
+            "saved": [entry["name"] for entry in entries],
+            "skipped": skipped,
+            "size": size,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def restore(self, namespace: dict[str, Any], directory: str | None = None) -> dict[str, Any]:
+        """
+        Restore a checkpoint into namespace.
+
+        Returns {"directory", "restored", "deferred", "failed", "skipped", "seconds"};
+        skipped repeats what the save could not store.
+        """
+        started = time.perf_counter()
+        source = Path(directory or DEFAULT_CHECKPOINT_DIR).resolve()
+        with (source / MANIFEST_NAME).open() as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {manifest.get('version')}")
+
+        self._namespace = namespace
+        stored = [entry for entry in manifest["entries"] if "alias_of" not in entry]
+        for entry in stored:
+            if "file" in entry:
+                entry["path"] = source / entry["file"]
+        files = [entry for entry in stored if entry["serializer"] in ("npy", "arrow")]
+        pickled = [entry for entry in stored if entry["serializer"] == "pickle"]
+        deferred = {
+            entry["name"]: entry for entry in files if entry.get("size", 0) > self.defer_threshold
+        }
+
+        values: dict[str, Any] = {}
+        failed: list[dict[str, str]] = []
+        for entry in stored:
+            if entry["serializer"] == "module":
+                try:
+                    values[entry["name"]] = importlib.import_module(entry["module"])
+                except Exception as e:
+                    failed.append({"name": entry["name"], "reason": f"{type(e).__name__}: {e}"})
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="erdos-restore"
+        ) as pool:
+            loading: dict[str, Future] = {
+                entry["name"]: pool.submit(_load_entry, entry)
+                for entry in files
+                if entry["name"] not in deferred
+            }
+
+            errors: dict[str, str] = {}
+
+            def resolve(name: str) -> Any:
+                if name in values:
+                    return values[name]
+                if name in errors:
+                    raise pickle.UnpicklingError(f"{name} failed to load: {errors[name]}")
+                if name in loading:
+                    value, error = loading.pop(name).result()
+                elif name in deferred:
+                    # A pickled variable holds it, so it cannot wait for first use
+                    value, error = _load_entry(deferred.pop(name))
+                else:
+                    raise pickle.UnpicklingError(f"{name} is not in the checkpoint")
+                if error is not None:
+                    errors[name] = error
+                    failed.append({"name": name, "reason": error})
+                    raise pickle.UnpicklingError(f"{name} failed to load: {error}")
+                values[name] = value
+                return value
+
+            if pickled:
+                _unpickle_variables(pickled, namespace, resolve, values, failed)
+            for name in list(loading):
+                with contextlib.suppress(pickle.UnpicklingError):
+                    resolve(name)
+
+        with self._lock:
+            for name, entry in deferred.items():
+                placeholder = DeferredVariable(self, entry)
+                values[name] = placeholder
+                self._deferred[name] = placeholder
+            for entry in manifest["entries"]:
+                if "alias_of" in entry and entry["alias_of"] in values:
+                    values[entry["name"]] = values[entry["alias_of"]]
+                    if isinstance(values[entry["name"]], DeferredVariable):
+                        self._deferred[entry["name"]] = values[entry["name"]]
+        namespace.update(values)
+
+        restored = sorted(
+            name for name, value in values.items() if not isinstance(value, DeferredVariable)
+        )
+        logger.info(
+            f"[CHECKPOINT] Restored {len(values)} variables from {source} "
+            f"({len(values) - len(restored)} deferred, {len(failed)} failed)"
+        )
+        return {
+            "directory": str(source),
+            "restored": restored,
+            "deferred": self.deferred_names,
+            "failed": failed,
+            "skipped": manifest.get("skipped", []),
+            "seconds": time.perf_counter() - started,
+        }
+
+    def load_deferred(self, names: Iterable[str]) -> list[str]:
+        """Load the deferred variables among names (in parallel); return the names rebound."""
+        with self._lock:
+            pending = {name: self._deferred[name] for name in names if name in self._deferred}
+        placeholders = list(
+            {id(placeholder): placeholder for placeholder in pending.values()}.values()
+        )
+        if not placeholders:
+            return []
+        rebound: list[str] = []
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="erdos-restore"
+        ) as pool:
+            for placeholder, error in zip(placeholders, pool.map(_load_placeholder, placeholders)):
+                if error is not None:
+                    logger.error(f"[CHECKPOINT] {error}")
+                    continue
+                rebound.extend(name for name, bound in pending.items() if bound is placeholder)
+        return rebound
+
+    def bind_loaded(self, placeholder: DeferredVariable, value: Any) -> list[str]:
+        """Replace a loaded placeholder in the namespace (under every name bound to it)."""
+        with self._lock:
+            names = [name for name, bound in self._deferred.items() if bound is placeholder]
+            for name in names:
+                del self._deferred[name]
+                if self._namespace is not None and self._namespace.get(name) is placeholder:
+                    self._namespace[name] = value
+        return names
+
+
+def _skipped(name: str, obj: Any, error: Exception) -> dict[str, str]:
+    return {"name": name, "type": type(obj).__name__, "reason": f"{type(error).__name__}: {error}"}
+
+
+def _save_variable(obj: Any, directory: Path, stem: str) -> dict[str, Any]:
+    """Store a module, array or table on its own; return its manifest entry."""
+    if isinstance(obj, types.ModuleType):
+        if sys.modules.get(obj.__name__) is not obj:
+            raise ValueError("module cannot be imported by name")
+        return {"serializer": "module", "module": obj.__name__, "type": "module", "size": 0}
+
+    kind = storage_kind(obj)
+    if kind == "numpy":
+        import numpy as np
+
+        path = directory / f"{stem}.npy"
+        # Contiguous arrays are written straight from their buffer
+        np.save(path, obj, allow_pickle=False)
+        serializer = "npy"
+    else:
+        path = directory / f"{stem}.arrow"
+        write_table(obj, kind, str(path))
+        serializer = "arrow"
+
+    return {
+        "file": path.name,
+        "serializer": serializer,
+        "kind": kind,
+        "type": type(obj).__name__,
+        "size": path.stat().st_size,
+    }
+
+
+def _pickle_variables(
+    variables: list[tuple[str, Any]], references: dict[int, str], directory: Path
+) -> tuple[list[dict[str, Any]], list[dict[str, str]]]:
+    """
+    Pickle variables into the checkpoint's pickle stream, one pickle each.
+
+    They share one pickler, so its memo stores objects they share once. Objects
+    in references are stored by name instead. Returns (entries, skipped).
+    """
+    entries: list[dict[str, Any]] = []
+    skipped: list[dict[str, str]] = []
+    memo_reset = False
+    with (directory / PICKLE_STREAM_NAME).open("wb") as f:
+        pickler = _checkpoint_pickler()(f, references)
+        for name, obj in variables:
+            offset = f.tell()
+            try:
+                pickler.dump(obj)
+            except Exception as e:
+                skipped.append(_skipped(name, obj, e))
+                f.seek(offset)
+                f.truncate()
+                # The memo now holds objects that never made it into the stream
+                pickler.clear_memo()
+                memo_reset = True
+                continue
+            entry = {
+                "name": name,
+                "file": PICKLE_STREAM_NAME,
+                "serializer": "pickle",
+                "kind": None,
+                "type": type(obj).__name__,
+                "size": f.tell() - offset,
+                "offset": offset,
+            }
+            if memo_reset:
+                entry["memo_reset"] = True
+                memo_reset = False
+            entries.append(entry)
+    return entries, skipped
+
+
+def _unpickle_variables(
+    entries: list[dict[str, Any]],
+    namespace: dict[str, Any],
+    resolve: Callable[[str], Any],
+    values: dict[str, Any],
+    failed: list[dict[str, str]],
+) -> None:
+    """Read the pickle stream into values, resolving references to other variables by name."""
+    broken: str | None = None
+    with entries[0]["path"].open("rb") as f:
+        unpickler = _CheckpointUnpickler(f, namespace, resolve)
+        for entry in entries:
+            if entry.get("memo_reset"):
+                # The pickler started a fresh memo here; a new unpickler numbers it the same way
+                unpickler = _CheckpointUnpickler(f, namespace, resolve)
+                broken = None
+            if broken is not None:
+                # It may share objects with the variable that failed, which the memo lacks
+                failed.append(
+                    {
+                        "name": entry["name"],
+                        "reason": f"{broken} failed earlier in the pickle stream",
+                    }
+                )
+                continue
+            f.seek(entry["offset"])
+            try:
+                values[entry["name"]] = unpickler.load()
+            except Exception as e:
+                failed.append({"name": entry["name"], "reason": f"{type(e).__name__}: {e}"})
+                broken = entry["name"]
+
+
+def _load_entry(entry: dict[str, Any]) -> tuple[Any, str | None]:
+    """Load one array or table; return (value, None) or (None, error message)."""
+    try:
+        path = entry["path"]
+        if entry["serializer"] == "npy":
+            import numpy as np
+
+            return np.load(path, allow_pickle=False), None
+        return load_table(str(path), entry["kind"]), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _load_placeholder(placeholder: DeferredVariable) -> str | None:
+    """Load a placeholder; return None or the error message."""
+    try:
+        placeholder.load()
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def _is_session_globals(namespace: dict[str, Any]) -> bool:
+    return namespace.get("__name__") == "__main__"
+
+
+class _CheckpointPicklerMixin:
+    """Pickles session functions without their globals and referenced variables by name."""
+
+    def __init__(self, file: Any, references: dict[int, str]):
+        self.references = references
+        if references:
+            # The C pickler looks persistent_id up once; unset, it keeps every object on its fast path
+            self.persistent_id = self.reference
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def reference(self, obj: Any) -> Any:
+        name = self.references.get(id(obj))
+        return None if name is None else ("variable", name)
+
+    def reducer_override(self, obj: Any) -> Any:
+        cloudpickle_reducer = getattr(super(), "reducer_override", None)
+        if isinstance(obj, types.FunctionType) and _is_session_globals(obj.__globals__):
+            if cloudpickle_reducer is None:
+                raise ValueError("defined in the session; install cloudpickle to save it")
+            return _reduce_session_function(obj)
+        if cloudpickle_reducer is None:
+            if isinstance(obj, type) and obj.__module__ == "__main__":
+                # pickle stores these by reference to __main__, which a fresh kernel does not have
+                raise ValueError("defined in the session; install cloudpickle to save it")
+            return NotImplemented
+        return cloudpickle_reducer(obj)
+
+
+@functools.lru_cache(maxsize=None)
+def _checkpoint_pickler() -> type:
+    """The checkpoint pickler, on cloudpickle if installed (it stores session classes too), else pickle."""
+    try:
+        from cloudpickle import Pickler
+    except ImportError:
+        Pickler = pickle.Pickler  # noqa: N806
+    return type("CheckpointPickler", (_CheckpointPicklerMixin, Pickler), {})
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    """Reads the pickle stream, resolving variable references and session function globals."""
+
+    def __init__(self, file: Any, namespace: dict[str, Any], resolve: Callable[[str], Any]):
+        super().__init__(file)
+        self.namespace = namespace
+        self.resolve = resolve
+
+    def persistent_load(self, pid: Any) -> Any:
+        kind, name = pid
+        if kind != "variable":
+            raise pickle.UnpicklingError(f"Unknown checkpoint reference: {kind}")
+        return self.resolve(name)
+
+    def find_class(self, module: str, name: str) -> Any:
+        if module == __name__ and name == _make_session_function.__name__:
+            return functools.partial(_make_session_function, self.namespace)
+        return super().find_class(module, name)
+
+
+class _EmptyCell:
+    """Stands in for a closure cell with no value yet."""
+
+
+def _reduce_session_function(func: types.FunctionType) -> tuple[Any, ...]:
+    closure = func.__closure__ or ()
+    state = {
+        "cells": [_cell_contents(cell) for cell in closure],
+        "defaults": func.__defaults__,
+        "kwdefaults": func.__kwdefaults__,
+        "dict": func.__dict__,
+        "qualname": func.__qualname__,
+        "annotations": func.__annotations__,
+        "doc": func.__doc__,
+        "module": func.__module__,
+    }
+    # The state is set after the function is memoized, so it may refer back to the function
+    return (
+        _make_session_function,
+        (func.__code__, func.__name__, len(closure)),
+        state,
+        None,
+        None,
+        _set_session_function_state,
+    )
+
+
+def _cell_contents(cell: Any) -> Any:
+    try:
+        return cell.cell_contents
+    except ValueError:
+        return _EmptyCell
+
+
+def _make_session_function(
+    namespace: dict[str, Any], code: types.CodeType, name: str, cell_count: int
+) -> types.FunctionType:
+    closure = tuple(types.CellType() for _ in range(cell_count)) if cell_count else None
+    return types.FunctionType(code, namespace, name, None, closure)
+
+
+def _set_session_function_state(func: types.FunctionType, state: dict[str, Any]) -> None:
+    for cell, value in zip(func.__closure__ or (), state["cells"]):
+        if value is not _EmptyCell:
+            cell.cell_contents = value
+    func.__defaults__ = state["defaults"]
+    func.__kwdefaults__ = state["kwdefaults"]
+    func.__dict__.update(state["dict"])
+    func.__qualname__ = state["qualname"]
+    func.__annotations__ = state["annotations"]
+    func.__doc__ = state["doc"]
+    func.__module__ = state["module"]
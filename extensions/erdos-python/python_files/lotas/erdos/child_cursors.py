@@ -0,0 +1,175 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""
+Server-side cursors for paging the children of large containers.
+
+Used by python_files/get_variable_info.py, which is re-executed for every
+request, so the cursors live here in an imported module; like erdos.previews,
+this module only uses the standard library.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator
+
+
+class _Cursor:
+    """Paging state for one container: a key snapshot, or a live iterator and its position."""
+
+    __slots__ = ("iterator", "keys", "length", "obj", "page", "position", "used")
+
+    def __init__(self, obj: Any, length: int):
+        self.obj = obj
+        self.length = length
+        self.keys: list[Any] | None = None
+        self.iterator: Iterator[Any] | None = None
+        self.position = 0
+        # index -> (child key, value) for the last page served
+        self.page: dict[int, tuple[Any, Any]] = {}
+        self.used = time.monotonic()
+
+
+class ChildCursors:
+    """
+    Keeps one cursor per expanded container between page requests.
+
+    Each page of a dict is read from a snapshot of its keys, taken once. Sets,
+    deques and other iterables keep a live iterator that continues from the
+    previous page's end. pandas DataFrame rows are sliced with iloc. A page
+    therefore costs O(page size), not O(position). A cursor is rebuilt when the
+    container is replaced or changes length, and is dropped after
+    EXPIRY_SECONDS without use or when more than MAX_CURSORS are open.
+
+    Children are addressed by position, and a dict position by the cursor's key
+    snapshot, so keys never have to travel to the frontend. The items of the
+    last page served are remembered, so expanding one of them resolves its
+    position without walking the container again.
+    """
+
+    EXPIRY_SECONDS = 300.0
+    MAX_CURSORS = 64
+
+    def __init__(self):
+        self._cursors: OrderedDict[Hashable, _Cursor] = OrderedDict()
+        # type -> attribute names from dir(), for types without a custom __dir__
+        self._type_names: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def page(self, key: Hashable, obj: Any, start: int, stop: int) -> list[tuple[int, Any, Any]]:
+        """
+        Return (position, child key, value) for the children at positions [start, stop) of obj.
+
+        The child key is the dict key, the DataFrame row label, or the position.
+        """
+        self._expire()
+        cursor = self._cursor(key, obj)
+        start = max(0, start)
+        stop = min(stop, cursor.length)
+
+        if isinstance(obj, dict):
+            if cursor.keys is None:
+                cursor.keys = list(obj)
+            page = {}
+            for position in range(start, stop):
+                child_key = cursor.keys[position]
+                try:
+                    page[position] = (child_key, obj[child_key])
+                except KeyError:
+                    continue
+        elif _is_data_frame(obj):
+            rows = obj.iloc[start:stop]
+            page = {start + offset: row for offset, row in enumerate(rows.iterrows())}
+        else:
+            page = {
+                position: (position, value)
+                for position, value in self._advance(cursor, start, stop)
+            }
+
+        cursor.page = page
+        return [(position, child_key, value) for position, (child_key, value) in page.items()]
+
+    def item(self, obj: Any, index: int) -> Any:
+        """Return the item at a position of obj (for dicts, in its key snapshot), from a served page if possible."""
+        for cursor in self._cursors.values():
+            if cursor.obj is not obj:
+                continue
+            if index in cursor.page:
+                child_key, value = cursor.page[index]
+                # The value is looked up again in case the key was rebound since
+                return obj[child_key] if isinstance(obj, dict) else value
+            if cursor.keys is not None:
+                return obj[cursor.keys[index]]
+        if isinstance(obj, dict):
+            return obj[next(itertools.islice(obj, index, None))]
+        if _is_data_frame(obj):
+            return obj.iloc[index]
+        # Skips to the position without copying the container
+        return next(itertools.islice(obj, index, None))
+
+    def attribute_names(self, obj: Any) -> list[str]:
+        """Return dir(obj), reusing the per-type part across expansions."""
+        obj_type = type(obj)
+        if getattr(obj_type, "__dir__", None) is not object.__dir__:
+            return dir(obj)
+        try:
+            type_names = self._type_names[obj_type]
+        except (KeyError, TypeError):
+            type_names = set(dir(obj_type))
+            with contextlib.suppress(TypeError):
+                self._type_names[obj_type] = type_names
+        instance_names = getattr(obj, "__dict__", None)
+        if not isinstance(instance_names, dict) or not instance_names:
+            return sorted(type_names)
+        return sorted(type_names.union(instance_names))
+
+    def clear(self) -> None:
+        """Drop every cursor."""
+        self._cursors.clear()
+
+    def _cursor(self, key: Hashable, obj: Any) -> _Cursor:
+        length = len(obj)
+        cursor = self._cursors.get(key)
+        if cursor is None or cursor.obj is not obj or cursor.length != length:
+            cursor = self._cursors[key] = _Cursor(obj, length)
+            while len(self._cursors) > self.MAX_CURSORS:
+                self._cursors.popitem(last=False)
+        self._cursors.move_to_end(key)
+        cursor.used = time.monotonic()
+        return cursor
+
+    def _advance(self, cursor: _Cursor, start: int, stop: int) -> list[tuple[Any, Any]]:
+        if cursor.iterator is None or start < cursor.position:
+            cursor.iterator = iter(cursor.obj)
+            cursor.position = 0
+        try:
+            if start > cursor.position:
+                next(itertools.islice(cursor.iterator, start - cursor.position - 1, None), None)
+            values = list(itertools.islice(cursor.iterator, stop - start))
+        except RuntimeError:
+            # Changed size during iteration; the next request starts over
+            cursor.iterator = None
+            raise
+        cursor.position = start + len(values)
+        return [(start + offset, value) for offset, value in enumerate(values)]
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.EXPIRY_SECONDS
+        for key in [key for key, cursor in self._cursors.items() if cursor.used < deadline]:
+            del self._cursors[key]
+
+
+def _is_data_frame(obj: Any) -> bool:
+    obj_type = type(obj)
+    return obj_type.__name__ == "DataFrame" and obj_type.__module__.partition(".")[0] == "pandas"
+
+
+# Shared by every execution of get_variable_info.py in this process
+child_cursors = ChildCursors()
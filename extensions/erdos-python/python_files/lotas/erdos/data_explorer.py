@@ -0,0 +1,657 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Data explorer service for Python kernel - serves windows of tabular variables."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Callable
+
+from .profiling import summarize_table
+from .table_ops import RowOrderCache, combine_row_order, filter_mask, sort_order
+
+if TYPE_CHECKING:
+    from comm.base_comm import BaseComm
+
+logger = logging.getLogger(__name__)
+
+# Cells are formatted with this many significant digits
+FLOAT_FORMAT = "%.10g"
+
+# Longer cell values are truncated
+MAX_CELL_LENGTH = 1000
+
+
+class TableView:
+    """
+    A table open in a data explorer, read one window at a time.
+
+    Subclasses adapt one kind of table. They never copy or format more than the
+    rows and columns of the requested window.
+    """
+
+    # Pushdown views run sort and filter in their own engine (see PushdownTableView)
+    pushdown = False
+
+    def __init__(self, table: Any, path: list[str], display_name: str):
+        self.table = table
+        self.path = path
+        self.display_name = display_name
+        # Bumped whenever the underlying table changes
+        self.version = 0
+
+        # Current sort and filter specs, and the row positions they select (None: all rows in order)
+        self.sort_keys: list[dict[str, Any]] = []
+        self.row_filters: list[dict[str, Any]] = []
+        self.row_order: Any | None = None
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        """Whether this kind of view can show the table."""
+        raise NotImplementedError
+
+    def set_table(self, table: Any) -> None:
+        """Point the view at a new or mutated table."""
+        self.table = table
+        self.version += 1
+
+    def shape(self) -> tuple[int, int]:
+        """Return (number of rows, number of columns)."""
+        raise NotImplementedError
+
+    def num_rows(self) -> int:
+        """Return the number of rows left after filtering."""
+        if self.row_order is not None:
+            return len(self.row_order)
+        return self.shape()[0]
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        """Describe the column at index."""
+        raise NotImplementedError
+
+    def column_values(self, index: int, rows: slice | Any, *, exact: bool = False) -> list[str | None]:
+        """
+        Format the given rows (a slice or position array) of a column, with None for missing values.
+
+        exact keeps full precision and untruncated text (see format_values).
+        """
+        raise NotImplementedError
+
+    def row_labels(self, rows: slice | Any, *, exact: bool = False) -> list[str] | None:  # noqa: ARG002
+        """Format the labels of the given rows, or None if rows are just numbered."""
+        return None
+
+    def window(
+        self,
+        rows: slice | Any,
+        column_indices: list[int],
+        *,
+        exact: bool = False,
+    ) -> tuple[list[list[str | None]], list[str] | None]:
+        """Format the given rows of the given columns, and their row labels."""
+        columns = [self.column_values(i, rows, exact=exact) for i in column_indices]
+        labels = self.row_labels(rows, exact=exact)
+        if labels is None and not isinstance(rows, slice):
+            # Numbered rows keep their original numbers when sorted or filtered
+            labels = rows.astype(str).tolist()
+        return columns, labels
+
+    def column_data(self, index: int) -> Any:
+        """Return a whole column as a numpy array or pandas Series, without copying if possible."""
+        raise NotImplementedError
+
+    def column_sample(self, index: int, positions: Any | None) -> Any:
+        """Return the column's values at the given row positions (all rows if None) for profiling."""
+        import numpy as np
+        column = self.column_data(index)
+        if positions is None:
+            return column
+        if isinstance(column, np.ndarray):
+            return column[positions]
+        return column.iloc[positions]
+
+    def sort_order(self, sort_keys: list[dict[str, Any]]) -> Any:
+        """Return the row permutation for the sort keys."""
+        columns = [
+            (self.column_data(int(key["column_index"])), bool(key.get("ascending", True)))
+            for key in sort_keys
+        ]
+        return sort_order(columns)
+
+    def filter_mask(self, row_filter: dict[str, Any]) -> Any:
+        """Return the boolean row mask for one filter."""
+        return filter_mask(self.column_data(int(row_filter["column_index"])), row_filter)
+
+
+class PandasTableView(TableView):
+    """pandas.DataFrame."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "pandas.DataFrame")
+
+    def shape(self) -> tuple[int, int]:
+        return self.table.shape
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        dtype = self.table.dtypes.iloc[index]
+        return {
+            "column_name": str(self.table.columns[index]),
+            "column_index": index,
+            "type_name": str(dtype),
+            "type_display": _type_display(dtype),
+        }
+
+    def column_values(self, index: int, rows: slice | Any, *, exact: bool = False) -> list[str | None]:
+        # iloc only touches the window: a slice is a view, positions take just those rows
+        return format_series(self.table.iloc[rows, index], exact=exact)
+
+    def row_labels(self, rows: slice | Any, *, exact: bool = False) -> list[str] | None:
+        import pandas as pd
+        index = self.table.index
+        if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+            return None
+        return [label if label is not None else "" for label in format_series(index[rows].to_series(), exact=exact)]
+
+    def column_data(self, index: int) -> Any:
+        return self.table.iloc[:, index]
+
+
+class NumpyTableView(TableView):
+    """1-D and 2-D numpy arrays; a 1-D array is shown as a single column."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "numpy.ndarray") and table.ndim in (1, 2)
+
+    def shape(self) -> tuple[int, int]:
+        if self.table.ndim == 1:
+            return self.table.shape[0], 1
+        return self.table.shape
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        dtype = self.table.dtype
+        return {
+            "column_name": str(index),
+            "column_index": index,
+            "type_name": str(dtype),
+            "type_display": _type_display(dtype),
+        }
+
+    def column_values(self, index: int, rows: slice | Any, *, exact: bool = False) -> list[str | None]:
+        return format_values(self.column_data(index)[rows], exact=exact)
+
+    def column_data(self, index: int) -> Any:
+        if self.table.ndim == 1:
+            return self.table
+        return self.table[:, index]
+
+
+class PushdownTableView(TableView):
+    """
+    A table whose sort, filter and window requests run in its own query engine.
+
+    Instead of row positions, subclasses keep a native query built from the
+    current sort keys and filters, and only the rows of each requested window
+    are ever materialized. row_order stays None.
+    """
+
+    pushdown = True
+
+    def apply_query(self) -> bool:
+        """Rebuild the native query from sort_keys and row_filters; return whether any filter was invalid."""
+        raise NotImplementedError
+
+    def column_data(self, index: int) -> Any:
+        # Whole columns are never materialized; profiling goes through column_sample
+        raise NotImplementedError
+
+
+# Checked in order; the first view class accepting a table is used
+_table_view_types: list[type] = [PandasTableView, NumpyTableView]
+
+
+def create_table_view(table: Any, path: list[str], display_name: str) -> TableView | None:
+    """Create a view for the table, or return None if it cannot be explored."""
+    # Views for optional engines live apart, since they subclass the views above
+    from .native_views import native_table_view_types
+
+    for view_type in (*_table_view_types, *native_table_view_types):
+        view = _try_view(view_type, table, path, display_name)
+        if view is not None:
+            return view
+    return None
+
+
+def _try_view(view_type: type, table: Any, path: list[str], display_name: str) -> TableView | None:
+    try:
+        if view_type.accepts(table):
+            return view_type(table, path, display_name)
+    except Exception as e:
+        logger.debug(f"[DATA EXPLORER] {view_type.__name__} rejected {type(table).__name__}: {e}")
+    return None
+
+
+def format_values(values: Any, nulls: Any = None, *, exact: bool = False) -> list[str | None]:
+    """
+    Format a 1-D numpy array as display strings, with None for missing values.
+
+    Numeric, boolean, string and datetime columns are formatted by numpy in one
+    call per column; only object columns fall back to formatting each cell.
+    Floats are shown with FLOAT_FORMAT and text is cut at MAX_CELL_LENGTH,
+    unless exact is set: exports then get the shortest round-tripping float
+    representation and whole cells.
+    """
+    import numpy as np
+
+    max_length = None if exact else MAX_CELL_LENGTH
+    kind = values.dtype.kind
+    missing = None
+    if kind == "f":
+        formatted = (values.astype(str) if exact else np.char.mod(FLOAT_FORMAT, values)).tolist()
+        missing = np.isnan(values)
+    elif kind in "biu":
+        formatted = values.astype(str).tolist()
+    elif kind == "c":
+        formatted = values.astype(str).tolist()
+        missing = np.isnan(values)
+    elif kind == "M":
+        formatted = np.datetime_as_string(values).tolist()
+        missing = np.isnat(values)
+    elif kind == "m":
+        formatted = values.astype(str).tolist()
+        missing = np.isnat(values)
+    elif kind == "U":
+        # Casting to a shorter fixed width truncates every cell in one call
+        formatted = (values if exact else values.astype(f"<U{MAX_CELL_LENGTH}")).tolist()
+    else:
+        formatted = []
+        missing = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values.tolist() if kind != "O" else values):
+            if value is None or (isinstance(value, float) and value != value):
+                missing[i] = True
+                formatted.append("")
+            else:
+                formatted.append(str(value)[:max_length])
+
+    if nulls is not None:
+        missing = nulls if missing is None else (missing | nulls)
+    if missing is not None:
+        for i in np.flatnonzero(missing).tolist():
+            formatted[i] = None
+    return formatted
+
+
+def format_series(series: Any, *, exact: bool = False) -> list[str | None]:
+    """Format a pandas Series (usually a window of a column) as display strings."""
+    import numpy as np
+
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind not in "mM":
+        return format_values(series.to_numpy(), exact=exact)
+
+    # Extension dtypes (nullable, categorical, tz-aware...) and datetimes use pandas' own formatting
+    nulls = series.isna().to_numpy()
+    return format_values(series.astype(str).to_numpy(dtype=object), nulls, exact=exact)
+
+
+def _spec_key(spec: Any) -> str:
+    """Canonical, hashable form of a sort or filter spec."""
+    return json.dumps(spec, sort_keys=True, default=str)
+
+
+def _is_instance(obj: Any, type_name: str) -> bool:
+    """isinstance() against a "package.QualName" string, without importing the package."""
+    for cls in type(obj).__mro__:
+        if f"{cls.__module__.split('.')[0]}.{cls.__qualname__}" == type_name:
+            return True
+    return False
+
+
+def _type_display(dtype: Any) -> str:
+    """Map a numpy or pandas dtype to the data explorer's display type."""
+    kind = getattr(dtype, "kind", "O")
+    if kind == "b":
+        return "boolean"
+    if kind in "iufc":
+        return "number"
+    if kind == "M":
+        return "datetime"
+    if kind == "m":
+        return "interval"
+    if kind in "US":
+        return "string"
+    name = str(dtype)
+    if name == "category":
+        return "categorical"
+    if name.startswith("string") or name == "str":
+        return "string"
+    return "object"
+
+
+class DataExplorerService:
+    """Serves windows of tabular variables to data explorer comms."""
+
+    # Largest window served per request
+    MAX_WINDOW_ROWS = 10_000
+    MAX_WINDOW_CELLS = 200_000
+
+    # Views no comm attaches to within this many seconds are dropped with their caches
+    UNATTACHED_VIEW_SECONDS = 60.0
+
+    def __init__(self):
+        # Store active comm channels by comm_id
+        self._comms: dict[str, BaseComm] = {}
+
+        # Open views by viewer id, and the view each comm is attached to
+        self._views: dict[str, TableView] = {}
+        self._comm_views: dict[str, str] = {}
+        # viewer id -> when it was opened, for views no comm has attached to yet
+        self._unattached: dict[str, float] = {}
+
+        # Sort permutations and filter masks by (viewer id, table version, spec)
+        self._row_orders = RowOrderCache()
+
+    def open_view(self, table: Any, path: list[str], display_name: str) -> str | None:
+        """Open a view of the table and return its viewer id, or None if it cannot be explored."""
+        view = create_table_view(table, path, display_name)
+        if view is None:
+            logger.info(f"[DATA EXPLORER] No view available for {type(table).__name__}")
+            return None
+
+        self._expire_unattached()
+        viewer_id = uuid.uuid4().hex
+        self._views[viewer_id] = view
+        self._unattached[viewer_id] = time.monotonic()
+        logger.info(f"[DATA EXPLORER] Opened {type(view).__name__} {viewer_id} for {display_name}")
+        return viewer_id
+
+    def on_comm_open(self, comm: BaseComm, msg: dict[str, Any]) -> None:
+        """Handle comm_open - attach the comm to the view named in the open message."""
+        data = msg.get("content", {}).get("data", {}) or {}
+        viewer_id = data.get("viewer_id")
+        logger.info(f"[DATA EXPLORER] on_comm_open called for comm_id: {comm.comm_id}, viewer: {viewer_id}")
+
+        if viewer_id not in self._views:
+            logger.warning(f"[DATA EXPLORER] Unknown viewer {viewer_id}, closing comm")
+            with contextlib.suppress(Exception):
+                comm.close()
+            return
+
+        self._comms[comm.comm_id] = comm
+        self._comm_views[comm.comm_id] = viewer_id
+        self._unattached.pop(viewer_id, None)
+
+        # Register handlers for incoming messages and close
+        comm.on_msg(lambda msg: self.handle_msg(comm, msg))
+        comm.on_close(lambda _msg: self._on_comm_close(comm))
+
+    def handle_msg(self, comm: BaseComm, msg: dict[str, Any]) -> None:
+        """Handle JSON-RPC messages received from the client."""
+        content = msg.get("content", {})
+        data = content.get("data", {})
+
+        # Extract method, id, params
+        method = data.get("method")
+        request_id = data.get("id")
+        params = data.get("params", {}) or {}
+
+        if not method:
+            logger.warning(f"[DATA EXPLORER] No method in message: {data}")
+            return
+
+        logger.info(f"[DATA EXPLORER] Received request: method={method}, id={request_id}")
+
+        result = None
+        error = None
+        reply_method = None
+
+        # Route to appropriate handler
+        try:
+            viewer_id = self._comm_views.get(comm.comm_id, "")
+            view = self._views.get(viewer_id)
+            if view is None:
+                error = "Data explorer view is closed"
+
+            elif method == "get_state":
+                result = self._get_state(view)
+                reply_method = "get_state_reply"
+
+            elif method == "get_schema":
+                start = params.get("start_index", 0) or 0
+                count = params.get("num_columns")
+                result = self._get_schema(view, start, count)
+                reply_method = "get_schema_reply"
+
+            elif method == "get_data_values":
+                row_start = params.get("row_start_index", 0) or 0
+                num_rows = params.get("num_rows", 0) or 0
+                column_indices = params.get("column_indices")
+                result = self._get_data_values(view, row_start, num_rows, column_indices)
+                reply_method = "get_data_values_reply"
+
+            elif method == "get_column_profiles":
+                column_indices = params.get("column_indices")
+                query_types = params.get("query_types", ["summary_stats"])
+                summary = summarize_table(view, query_types, view.version, column_indices)
+                result = {"profiles": summary["column_profiles"], "sampled": summary["sampled"]}
+                reply_method = "get_column_profiles_reply"
+
+            elif method == "set_sort_columns":
+                view.sort_keys = list(params.get("sort_keys", []) or [])
+                self._apply_row_order(viewer_id, view)
+                result = self._get_state(view)
+                reply_method = "set_sort_columns_reply"
+
+            elif method == "set_row_filters":
+                view.row_filters = list(params.get("filters", []) or [])
+                had_errors = self._apply_row_order(viewer_id, view)
+                result = {
+                    "selected_num_rows": self._get_state(view)["table_shape"]["num_rows"],
+                    "had_errors": had_errors
+                }
+                reply_method = "set_row_filters_reply"
+
+            else:
+                error = f"Method not found: {method}"
+
+        except Exception as e:
+            logger.error(f"[DATA EXPLORER] Error in handler: {e}", exc_info=True)
+            error = f"Internal error: {e!s}"
+
+        # Send response
+        response = {
+            "jsonrpc": "2.0"
+        }
+
+        if error:
+            response["error"] = {"message": error}
+        else:
+            # Same adjacently-tagged reply format as the variables comm
+            method_name = "".join(word.capitalize() for word in reply_method.split("_"))
+            response["result"] = {
+                "method": method_name,
+                "result": result
+            }
+
+        if request_id:
+            response["id"] = request_id
+
+        comm.send(response)
+
+    def refresh(self, changed: set[str], removed: set[str], resolve: Callable[[list[str]], Any]) -> None:
+        """
+        Re-point views whose root variable changed and close views whose root was removed.
+
+        resolve maps a variable path to its current object, or None.
+        """
+        self._expire_unattached()
+        for viewer_id, view in list(self._views.items()):
+            root = view.path[0]
+            if root in removed:
+                self._close_view(viewer_id)
+            elif root in changed:
+                table = resolve(view.path)
+                if table is None or not view.accepts(table):
+                    self._close_view(viewer_id)
+                    continue
+                view.set_table(table)
+                self._row_orders.discard_viewer(viewer_id)
+                self._apply_row_order(viewer_id, view)
+                self._send_to_view(viewer_id, "data_update", self._get_state(view))
+
+    def shutdown(self) -> None:
+        """Shutdown data explorer service and close all comms."""
+        for comm in self._comms.values():
+            with contextlib.suppress(Exception):
+                comm.close()
+        self._comms.clear()
+        self._comm_views.clear()
+        self._views.clear()
+        self._unattached.clear()
+        self._row_orders.clear()
+
+    def _get_state(self, view: TableView) -> dict[str, Any]:
+        num_columns = view.shape()[1]
+        num_rows = view.num_rows()
+        return {
+            "display_name": view.display_name,
+            "table_shape": {
+                "num_rows": int(num_rows),
+                "num_columns": int(num_columns)
+            },
+            "sort_keys": view.sort_keys,
+            "row_filters": view.row_filters,
+            "version": view.version
+        }
+
+    def _apply_row_order(self, viewer_id: str, view: TableView) -> bool:
+        """
+        Recompute the view's row order from its sort and filter specs.
+
+        The permutation and each filter's mask are cached separately, so changing
+        a filter reuses the sort and the other filters, and scrolling never
+        recomputes anything. Returns whether any filter failed (and was ignored).
+        """
+        if view.pushdown:
+            return view.apply_query()
+
+        had_errors = False
+        base = (viewer_id, view.version)
+
+        permutation = None
+        if view.sort_keys:
+            key = (*base, "sort", _spec_key(view.sort_keys))
+            permutation = self._row_orders.get(key)
+            if permutation is None:
+                permutation = view.sort_order(view.sort_keys)
+                self._row_orders.put(key, permutation)
+
+        mask = None
+        for row_filter in view.row_filters:
+            key = (*base, "filter", _spec_key(row_filter))
+            row_mask = self._row_orders.get(key)
+            if row_mask is None:
+                try:
+                    row_mask = view.filter_mask(row_filter)
+                except Exception as e:
+                    logger.warning(f"[DATA EXPLORER] Ignoring invalid filter {row_filter}: {e}")
+                    had_errors = True
+                    continue
+                self._row_orders.put(key, row_mask)
+            mask = row_mask if mask is None else (mask & row_mask)
+
+        if permutation is not None and mask is not None:
+            key = (*base, "order", _spec_key(view.sort_keys), _spec_key(view.row_filters))
+            row_order = self._row_orders.get(key)
+            if row_order is None:
+                row_order = combine_row_order(permutation, mask)
+                self._row_orders.put(key, row_order)
+            view.row_order = row_order
+        else:
+            view.row_order = combine_row_order(permutation, mask)
+        return had_errors
+
+    def _get_schema(self, view: TableView, start: int, count: int | None) -> dict[str, Any]:
+        num_columns = view.shape()[1]
+        start = max(0, int(start))
+        stop = num_columns if count is None else min(num_columns, start + max(0, int(count)))
+        return {"columns": [view.column_schema(i) for i in range(start, stop)]}
+
+    def _get_data_values(
+        self,
+        view: TableView,
+        row_start: int,
+        num_rows: int,
+        column_indices: list[int] | None
+    ) -> dict[str, Any]:
+        total_columns = view.shape()[1]
+        total_rows = view.num_rows()
+        if column_indices is None:
+            column_indices = list(range(total_columns))
+        column_indices = [int(i) for i in column_indices if 0 <= int(i) < total_columns]
+
+        # Clamp the window, so one request never formats more than MAX_WINDOW_CELLS cells
+        max_rows = self.MAX_WINDOW_ROWS
+        if column_indices:
+            max_rows = min(max_rows, max(1, self.MAX_WINDOW_CELLS // len(column_indices)))
+        start = min(max(0, int(row_start)), total_rows)
+        stop = min(total_rows, start + min(max(0, int(num_rows)), max_rows))
+
+        # Sorted or filtered views read the window's rows through the cached row order
+        rows: slice | Any = slice(start, stop)
+        if view.row_order is not None:
+            rows = view.row_order[start:stop]
+        columns, row_labels = view.window(rows, column_indices)
+
+        return {
+            "columns": columns,
+            "row_labels": row_labels,
+            "row_start_index": start,
+            "num_rows": stop - start
+        }
+
+    def _send_to_view(self, viewer_id: str, method: str, params: dict[str, Any]) -> None:
+        for comm_id, comm_viewer_id in list(self._comm_views.items()):
+            if comm_viewer_id != viewer_id:
+                continue
+            try:
+                self._comms[comm_id].send({
+                    "method": method,
+                    "params": params
+                })
+            except Exception as e:
+                logger.warning(f"[DATA EXPLORER] Failed to send {method} event: {e}")
+
+    def _expire_unattached(self) -> None:
+        """Drop views whose frontend never connected, so they stop pinning their tables."""
+        deadline = time.monotonic() - self.UNATTACHED_VIEW_SECONDS
+        for viewer_id, opened in list(self._unattached.items()):
+            if opened < deadline:
+                logger.info(f"[DATA EXPLORER] No comm attached to {viewer_id}, closing it")
+                self._close_view(viewer_id)
+
+    def _close_view(self, viewer_id: str) -> None:
+        self._views.pop(viewer_id, None)
+        self._unattached.pop(viewer_id, None)
+        self._row_orders.discard_viewer(viewer_id)
+        for comm_id, comm_viewer_id in list(self._comm_views.items()):
+            if comm_viewer_id == viewer_id:
+                del self._comm_views[comm_id]
+                comm = self._comms.pop(comm_id, None)
+                if comm is not None:
+                    with contextlib.suppress(Exception):
+                        comm.close()
+
+    def _on_comm_close(self, comm: BaseComm) -> None:
+        self._comms.pop(comm.comm_id, None)
+        viewer_id = self._comm_views.pop(comm.comm_id, None)
+        # Drop the view (and its reference to the table) once no comm shows it
+        if viewer_id is not None and viewer_id not in self._comm_views.values():
+            self._views.pop(viewer_id, None)
+            self._row_orders.discard_viewer(viewer_id)
@@ -5,13 +5,14 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import json
 import logging
 import os
 import subprocess
 import sys
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
+from .package_inventory import PackageInventory, requirement_name
+
 if TYPE_CHECKING:
     from comm.base_comm import BaseComm
 
@@ -24,6 +25,9 @@ class EnvironmentService:
     def __init__(self):
         # Store active comm channels by comm_id to respond on correct channel
         self._comms: Dict[str, BaseComm] = {}
+        
+        # Installed distributions, re-read only when site-packages changes
+        self._inventory = PackageInventory()
 
     def on_comm_open(self, comm: BaseComm, _msg: Dict[str, Any]) -> None:
         logger.info(f"[ENV SERVICE] on_comm_open called for comm_id: {comm.comm_id}")
@@ -145,28 +149,19 @@ class EnvironmentService:
             return []
 
     def _list_python_packages(self) -> List[Dict[str, Any]]:
-        """List installed Python packages using pip list."""
+        """List installed Python packages from the cached in-process inventory."""
         try:
-            # Use pip list to get package information
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "list", "--format=json"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            packages_data = json.loads(result.stdout)
-            
             packages = []
-            for pkg_data in packages_data:
+            for package in self._inventory.packages():
                 packages.append({
-                    "name": pkg_data["name"],
-                    "version": pkg_data["version"],
-                    "description": None,  # Not available from pip list
-                    "location": None,     # Not available from pip list
+                    "name": package["name"],
+                    "version": package["version"],
+                    "description": package["summary"],
+                    "location": package["location"],
                     "is_loaded": None,    # Not applicable for Python
                     "priority": None,     # Not applicable for Python
-                    "editable": False,    # Not available from pip list
+                    "editable": package["editable"],
+                    "requires": package["requires"],
                 })
             
             return packages
@@ -177,23 +172,20 @@ class EnvironmentService:
     def _get_package_info(self, package_name: str) -> Dict[str, Any]:
         """Get detailed information about a Python package."""
         try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "show", package_name],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            package = self._inventory.get(package_name)
+            if package is None:
+                return {}
             
-            info = {}
-            for line in result.stdout.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    info[key.strip().lower()] = value.strip()
-            
-            # Check if package is editable
-            info["editable"] = "-e" in info.get("location", "")
-            
-            return info
+            # Same keys as pip show
+            return {
+                "name": package["name"],
+                "version": package["version"],
+                "summary": package["summary"] or "",
+                "location": package["location"] or "",
+                "requires": ", ".join(requirement_name(requirement) for requirement in package["requires"]),
+                "required-by": ", ".join(package["required_by"]),
+                "editable": package["editable"],
+            }
         except Exception:
             return {}
 
@@ -248,6 +240,7 @@ class EnvironmentService:
                 return {"success": False, "error": error_msg}
             
             logger.info(f"[ENV SERVICE] Successfully installed {package_name}")
+            self._inventory.invalidate()
             return {"success": True, "error": None}
         except Exception as e:
             error_msg = f"Failed to install Python package {package_name}: {str(e)}"
@@ -455,6 +448,7 @@ class EnvironmentService:
                 return {"success": False, "error": error_msg}
             
             logger.info(f"[ENV SERVICE] Successfully uninstalled {package_name}")
+            self._inventory.invalidate()
             return {"success": True, "error": None}
         except Exception as e:
             error_msg = f"Failed to uninstall Python package {package_name}: {str(e)}"
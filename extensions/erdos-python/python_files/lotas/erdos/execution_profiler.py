@@ -0,0 +1,370 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Per-execution timing, memory and optional profiling, reported over a comm."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .allocation_tracker import AllocationTracker
+
+if TYPE_CHECKING:
+    from comm.base_comm import BaseComm
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("none", "cprofile", "sampling")
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    Overhead is one sys._current_frames() call per interval, independent of how
+    many functions the cell calls, so it can stay on for every execution.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        # (filename, line, function) -> samples with the function on top of the stack / anywhere in it
+        self.self_counts: collections.Counter = collections.Counter()
+        self.total_counts: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="erdos-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            # Documented in sys, despite the underscore; the only way to see another thread's stack
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            if frame is None:
+                continue
+            self.samples += 1
+            self.self_counts[_frame_key(frame)] += 1
+            seen = set()
+            while frame is not None:
+                key = _frame_key(frame)
+                # Recursive functions count once per sample
+                if key not in seen:
+                    seen.add(key)
+                    self.total_counts[key] += 1
+                frame = frame.f_back
+
+    def top_functions(self, limit: int) -> list[dict[str, Any]]:
+        return [
+            {
+                "function": _format_key(key),
+                "self_samples": count,
+                "total_samples": self.total_counts[key],
+                "self_time": count * self.interval,
+                "total_time": self.total_counts[key] * self.interval,
+            }
+            for key, count in self.self_counts.most_common(limit)
+        ]
+
+
+class ExecutionProfilerService:
+    """
+    Measures every cell execution and reports it to the frontend.
+
+    pre_run_cell and post_execute hooks bracket the cell and record wall time,
+    CPU time, the change in resident memory and the growth of the peak RSS,
+    plus the hot functions when a profiler is enabled ("cprofile" for exact
+    call counts, "sampling" for low overhead) and the allocation sites when
+    allocation tracking is on. The post_run_cell hook sends the record as an
+    "execution_timing" event and keeps it in a bounded history.
+    """
+
+    MAX_HISTORY = 200
+
+    def __init__(self):
+        # Store active comm channels by comm_id
+        self._comms: dict[str, BaseComm] = {}
+
+        self.profiler = "none"
+        self.top_functions = 20
+        self.sample_interval = 0.005
+
+        self._history: collections.deque[dict[str, Any]] = collections.deque(maxlen=self.MAX_HISTORY)
+        self._start: tuple[float, float, int | None, int | None] | None = None
+        self._record: dict[str, Any] | None = None
+        self._cell_preview = ""
+        self._active_profiler: Any = None
+        self._process: Any = None
+        self._allocations = AllocationTracker()
+
+    def on_comm_open(self, comm: BaseComm, _msg: dict[str, Any]) -> None:
+        """Handle comm_open - register message handler."""
+        logger.info(f"[EXECUTION PROFILER] on_comm_open called for comm_id: {comm.comm_id}")
+        self._comms[comm.comm_id] = comm
+        comm.on_msg(lambda msg: self.handle_msg(comm, msg))
+
+    def handle_msg(self, comm: BaseComm, msg: dict[str, Any]) -> None:
+        """Handle JSON-RPC messages received from the client."""
+        data = msg.get("content", {}).get("data", {})
+        method = data.get("method")
+        request_id = data.get("id")
+        params = data.get("params", {}) or {}
+
+        result = None
+        error = None
+        reply_method = None
+        try:
+            if method == "configure":
+                result = self.configure(**params)
+                reply_method = "configure_reply"
+
+            elif method == "get_history":
+                limit = params.get("limit")
+                history = list(self._history)
+                result = {"executions": history[-limit:] if limit else history}
+                reply_method = "get_history_reply"
+
+            elif method == "clear":
+                self._history.clear()
+                result = {}
+                reply_method = "clear_reply"
+
+            else:
+                error = f"Method not found: {method}"
+
+        except Exception as e:
+            logger.error(f"[EXECUTION PROFILER] Error in handler: {e}", exc_info=True)
+            error = f"Internal error: {e!s}"
+
+        response: dict[str, Any] = {"jsonrpc": "2.0"}
+        if error:
+            response["error"] = {"message": error}
+        else:
+            method_name = "".join(word.capitalize() for word in reply_method.split("_"))
+            response["result"] = {"method": method_name, "result": result}
+        if request_id:
+            response["id"] = request_id
+        comm.send(response)
+
+    def configure(
+        self,
+        *,
+        profiler: str | None = None,
+        top_functions: int | None = None,
+        sample_interval: float | None = None,
+        track_allocations: bool | None = None,
+        allocation_frames: int | None = None,
+        allocation_sites: int | None = None,
+        snapshot_every: int | None = None,
+    ) -> dict[str, Any]:
+        """Change the profiler and its settings; return the current settings."""
+        allocations = self._allocations
+        if allocation_sites is not None:
+            allocations.top_sites = max(1, int(allocation_sites))
+        if snapshot_every is not None:
+            allocations.snapshot_every = max(1, int(snapshot_every))
+        if track_allocations is not None and not track_allocations:
+            allocations.stop()
+        elif track_allocations or (allocation_frames is not None and allocations.active):
+            allocations.start(allocation_frames)
+        elif allocation_frames is not None:
+            allocations.frames = max(1, min(int(allocation_frames), 64))
+
+        if profiler is not None:
+            if profiler not in PROFILERS:
+                raise ValueError(f"Unknown profiler: {profiler}")
+            self.profiler = profiler
+        if top_functions is not None:
+            self.top_functions = max(1, int(top_functions))
+        if sample_interval is not None:
+            self.sample_interval = max(0.001, float(sample_interval))
+        return {
+            "profiler": self.profiler,
+            "top_functions": self.top_functions,
+            "sample_interval": self.sample_interval,
+            "track_allocations": allocations.active,
+            "allocation_frames": allocations.frames,
+            "allocation_sites": allocations.top_sites,
+            "snapshot_every": allocations.snapshot_every,
+        }
+
+    def pre_run_cell(self, info: Any) -> None:
+        """IPython pre_run_cell hook - take the starting measurements."""
+        raw_cell = getattr(info, "raw_cell", None) or ""
+        self._cell_preview = raw_cell.strip().split("\n", 1)[0][:80]
+
+        self._active_profiler = None
+        self._record = None
+        try:
+            if self.profiler == "cprofile":
+                import cProfile
+                self._active_profiler = cProfile.Profile()
+            elif self.profiler == "sampling":
+                self._active_profiler = SamplingProfiler(threading.get_ident(), self.sample_interval)
+        except Exception as e:
+            logger.warning(f"[EXECUTION PROFILER] Failed to create {self.profiler} profiler: {e}")
+
+        try:
+            self._allocations.before_execution()
+        except Exception as e:
+            logger.warning(f"[EXECUTION PROFILER] Failed to reset the allocation peak: {e}")
+        self._start = (time.perf_counter(), time.process_time(), self._rss(), _peak_rss())
+
+        # Started last, so the measurements above are not profiled
+        if self._active_profiler is not None:
+            try:
+                if isinstance(self._active_profiler, SamplingProfiler):
+                    self._active_profiler.start()
+                else:
+                    self._active_profiler.enable()
+            except ValueError as e:
+                # Another profiler (%prun, a debugger) already holds the profiling hook
+                logger.warning(f"[EXECUTION PROFILER] Profiler not started: {e}")
+                self._active_profiler = None
+
+    def post_execute(self) -> None:
+        """IPython post_execute hook - take the closing measurements."""
+        profiler, self._active_profiler = self._active_profiler, None
+        wall_end, cpu_end = time.perf_counter(), time.process_time()
+        if isinstance(profiler, SamplingProfiler):
+            profiler.stop()
+        elif profiler is not None:
+            profiler.disable()
+
+        if self._start is None:
+            return
+        wall_start, cpu_start, rss_start, peak_start = self._start
+        self._start = None
+        rss_end = self._rss()
+        peak_end = _peak_rss()
+
+        record: dict[str, Any] = {
+            "execution_count": None,
+            "cell": self._cell_preview,
+            "success": True,
+            "wall_time": wall_end - wall_start,
+            "cpu_time": cpu_end - cpu_start,
+            "rss_delta": None if rss_start is None or rss_end is None else rss_end - rss_start,
+            "peak_rss_delta": None if peak_start is None or peak_end is None else peak_end - peak_start,
+            "rss": rss_end,
+            "profiler": "none",
+            "hot_functions": [],
+            "allocations": None,
+        }
+        if profiler is not None:
+            try:
+                record["profiler"] = "sampling" if isinstance(profiler, SamplingProfiler) else "cprofile"
+                record["hot_functions"] = self._hot_functions(profiler)
+            except Exception as e:
+                logger.warning(f"[EXECUTION PROFILER] Failed to summarize profile: {e}")
+        try:
+            record["allocations"] = self._allocations.after_execution()
+        except Exception as e:
+            logger.warning(f"[EXECUTION PROFILER] Failed to summarize allocations: {e}")
+        self._record = record
+
+    def post_run_cell(self, result: Any) -> None:
+        """IPython post_run_cell hook - send the execution's measurements."""
+        if self._start is not None:
+            # post_execute did not run (the hook was not registered)
+            self.post_execute()
+        record, self._record = self._record, None
+        if record is None:
+            return
+        record["execution_count"] = getattr(result, "execution_count", None)
+        record["success"] = bool(getattr(result, "success", True))
+
+        self._history.append(record)
+        for comm in list(self._comms.values()):
+            self._send_event(comm, "execution_timing", record)
+
+    def _send_event(self, comm: BaseComm, method: str, params: dict[str, Any]) -> None:
+        """Send an event to the frontend."""
+        try:
+            comm.send({"method": method, "params": params})
+        except Exception as e:
+            logger.error(f"[EXECUTION PROFILER] Failed to send event: {e}")
+
+    def shutdown(self) -> None:
+        """Shutdown the service and close all comms."""
+        self._allocations.stop()
+        for comm in self._comms.values():
+            with contextlib.suppress(Exception):
+                comm.close()
+        self._comms.clear()
+
+    def _hot_functions(self, profiler: Any) -> list[dict[str, Any]]:
+        if isinstance(profiler, SamplingProfiler):
+            return profiler.top_functions(self.top_functions)
+
+        import pstats
+        stats = pstats.Stats(profiler).stats
+        # (file, line, name) -> (primitive calls, total calls, own time, cumulative time, callers)
+        top = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_functions]
+        return [
+            {
+                "function": _format_key(key),
+                "calls": total_calls,
+                "self_time": own_time,
+                "total_time": cumulative_time,
+            }
+            for key, (_, total_calls, own_time, cumulative_time, _) in top
+        ]
+
+    def _rss(self) -> int | None:
+        """Current resident set size of the kernel process, if psutil is available."""
+        if self._process is None:
+            try:
+                import psutil
+                self._process = psutil.Process(os.getpid())
+            except Exception:
+                self._process = False
+        if not self._process:
+            return None
+        try:
+            return int(self._process.memory_info().rss)
+        except Exception:
+            return None
+
+
+def _peak_rss() -> int | None:
+    """The process's peak resident set size in bytes, if the platform reports it."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    except Exception:
+        pass
+    try:
+        import psutil
+        # Windows tracks the peak working set
+        return int(psutil.Process(os.getpid()).memory_info().peak_wset)
+    except Exception:
+        return None
+
+
+def _frame_key(frame: Any) -> tuple[str, int, str]:
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _format_key(key: tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == "~":
+        # cProfile's key for built-in functions
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
@@ -0,0 +1,378 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Chunked, size-capped export of tables for copying, spilled to a temp file when large."""
+
+from __future__ import annotations
+
+import csv
+import html
+import io
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .data_explorer import TableView, _is_instance
+
+logger = logging.getLogger(__name__)
+
+# Rows formatted and written per chunk
+EXPORT_CHUNK_ROWS = 10_000
+
+# Exports up to this size are returned inline; larger ones are written to a temp file
+INLINE_EXPORT_BYTES = 4 * 1024 * 1024
+
+# Exports stop (and are marked truncated) past this size
+MAX_EXPORT_BYTES = 1024 * 1024 * 1024
+
+# Progress is reported at most this often (seconds)
+PROGRESS_INTERVAL = 0.25
+
+TEXT_FORMATS = {
+    "text/csv": ".csv",
+    "text/tab-separated-values": ".tsv",
+    "text/markdown": ".md",
+    "text/html": ".html",
+}
+PARQUET_FORMAT = "application/vnd.apache.parquet"
+
+# Temp files handed to the frontend, removed by cleanup_exports()
+_export_files: List[str] = []
+
+# Bytes kept free under the cap for the closing footer
+_FOOTER_RESERVE = 64
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def is_export_format(format_type: str) -> bool:
+    """Whether format_type is one of the chunked table export formats."""
+    return format_type in TEXT_FORMATS or format_type == PARQUET_FORMAT
+
+
+def export_table(
+    view: TableView,
+    format_type: str,
+    progress: Optional[ProgressCallback] = None,
+    inline_limit: int = INLINE_EXPORT_BYTES,
+    max_bytes: int = MAX_EXPORT_BYTES
+) -> Dict[str, Any]:
+    """
+    Export a table in a text format or as Parquet, EXPORT_CHUNK_ROWS rows at a time.
+    
+    Returns {"content", "path", "format", "num_rows", "size", "truncated"}. Text
+    that fits in inline_limit bytes comes back as content; anything larger, and
+    all Parquet, is written to a temp file whose path is returned instead.
+    progress, if given, is called with {"format", "rows_written", "total_rows",
+    "size"} as chunks are written.
+    """
+    if format_type == PARQUET_FORMAT:
+        return _export_parquet(view.table, progress, max_bytes)
+    if format_type not in TEXT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format_type}")
+    
+    total_rows, num_columns = view.shape()
+    column_indices = list(range(num_columns))
+    header = [view.column_schema(i)["column_name"] for i in column_indices]
+    # Tables with meaningful row labels (a pandas index) export them as a first column
+    with_labels = view.row_labels(slice(0, 0)) is not None
+    if with_labels:
+        header.insert(0, "")
+    
+    sink = _ExportSink(format_type, TEXT_FORMATS[format_type], inline_limit, max_bytes, progress, total_rows)
+    try:
+        sink.write(_format_header(format_type, header).encode(), 0)
+        rows_written = 0
+        while rows_written < total_rows and not sink.truncated:
+            stop = min(rows_written + EXPORT_CHUNK_ROWS, total_rows)
+            # Exact formatting: exports must not round floats or cut text like the viewer does
+            columns, labels = view.window(slice(rows_written, stop), column_indices, exact=True)
+            if with_labels:
+                columns = [labels, *columns]
+            rows = [list(row) for row in zip(*columns)] if columns else [[] for _ in range(stop - rows_written)]
+            data = _format_rows(format_type, rows).encode()
+            if len(data) > sink.remaining():
+                # Keep the rows that still fit under the cap, then stop
+                data, fitting = _fit_rows(format_type, rows, sink.remaining())
+                sink.write(data, fitting)
+                sink.truncated = True
+                break
+            sink.write(data, stop - rows_written)
+            rows_written = stop
+        sink.write(_format_footer(format_type).encode(), 0, force=True)
+    except BaseException:
+        sink.discard()
+        raise
+    return sink.finish()
+
+
+def export_text(text: str, format_type: str, inline_limit: int = INLINE_EXPORT_BYTES) -> Dict[str, Any]:
+    """Return text inline, or in a temp file if it is larger than inline_limit bytes."""
+    data = text.encode()
+    sink = _ExportSink(format_type, ".txt", inline_limit, len(data), None, 0)
+    sink.write(data, 0)
+    return sink.finish()
+
+
+def cleanup_exports() -> None:
+    """Remove the temp files written by earlier exports."""
+    while _export_files:
+        path = _export_files.pop()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class _ExportSink:
+    """Collects encoded chunks in memory, moving them to a temp file once past the inline limit."""
+    
+    def __init__(
+        self,
+        format_type: str,
+        suffix: str,
+        inline_limit: int,
+        max_bytes: int,
+        progress: Optional[ProgressCallback],
+        total_rows: int
+    ):
+        self.format_type = format_type
+        self.suffix = suffix
+        self.inline_limit = inline_limit
+        self.max_bytes = max_bytes
+        self.progress = progress
+        self.total_rows = total_rows
+        
+        self.size = 0
+        self.rows_written = 0
+        self.truncated = False
+        self._chunks: List[bytes] = []
+        self._file: Optional[Any] = None
+        self._path: Optional[str] = None
+        self._last_progress = time.monotonic()
+    
+    def remaining(self) -> int:
+        # Room is kept for a closing footer
+        return max(0, self.max_bytes - self.size - _FOOTER_RESERVE)
+    
+    def write(self, data: bytes, num_rows: int, force: bool = False) -> None:
+        if not force and self.size + len(data) > self.max_bytes:
+            self.truncated = True
+            return
+        self.size += len(data)
+        self.rows_written += num_rows
+        
+        if self._file is None and self.size > self.inline_limit:
+            self._spill()
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._chunks.append(data)
+        
+        now = time.monotonic()
+        if self.progress is not None and num_rows and now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress({
+                "format": self.format_type,
+                "rows_written": self.rows_written,
+                "total_rows": self.total_rows,
+                "size": self.size,
+            })
+    
+    def finish(self) -> Dict[str, Any]:
+        result = {
+            "content": "",
+            "path": None,
+            "format": self.format_type,
+            "num_rows": self.rows_written,
+            "size": self.size,
+            "truncated": self.truncated,
+        }
+        if self._file is not None:
+            self._file.close()
+            result["path"] = self._path
+        else:
+            result["content"] = b"".join(self._chunks).decode()
+        return result
+    
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            _remove_export(self._path)
+    
+    def _spill(self) -> None:
+        self._file, self._path = _open_export_file(self.suffix)
+        for chunk in self._chunks:
+            self._file.write(chunk)
+        self._chunks = []
+
+
+def _export_parquet(table: Any, progress: Optional[ProgressCallback], max_bytes: int) -> Dict[str, Any]:
+    """Write a table to a Parquet temp file one record batch at a time."""
+    import pyarrow.parquet as pq
+    
+    file, path = _open_export_file(".parquet")
+    rows_written = 0
+    truncated = False
+    last_progress = time.monotonic()
+    try:
+        writer = None
+        for batch in _record_batches(table, EXPORT_CHUNK_ROWS):
+            if writer is None:
+                writer = pq.ParquetWriter(file, batch.schema)
+            writer.write_batch(batch)
+            rows_written += batch.num_rows
+            
+            size = file.tell()
+            if size > max_bytes:
+                truncated = True
+                break
+            now = time.monotonic()
+            if progress is not None and now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                progress({
+                    "format": PARQUET_FORMAT,
+                    "rows_written": rows_written,
+                    "total_rows": None,
+                    "size": size,
+                })
+        if writer is not None:
+            writer.close()
+        file.close()
+    except BaseException:
+        file.close()
+        _remove_export(path)
+        raise
+    
+    return {
+        "content": "",
+        "path": path,
+        "format": PARQUET_FORMAT,
+        "num_rows": rows_written,
+        "size": os.path.getsize(path),
+        "truncated": truncated,
+    }
+
+
+def _record_batches(table: Any, chunk_rows: int) -> Iterator[Any]:
+    """Yield a table as Arrow record batches of at most chunk_rows rows."""
+    import pyarrow as pa
+    
+    if _is_instance(table, "pandas.DataFrame"):
+        for start in range(0, len(table), chunk_rows):
+            chunk = pa.Table.from_pandas(table.iloc[start:start + chunk_rows], preserve_index=None)
+            yield from chunk.to_batches()
+    elif _is_instance(table, "numpy.ndarray"):
+        columns = [table] if table.ndim == 1 else [table[:, i] for i in range(table.shape[1])]
+        names = [str(i) for i in range(len(columns))]
+        for start in range(0, len(columns[0]) if columns else 0, chunk_rows):
+            yield pa.record_batch([pa.array(column[start:start + chunk_rows]) for column in columns], names=names)
+    elif _is_instance(table, "polars.DataFrame"):
+        for start in range(0, table.height, chunk_rows):
+            yield from table.slice(start, chunk_rows).to_arrow().to_batches()
+    elif _is_instance(table, "polars.LazyFrame"):
+        yield from _lazy_frame_batches(table, chunk_rows)
+    elif _is_instance(table, "pyarrow.Table"):
+        yield from table.to_batches(max_chunksize=chunk_rows)
+    elif _is_instance(table, "pyarrow.RecordBatch"):
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows)
+    elif _is_instance(table, "pyarrow.Dataset"):
+        yield from table.to_batches(batch_size=chunk_rows)
+    elif _is_instance(table, "_duckdb.DuckDBPyRelation") or _is_instance(table, "duckdb.DuckDBPyRelation"):
+        yield from table.fetch_record_batch(chunk_rows)
+    else:
+        raise ValueError(f"Cannot export {type(table).__name__} as Parquet")
+
+
+def _lazy_frame_batches(table: Any, chunk_rows: int) -> Iterator[Any]:
+    """Run a polars LazyFrame in streaming mode, yielding Arrow record batches as chunks are produced."""
+    if not hasattr(table, "collect_batches"):
+        # Older polars: collect one slice at a time, so at most a chunk is in memory
+        start = 0
+        while True:
+            frame = table.slice(start, chunk_rows).collect()
+            if frame.height == 0:
+                return
+            yield from frame.to_arrow().to_batches()
+            start += frame.height
+    
+    batches = table.collect_batches(chunk_size=chunk_rows, lazy=True)
+    try:
+        for frame in batches:
+            yield from frame.to_arrow().to_batches()
+    finally:
+        # Stops the query when the export ends early, at the size cap
+        stop = getattr(batches, "stop", None)
+        if stop is not None:
+            stop()
+
+
+def _fit_rows(format_type: str, rows: List[List[Optional[str]]], limit: int):
+    """Return (encoded rows, number of rows) for the longest prefix of rows within limit bytes."""
+    fitted = []
+    size = 0
+    for row in rows:
+        data = _format_rows(format_type, [row]).encode()
+        if size + len(data) > limit:
+            break
+        fitted.append(data)
+        size += len(data)
+    return b"".join(fitted), len(fitted)
+
+
+def _format_header(format_type: str, names: List[str]) -> str:
+    if format_type == "text/markdown":
+        return _markdown_row(names) + "| " + " | ".join("---" for _ in names) + " |\n"
+    if format_type == "text/html":
+        cells = "".join(f"<th>{html.escape(name)}</th>" for name in names)
+        return f"<table>\n<thead><tr>{cells}</tr></thead>\n<tbody>\n"
+    return _delimited_rows(format_type, [names])
+
+
+def _format_rows(format_type: str, rows: List[List[Optional[str]]]) -> str:
+    if format_type == "text/markdown":
+        return "".join(_markdown_row(row) for row in rows)
+    if format_type == "text/html":
+        return "".join(
+            "<tr>" + "".join(f"<td>{html.escape(cell or '')}</td>" for cell in row) + "</tr>\n"
+            for row in rows
+        )
+    return _delimited_rows(format_type, rows)
+
+
+def _format_footer(format_type: str) -> str:
+    if format_type == "text/html":
+        return "</tbody>\n</table>\n"
+    return ""
+
+
+def _delimited_rows(format_type: str, rows: List[List[Optional[str]]]) -> str:
+    buffer = io.StringIO()
+    delimiter = "\t" if format_type == "text/tab-separated-values" else ","
+    # Missing values are written as empty fields
+    csv.writer(buffer, delimiter=delimiter, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+def _markdown_row(cells: List[Optional[str]]) -> str:
+    escaped = ((cell or "").replace("|", "\\|").replace("\n", " ") for cell in cells)
+    return "| " + " | ".join(escaped) + " |\n"
+
+
+def _open_export_file(suffix: str):
+    fd, path = tempfile.mkstemp(prefix="erdos-export-", suffix=suffix)
+    _export_files.append(path)
+    return os.fdopen(fd, "wb"), path
+
+
+def _remove_export(path: Optional[str]) -> None:
+    if path is None:
+        return
+    try:
+        os.remove(path)
+        _export_files.remove(path)
+    except (OSError, ValueError):
+        pass
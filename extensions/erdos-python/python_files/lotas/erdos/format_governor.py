@@ -0,0 +1,120 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Per-type timing of variable display formatting, with cheap fallbacks for slow types."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _TypeCost:
+    """Running formatting cost of one type."""
+
+    __slots__ = ("calls", "total", "max", "slow_calls", "demoted")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow_calls = 0
+        self.demoted = False
+
+
+class FormatGovernor:
+    """
+    Times display formatting per type and demotes types whose reprs are too slow.
+
+    Every display_value call made through format() is timed and charged to the
+    object's type. A type is demoted for the rest of the session once a single
+    call takes DEMOTE_SECONDS, or SLOW_CALLS_TO_DEMOTE calls take SLOW_SECONDS
+    each; the occasional slow call (a GC pause, a cold import) does not demote
+    on its own. Demoted types are shown with a cheap summary built without
+    calling any of their methods, so one sympy expression or ORM object cannot
+    make every later update slow.
+    """
+
+    SLOW_SECONDS = 0.05
+    SLOW_CALLS_TO_DEMOTE = 3
+    DEMOTE_SECONDS = 0.25
+
+    # Types beyond this many stop being tracked (their calls are still timed for demotion)
+    MAX_TRACKED_TYPES = 5000
+
+    def __init__(self):
+        self._costs: Dict[str, _TypeCost] = {}
+
+    def format(
+        self,
+        obj: Any,
+        display_value: Callable[[Any, int], Tuple[str, bool]],
+        max_length: int
+    ) -> Tuple[str, bool]:
+        """Return display_value(obj, max_length), or a cheap summary if the type is demoted."""
+        key = type_name(type(obj))
+        cost = self._costs.get(key)
+        if cost is not None and cost.demoted:
+            return cheap_summary(obj), True
+
+        start = time.perf_counter()
+        try:
+            return display_value(obj, max_length)
+        finally:
+            self._record(key, cost, time.perf_counter() - start)
+
+    def slowest(self, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """Return the tracked types ordered by their slowest call, slowest first."""
+        ranked = sorted(self._costs.items(), key=lambda item: item[1].max, reverse=True)
+        if limit is not None:
+            ranked = ranked[:max(0, int(limit))]
+        return [
+            {
+                "type": key,
+                "calls": cost.calls,
+                "total_seconds": round(cost.total, 6),
+                "mean_seconds": round(cost.total / cost.calls, 6) if cost.calls else 0.0,
+                "max_seconds": round(cost.max, 6),
+                "slow_calls": cost.slow_calls,
+                "demoted": cost.demoted,
+            }
+            for key, cost in ranked
+        ]
+
+    def reset(self) -> None:
+        """Forget all timings and restore full formatting for demoted types."""
+        self._costs.clear()
+
+    def _record(self, key: str, cost: Optional[_TypeCost], elapsed: float) -> None:
+        if cost is None:
+            if len(self._costs) >= self.MAX_TRACKED_TYPES and elapsed < self.SLOW_SECONDS:
+                return
+            cost = self._costs[key] = _TypeCost()
+
+        cost.calls += 1
+        cost.total += elapsed
+        cost.max = max(cost.max, elapsed)
+        if elapsed >= self.SLOW_SECONDS:
+            cost.slow_calls += 1
+
+        if elapsed >= self.DEMOTE_SECONDS or cost.slow_calls >= self.SLOW_CALLS_TO_DEMOTE:
+            cost.demoted = True
+            logger.info(
+                f"[VARIABLES] Formatting {key} took {elapsed:.3f}s; "
+                f"using summaries for this type from now on"
+            )
+
+
+def type_name(obj_type: type) -> str:
+    """Return the "module.QualName" label of a type."""
+    module = getattr(obj_type, '__module__', None)
+    qualname = getattr(obj_type, '__qualname__', None) or getattr(obj_type, '__name__', '?')
+    return f"{module}.{qualname}" if module and module != 'builtins' else qualname
+
+
+def cheap_summary(obj: Any) -> str:
+    """Summarize an object without calling any method its type may override."""
+    return f"<{type_name(type(obj))} object at {id(obj):#x}>"
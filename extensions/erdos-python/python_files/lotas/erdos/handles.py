@@ -0,0 +1,142 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Stable handles for nested variables, so expanding a node does not re-walk from the root."""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from .inspectors import get_inspector
+
+logger = logging.getLogger(__name__)
+
+# Marks a handle whose object is not cached, since None is a valid object
+_MISSING = object()
+
+
+class ChildHandleTable:
+    """
+    Maps opaque child access keys to the objects they stand for.
+    
+    Every child shown in the Variables pane gets a short handle such as "#12".
+    The table keeps the route to it: the parent (a root variable name or another
+    handle) and the original child key, with its type intact, so int and tuple
+    dict keys resolve exactly. The same (parent, key) pair always maps to the
+    same handle, which keeps the frontend tree stable across refreshes.
+    
+    Resolved objects are cached, so expanding a node at any depth is one lookup.
+    invalidate() drops the cached objects whenever the namespace may have
+    changed; each handle is then re-resolved once through its route. Objects
+    that support weak references are cached weakly; the rest (lists, dicts,
+    scalars) are only held until the next invalidation.
+    """
+    
+    MAX_HANDLES = 100_000
+    PREFIX = "#"
+    
+    def __init__(self, max_handles: int = MAX_HANDLES):
+        self.max_handles = max_handles
+        # handle -> (parent, original key), oldest first
+        self._routes: OrderedDict[str, Tuple[str, Any]] = OrderedDict()
+        # (parent, key type, key) -> handle
+        self._handles: Dict[Tuple[str, type, Any], str] = {}
+        # handle -> (is weak reference, weakref or object)
+        self._objects: Dict[str, Tuple[bool, Any]] = {}
+        self._next_id = 0
+    
+    def __len__(self) -> int:
+        return len(self._routes)
+    
+    def is_handle(self, access_key: Any) -> bool:
+        """Whether access_key is a live handle issued by this table."""
+        return isinstance(access_key, str) and access_key in self._routes
+    
+    def handle_for(self, parent: str, key: Any, obj: Any) -> str:
+        """Return the handle for the child of parent at key, caching obj as its value."""
+        # The key type is part of the token so that 1, 1.0 and True stay distinct
+        token = (parent, type(key), key)
+        try:
+            handle = self._handles.get(token)
+        except TypeError:
+            # Unhashable keys get a fresh handle each time
+            token = None
+            handle = None
+        
+        if handle is None:
+            handle = f"{self.PREFIX}{self._next_id}"
+            self._next_id += 1
+            self._routes[handle] = (parent, key)
+            if token is not None:
+                self._handles[token] = handle
+            self._evict()
+        else:
+            self._routes.move_to_end(handle)
+        
+        self._store(handle, obj)
+        return handle
+    
+    def resolve(self, handle: str, lookup_root: Callable[[str], Any]) -> Any:
+        """
+        Resolve a handle to its object, raising KeyError for unknown handles.
+        
+        lookup_root maps a root variable name to its current value and is only
+        called when the cached object was invalidated.
+        """
+        obj = self._cached(handle)
+        if obj is not _MISSING:
+            self._routes.move_to_end(handle)
+            return obj
+        
+        parent, key = self._routes[handle]
+        if parent in self._routes:
+            parent_obj = self.resolve(parent, lookup_root)
+        else:
+            parent_obj = lookup_root(parent)
+        
+        obj = get_inspector(parent_obj).get_child(parent_obj, key)
+        self._store(handle, obj)
+        return obj
+    
+    def invalidate(self) -> None:
+        """Drop all cached objects, keeping the handles and their routes."""
+        self._objects.clear()
+    
+    def clear(self) -> None:
+        """Forget all handles."""
+        self._routes.clear()
+        self._handles.clear()
+        self._objects.clear()
+    
+    def _cached(self, handle: str) -> Any:
+        entry = self._objects.get(handle)
+        if entry is None:
+            return _MISSING
+        is_weak, value = entry
+        if not is_weak:
+            return value
+        obj = value()
+        if obj is None:
+            del self._objects[handle]
+            return _MISSING
+        return obj
+    
+    def _store(self, handle: str, obj: Any) -> None:
+        try:
+            self._objects[handle] = (True, weakref.ref(obj))
+        except TypeError:
+            self._objects[handle] = (False, obj)
+    
+    def _evict(self) -> None:
+        while len(self._routes) > self.max_handles:
+            handle, (parent, key) = self._routes.popitem(last=False)
+            self._objects.pop(handle, None)
+            try:
+                token = (parent, type(key), key)
+                if self._handles.get(token) == handle:
+                    del self._handles[token]
+            except TypeError:
+                pass
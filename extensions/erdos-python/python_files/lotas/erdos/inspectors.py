@@ -0,0 +1,882 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Type-dispatched inspectors for the Variables pane - summarize objects by type."""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import logging
+import sys
+import weakref
+from typing import Any, Iterable, Iterator
+
+from .previews import pane_repr
+
+logger = logging.getLogger(__name__)
+
+
+class Inspector:
+    """
+    Describes how the Variables pane summarizes objects of one type.
+
+    Inspectors are stateless and shared by every object of the types they are
+    registered for. Each method must be cheap: it may look at sizes, shapes and
+    metadata, but must never materialize or fully repr large objects.
+    """
+
+    kind = "other"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        """Return (value, is_truncated) for the one-line value column."""
+        return pane_repr().preview(obj, max_length)
+
+    def display_type(self, obj: Any) -> str:
+        """Return the short type label shown next to the value."""
+        return type(obj).__name__
+
+    def size(self, obj: Any) -> int:
+        """
+        Return the bytes owned directly by the object.
+
+        This includes native buffers (array data, Arrow buffers) but not other Python
+        objects it references; those are reported by referents() and walked by
+        erdos.sizing.
+        """
+        try:
+            return sys.getsizeof(obj)
+        except Exception:
+            return 0
+
+    def buffer_owner(self, obj: Any) -> Any:  # noqa: ARG002
+        """Return the object owning obj's native buffer when it may be shared, else None."""
+        return None
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:
+        """Return the Python objects owned by obj for deep size walks, and their count."""
+        attrs = getattr(obj, "__dict__", None)
+        if isinstance(attrs, dict):
+            return (attrs,), 1
+        return (), 0
+
+    def length(self, obj: Any) -> int:
+        """Return the length of the object if applicable."""
+        try:
+            return len(obj)
+        except Exception:
+            return 0
+
+    def has_children(self, obj: Any) -> bool:
+        """Whether the object can be expanded in the pane."""
+        attrs = getattr(obj, "__dict__", None)
+        return isinstance(attrs, dict) and any(not name.startswith("_") for name in attrs)
+
+    def has_viewer(self, obj: Any) -> bool:  # noqa: ARG002
+        """Whether a data viewer is available for the object."""
+        return False
+
+    def count_children(self, obj: Any) -> int:
+        """Count the children without materializing them."""
+        attrs = getattr(obj, "__dict__", None)
+        if not isinstance(attrs, dict):
+            return 0
+        return sum(1 for name in attrs if not name.startswith("_"))
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        """
+        Lazily yield (key, value) pairs for the children in [start, stop).
+
+        Keys are the original keys (attribute name, index, dict key, column label)
+        accepted by get_child; child_name turns them into display names.
+        """
+        attrs = getattr(obj, "__dict__", None)
+        if not isinstance(attrs, dict):
+            return
+        public_attrs = ((name, value) for name, value in attrs.items() if not name.startswith("_"))
+        yield from itertools.islice(public_attrs, start, stop)
+
+    def child_name(self, obj: Any, key: Any) -> str:  # noqa: ARG002
+        """Return the display name of the child with the given key."""
+        return str(key)
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        """Resolve the child with the given key, raising on failure."""
+        return getattr(obj, key)
+
+    def fingerprint(self, obj: Any) -> Any:
+        """
+        Return a cheap fingerprint of the object's mutable state.
+
+        Fingerprints never hash whole contents: they only look at sizes, shapes,
+        buffer pointers and the items shown in the display preview.
+        """
+        attrs = getattr(obj, "__dict__", None)
+        if isinstance(attrs, dict):
+            preview = itertools.islice(attrs.values(), 10)
+            return (len(attrs), tuple(id(value) for value in preview))
+        return None
+
+
+class ScalarInspector(Inspector):
+    """Immutable scalars, fully identified by id()."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        # str() of a huge int is quadratic (and refused past sys.get_int_max_str_digits)
+        if isinstance(obj, int) and obj.bit_length() > 4 * max_length:
+            return f"<int with {obj.bit_length()} bits>", True
+        return str(obj), False
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def length(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        return None
+
+
+class StringInspector(ScalarInspector):
+    """Text strings; only the displayed prefix is repr'd."""
+
+    def __init__(self):
+        super().__init__("string")
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        return pane_repr().preview(obj, max_length)
+
+    def length(self, obj: Any) -> int:
+        return len(obj)
+
+
+class BytesInspector(ScalarInspector):
+    """Bytes and bytearrays."""
+
+    def __init__(self):
+        super().__init__("bytes")
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        # Sliced before repr, so huge buffers are never copied
+        return pane_repr().preview(obj, max_length)
+
+    def length(self, obj: Any) -> int:
+        return len(obj)
+
+    def fingerprint(self, obj: Any) -> Any:
+        if isinstance(obj, bytearray):
+            return (len(obj), bytes(obj[:128]))
+        return None
+
+
+class FunctionInspector(Inspector):
+    """Functions, methods and other callables."""
+
+    kind = "function"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        try:
+            module = getattr(obj, "__module__", "")
+            name = getattr(obj, "__name__", None) or type(obj).__name__
+            if module and module != "__main__":
+                return f"<function {module}.{name}>", False
+            return f"<function {name}>", False
+        except Exception:
+            return "<function>", False
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def length(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        # Never walk into closures, globals or class namespaces
+        return (), 0
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        return None
+
+
+class ClassInspector(FunctionInspector):
+    """Classes."""
+
+    kind = "class"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"<class '{obj.__name__}'>", False
+
+
+class SequenceInspector(Inspector):
+    """Lists and tuples, indexed as "[i]"."""
+
+    kind = "collection"
+    MAX_PREVIEW_ITEMS = 5
+
+    def __init__(self, open_bracket: str, close_bracket: str, empty: str):
+        self.open_bracket = open_bracket
+        self.close_bracket = close_bracket
+        self.empty = empty
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        length = len(obj)
+        if length == 0:
+            return self.empty, False
+
+        try:
+            # Preview the first few items, stopping as soon as max_length is reached;
+            # one-element tuples keep their trailing comma
+            return pane_repr(self.MAX_PREVIEW_ITEMS).preview_sequence(
+                obj, self.open_bracket, self.close_bracket, max_length, isinstance(obj, tuple)
+            )
+        except Exception:
+            return f"<{type(obj).__name__} length={length}>", False
+
+    def has_children(self, obj: Any) -> bool:
+        return len(obj) > 0
+
+    def count_children(self, obj: Any) -> int:
+        return len(obj)
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        for i in range(start, min(stop, len(obj))):
+            yield i, obj[i]
+
+    def child_name(self, obj: Any, key: Any) -> str:  # noqa: ARG002
+        return f"[{key}]"
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj[_index_key(key)]
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:
+        return obj, len(obj)
+
+    def fingerprint(self, obj: Any) -> Any:
+        # Tuples are immutable, but the preview shows the identity of their items
+        return (len(obj), tuple(id(item) for item in obj[:self.MAX_PREVIEW_ITEMS]))
+
+
+class SetInspector(SequenceInspector):
+    """Sets, paged in iteration order."""
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        yield from enumerate(itertools.islice(obj, start, stop), start)
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return next(itertools.islice(obj, _index_key(key), None))
+
+    def fingerprint(self, obj: Any) -> Any:
+        if isinstance(obj, frozenset):
+            return None
+        preview = itertools.islice(obj, self.MAX_PREVIEW_ITEMS)
+        return (len(obj), tuple(id(item) for item in preview))
+
+
+class MappingInspector(Inspector):
+    """Dictionaries."""
+
+    kind = "map"
+    MAX_PREVIEW_ITEMS = 3
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        length = len(obj)
+        if length == 0:
+            return "{}", False
+
+        try:
+            # Preview the first few items, stopping as soon as max_length is reached
+            return pane_repr(self.MAX_PREVIEW_ITEMS).preview_mapping(obj, max_length)
+        except Exception:
+            return f"<dict length={length}>", False
+
+    def has_children(self, obj: Any) -> bool:
+        return len(obj) > 0
+
+    def count_children(self, obj: Any) -> int:
+        return len(obj)
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        # Views are sliced, never copied
+        yield from itertools.islice(obj.items(), start, stop)
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj[key]
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:
+        return itertools.chain.from_iterable(obj.items()), 2 * len(obj)
+
+    def fingerprint(self, obj: Any) -> Any:
+        preview = itertools.islice(obj.items(), self.MAX_PREVIEW_ITEMS)
+        return (len(obj), tuple((id(key), id(value)) for key, value in preview))
+
+
+class NumpyArrayInspector(Inspector):
+    """numpy.ndarray, summarized by shape and dtype."""
+
+    kind = "collection"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"<{type(obj).__name__} shape={obj.shape} dtype={obj.dtype}>", False
+
+    def display_type(self, obj: Any) -> str:
+        return f"{type(obj).__name__}[{obj.dtype}]"
+
+    def length(self, obj: Any) -> int:
+        return obj.shape[0] if obj.ndim else 0
+
+    def size(self, obj: Any) -> int:
+        # getsizeof() includes the data only when the array owns it; views report nbytes
+        return max(sys.getsizeof(obj), obj.nbytes)
+
+    def buffer_owner(self, obj: Any) -> Any:
+        # Views share the buffer of the array at the root of their base chain
+        owner = obj
+        while getattr(owner, "base", None) is not None:
+            owner = owner.base
+        return owner
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:
+        if obj.dtype.hasobject:
+            return obj.flat, obj.size
+        return (), 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def has_viewer(self, obj: Any) -> bool:
+        # The data explorer shows vectors and matrices
+        return obj.ndim in (1, 2)
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:
+        # Shape, dtype, data pointer and a few sampled elements
+        interface = obj.__array_interface__
+        samples: Any = b""
+        if obj.size and obj.dtype.hasobject:
+            samples = tuple(id(obj.flat[i]) for i in (0, obj.size // 2, obj.size - 1))
+        elif obj.size:
+            samples = obj.take([0, obj.size // 2, obj.size - 1]).tobytes()
+        return (obj.shape, obj.dtype.str, interface["data"][0], interface["strides"], samples)
+
+
+class NumpyMemmapInspector(NumpyArrayInspector):
+    """numpy.memmap, whose data lives in a file rather than in process memory."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        filename = getattr(obj, "filename", None)
+        return f"<memmap shape={obj.shape} dtype={obj.dtype} file={filename}>", False
+
+    def size(self, obj: Any) -> int:
+        # Mapped pages belong to the OS page cache, not to the kernel process
+        return sys.getsizeof(obj)
+
+
+class PandasDataFrameInspector(Inspector):
+    """pandas.DataFrame, expanded by column."""
+
+    kind = "table"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        rows, cols = obj.shape
+        return f"[{rows} rows x {cols} columns]", False
+
+    def display_type(self, obj: Any) -> str:  # noqa: ARG002
+        return "DataFrame"
+
+    def size(self, obj: Any) -> int:
+        return _pandas_memory_usage(obj, obj.memory_usage(index=True, deep=False).sum())
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        # Object columns are estimated by sampling in size()
+        return (), 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return True
+
+    def has_viewer(self, obj: Any) -> bool:  # noqa: ARG002
+        return True
+
+    def count_children(self, obj: Any) -> int:
+        return len(obj.columns)
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        for col_name in obj.columns[start:stop]:
+            yield col_name, obj[col_name]
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj[key]
+
+    def fingerprint(self, obj: Any) -> Any:
+        # Shape plus block manager and block identity
+        mgr = getattr(obj, "_mgr", None)
+        blocks = tuple(id(block) for block in getattr(mgr, "blocks", ()))
+        return (obj.shape, id(mgr), blocks, id(obj.index), id(obj.columns))
+
+
+class PandasSeriesInspector(Inspector):
+    """pandas.Series, previewed from its first few values."""
+
+    kind = "collection"
+    MAX_PREVIEW_ITEMS = 5
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        return self._preview_values(obj.iloc[:self.MAX_PREVIEW_ITEMS].tolist(), len(obj), max_length)
+
+    def _preview_values(self, values: Any, length: int, max_length: int) -> tuple[str, bool]:
+        more = length > self.MAX_PREVIEW_ITEMS
+        preview, is_truncated = pane_repr(self.MAX_PREVIEW_ITEMS).preview_sequence(
+            values, "[", ", ...]" if more else "]", max_length
+        )
+        return preview, is_truncated or more
+
+    def display_type(self, obj: Any) -> str:
+        return f"Series[{obj.dtype}]"
+
+    def size(self, obj: Any) -> int:
+        return _pandas_memory_usage(obj.to_frame(), obj.memory_usage(index=True, deep=False))
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:
+        # Shape, block identity and the previewed head values, so in-place edits
+        # such as s.iloc[0] = 99 refresh the preview
+        mgr = getattr(obj, "_mgr", None)
+        blocks = tuple(id(block) for block in getattr(mgr, "blocks", ()))
+        head = obj.iloc[:self.MAX_PREVIEW_ITEMS]
+        values = head.to_numpy()
+        if not values.dtype.hasobject:
+            samples: Any = values.tobytes()
+        elif obj.dtype == object:
+            samples = tuple(id(value) for value in values)
+        else:
+            # Extension dtypes convert to fresh objects, so compare their reprs
+            samples = repr(head.tolist())
+        return (obj.shape, id(mgr), blocks, id(obj.index), samples)
+
+
+class PolarsDataFrameInspector(PandasDataFrameInspector):
+    """polars.DataFrame, expanded by column."""
+
+    def size(self, obj: Any) -> int:
+        return int(obj.estimated_size())
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        for col_name in obj.columns[start:stop]:
+            yield col_name, obj.get_column(col_name)
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj.get_column(key)
+
+    def fingerprint(self, obj: Any) -> Any:
+        return (obj.shape, tuple(obj.columns))
+
+
+class PolarsLazyFrameInspector(Inspector):
+    """polars.LazyFrame, summarized from its schema without collecting."""
+
+    kind = "table"
+
+    def _schema(self, obj: Any) -> Any:
+        collect_schema = getattr(obj, "collect_schema", None)
+        return collect_schema() if collect_schema is not None else obj.schema
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"[? rows x {len(self._schema(obj))} columns] (lazy)", False
+
+    def display_type(self, obj: Any) -> str:  # noqa: ARG002
+        return "LazyFrame"
+
+    def size(self, obj: Any) -> int:
+        # Nothing is materialized until the query plan is collected
+        return sys.getsizeof(obj)
+
+    def length(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def has_viewer(self, obj: Any) -> bool:  # noqa: ARG002
+        return True
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        # LazyFrames are immutable query plans
+        return None
+
+
+class ArrowDatasetInspector(PolarsLazyFrameInspector):
+    """pyarrow.dataset.Dataset, summarized from its schema without scanning."""
+
+    def _schema(self, obj: Any) -> Any:
+        return obj.schema
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"[? rows x {len(obj.schema.names)} columns] (dataset)", False
+
+    def display_type(self, obj: Any) -> str:
+        return type(obj).__name__
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        return None
+
+
+class DuckDBRelationInspector(PolarsLazyFrameInspector):
+    """duckdb relations, summarized from their columns without executing the query."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"[? rows x {len(obj.columns)} columns] (relation)", False
+
+    def display_type(self, obj: Any) -> str:  # noqa: ARG002
+        return "DuckDBPyRelation"
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        return None
+
+
+class PolarsSeriesInspector(PandasSeriesInspector):
+    """polars.Series, previewed from its first few values."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:
+        return self._preview_values(obj.head(self.MAX_PREVIEW_ITEMS).to_list(), len(obj), max_length)
+
+    def size(self, obj: Any) -> int:
+        return int(obj.estimated_size())
+
+    def fingerprint(self, obj: Any) -> Any:
+        return (len(obj), str(obj.dtype), repr(obj.head(self.MAX_PREVIEW_ITEMS).to_list()))
+
+
+class ArrowTableInspector(PolarsDataFrameInspector):
+    """pyarrow.Table and RecordBatch, expanded by column."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"[{obj.num_rows} rows x {obj.num_columns} columns]", False
+
+    def length(self, obj: Any) -> int:
+        return obj.num_rows
+
+    def count_children(self, obj: Any) -> int:
+        return obj.num_columns
+
+    def size(self, obj: Any) -> int:
+        return _arrow_buffer_size(obj)
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        for col_name in obj.column_names[start:stop]:
+            yield col_name, obj.column(col_name)
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj.column(key)
+
+    def display_type(self, obj: Any) -> str:
+        return type(obj).__name__
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        # Arrow tables are immutable
+        return None
+
+
+class ArrowArrayInspector(Inspector):
+    """pyarrow.Array and ChunkedArray, summarized by length and type."""
+
+    kind = "collection"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"<{type(obj).__name__} length={len(obj)} type={obj.type}>", False
+
+    def display_type(self, obj: Any) -> str:
+        return f"{type(obj).__name__}[{obj.type}]"
+
+    def size(self, obj: Any) -> int:
+        return _arrow_buffer_size(obj)
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:  # noqa: ARG002
+        return None
+
+
+class XarrayDataArrayInspector(Inspector):
+    """xarray.DataArray, summarized from metadata without loading values."""
+
+    kind = "collection"
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        dims = ", ".join(f"{dim}: {size}" for dim, size in zip(obj.dims, obj.shape))
+        return f"<DataArray ({dims}) dtype={obj.dtype}>", False
+
+    def display_type(self, obj: Any) -> str:
+        return f"DataArray[{obj.dtype}]"
+
+    def size(self, obj: Any) -> int:
+        # Computed from shape and dtype, so lazily loaded arrays are not read
+        return int(obj.nbytes)
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def length(self, obj: Any) -> int:
+        return obj.shape[0] if obj.ndim else 0
+
+    def has_children(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def count_children(self, obj: Any) -> int:  # noqa: ARG002
+        return 0
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:  # noqa: ARG002
+        return iter(())
+
+    def fingerprint(self, obj: Any) -> Any:
+        return (obj.shape, str(obj.dtype), id(obj.variable))
+
+
+class XarrayDatasetInspector(MappingInspector):
+    """xarray.Dataset, expanded by data variable."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        dims = ", ".join(f"{dim}: {size}" for dim, size in obj.sizes.items())
+        return f"<Dataset ({dims}) data_vars={len(obj.data_vars)}>", False
+
+    def length(self, obj: Any) -> int:
+        return len(obj.data_vars)
+
+    def size(self, obj: Any) -> int:
+        return int(obj.nbytes)
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def has_children(self, obj: Any) -> bool:
+        return len(obj.data_vars) > 0
+
+    def count_children(self, obj: Any) -> int:
+        return len(obj.data_vars)
+
+    def iter_children(self, obj: Any, start: int, stop: int) -> Iterator[tuple[Any, Any]]:
+        for name in itertools.islice(obj.data_vars, start, stop):
+            yield name, obj.data_vars[name]
+
+    def get_child(self, obj: Any, key: Any) -> Any:
+        return obj.data_vars[key]
+
+    def fingerprint(self, obj: Any) -> Any:
+        return (dict(obj.sizes), tuple(id(var) for var in obj.variables.values()))
+
+
+class TorchTensorInspector(NumpyArrayInspector):
+    """torch.Tensor, summarized by shape, dtype and device without a full repr."""
+
+    def display_value(self, obj: Any, max_length: int) -> tuple[str, bool]:  # noqa: ARG002
+        return f"<Tensor shape={tuple(obj.shape)} dtype={obj.dtype} device={obj.device}>", False
+
+    def display_type(self, obj: Any) -> str:
+        return f"Tensor[{obj.dtype}]"
+
+    def size(self, obj: Any) -> int:
+        return obj.nelement() * obj.element_size()
+
+    def referents(self, obj: Any) -> tuple[Iterable[Any], int]:  # noqa: ARG002
+        return (), 0
+
+    def has_viewer(self, obj: Any) -> bool:  # noqa: ARG002
+        return False
+
+    def fingerprint(self, obj: Any) -> Any:
+        # _version is torch's counter of in-place modifications; it has no public accessor
+        return (tuple(obj.shape), str(obj.dtype), str(obj.device), obj.data_ptr(), obj._version)  # noqa: SLF001
+
+
+# Object columns are sized exactly up to this many cells, and by sampling beyond it
+_MAX_EXACT_OBJECT_CELLS = 100_000
+_OBJECT_SAMPLE_SIZE = 1000
+
+
+def _pandas_memory_usage(frame: Any, shallow_bytes: int) -> int:
+    """Add an estimate for Python objects held by object columns to a shallow size."""
+    total = int(shallow_bytes)
+    object_columns = [i for i, dtype in enumerate(frame.dtypes) if _holds_python_objects(dtype)]
+    if not object_columns:
+        return total
+
+    num_rows = len(frame)
+    if num_rows * len(object_columns) <= _MAX_EXACT_OBJECT_CELLS:
+        deep = frame.iloc[:, object_columns].memory_usage(index=False, deep=True).sum()
+        shallow = frame.iloc[:, object_columns].memory_usage(index=False, deep=False).sum()
+        return total + int(deep - shallow)
+
+    step = max(1, num_rows // _OBJECT_SAMPLE_SIZE)
+    for i in object_columns:
+        sample = frame.iloc[::step, i]
+        sampled_bytes = sum(sys.getsizeof(value) for value in sample)
+        total += int(sampled_bytes / max(1, len(sample)) * num_rows)
+    return total
+
+
+def _holds_python_objects(dtype: Any) -> bool:
+    """Whether a pandas column of this dtype stores Python objects (object or python-backed strings)."""
+    return getattr(dtype, "kind", None) == "O" and getattr(dtype, "storage", None) != "pyarrow"
+
+
+def _index_key(key: Any) -> int:
+    """Accept an integer index or its "[i]" display form from older frontends."""
+    if isinstance(key, str):
+        return int(key.strip("[]"))
+    return key
+
+
+def _arrow_buffer_size(obj: Any) -> int:
+    """Size of the Arrow buffers referenced by obj, counting shared buffers once."""
+    get_total_buffer_size = getattr(obj, "get_total_buffer_size", None)
+    if get_total_buffer_size is not None:
+        return int(get_total_buffer_size())
+    return int(obj.nbytes)
+
+
+# Registry keyed by type, or by "package.QualName" for types from optional packages.
+# Keying by root package and qualified name means third-party modules are never
+# imported here, and internal module moves inside those packages do not matter.
+_inspectors: dict[type | str, Inspector] = {}
+
+# Resolved inspector per concrete type, filled by walking the MRO once
+_mro_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+_default_inspector = Inspector()
+_function_inspector = FunctionInspector()
+
+
+def register_inspector(key: type | str, inspector: Inspector) -> None:
+    """
+    Register an inspector for a type.
+
+    Args:
+        key: A type, or a "package.QualName" string such as "polars.LazyFrame"
+            that matches the root package and qualified name of a class in the MRO.
+        inspector: The inspector used for instances of the type and its subclasses.
+    """
+    _inspectors[key] = inspector
+    _mro_cache.clear()
+
+
+def _type_key(cls: type) -> str:
+    module = getattr(cls, "__module__", None) or ""
+    return f"{module.partition('.')[0]}.{getattr(cls, '__qualname__', cls.__name__)}"
+
+
+def get_inspector(obj: Any) -> Inspector:
+    """Return the inspector for an object, resolving and caching it per type."""
+    obj_type = type(obj)
+    try:
+        return _mro_cache[obj_type]
+    except (KeyError, TypeError):
+        pass
+
+    inspector = _resolve_inspector(obj_type)
+    with contextlib.suppress(TypeError):
+        _mro_cache[obj_type] = inspector
+    return inspector
+
+
+def _resolve_inspector(obj_type: type) -> Inspector:
+    mro = getattr(obj_type, "__mro__", (obj_type,))
+    for cls in mro:
+        if cls is object:
+            break
+        inspector = _inspectors.get(cls) or _inspectors.get(_type_key(cls))
+        if inspector is not None:
+            return inspector
+
+    # Callability is a property of the type (not its metaclass), so it is safe to cache too
+    if any("__call__" in vars(cls) for cls in mro if cls is not object):
+        return _function_inspector
+
+    return _default_inspector
+
+
+def _register_builtin_inspectors() -> None:
+    register_inspector(type(None), ScalarInspector("empty"))
+    register_inspector(bool, ScalarInspector("boolean"))
+    register_inspector(int, ScalarInspector("number"))
+    register_inspector(float, ScalarInspector("number"))
+    register_inspector(complex, ScalarInspector("number"))
+    register_inspector(str, StringInspector())
+    register_inspector(bytes, BytesInspector())
+    register_inspector(bytearray, BytesInspector())
+    register_inspector(list, SequenceInspector("[", "]", "[]"))
+    register_inspector(tuple, SequenceInspector("(", ")", "()"))
+    register_inspector(set, SetInspector("{", "}", "set()"))
+    register_inspector(frozenset, SetInspector("frozenset({", "})", "frozenset()"))
+    register_inspector(dict, MappingInspector())
+    register_inspector(type, ClassInspector())
+
+    register_inspector("numpy.ndarray", NumpyArrayInspector())
+    register_inspector("numpy.memmap", NumpyMemmapInspector())
+    register_inspector("pandas.DataFrame", PandasDataFrameInspector())
+    register_inspector("pandas.Series", PandasSeriesInspector())
+    register_inspector("polars.DataFrame", PolarsDataFrameInspector())
+    register_inspector("polars.LazyFrame", PolarsLazyFrameInspector())
+    register_inspector("polars.Series", PolarsSeriesInspector())
+    register_inspector("pyarrow.Table", ArrowTableInspector())
+    register_inspector("pyarrow.RecordBatch", ArrowTableInspector())
+    register_inspector("pyarrow.Dataset", ArrowDatasetInspector())
+    register_inspector("pyarrow.Array", ArrowArrayInspector())
+    register_inspector("pyarrow.ChunkedArray", ArrowArrayInspector())
+    # duckdb >= 1.1 defines its classes in the _duckdb extension module
+    register_inspector("_duckdb.DuckDBPyRelation", DuckDBRelationInspector())
+    register_inspector("duckdb.DuckDBPyRelation", DuckDBRelationInspector())
+    register_inspector("xarray.DataArray", XarrayDataArrayInspector())
+    register_inspector("xarray.Dataset", XarrayDatasetInspector())
+    register_inspector("torch.Tensor", TorchTensorInspector())
+
+
+_register_builtin_inspectors()
+
@@ -0,0 +1,225 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""
+Namespace dirty-tracking for the Variables service.
+Derives the names each execution may have touched from the AST of the transformed cell.
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .inspectors import get_inspector
+
+logger = logging.getLogger(__name__)
+
+# Calls that can rebind arbitrary names, so a cell using them needs a full namespace scan
+_OPAQUE_FUNCTIONS = {"exec", "eval", "globals", "vars", "locals", "execfile", "setattr", "delattr"}
+
+# IPython magics can run arbitrary code (%run, %load, %reset, ...)
+_OPAQUE_METHODS = {"run_line_magic", "run_cell_magic", "magic"}
+
+# Objects visited, and container nesting followed, when looking for variables held by touched ones
+CONTAINED_ALIAS_BUDGET = 10_000
+CONTAINED_ALIAS_DEPTH = 3
+
+
+class TouchedNamesVisitor(ast.NodeVisitor):
+    """AST visitor collecting every global name a cell may rebind or mutate."""
+    
+    def __init__(self):
+        # Loaded names are included too: method calls and item/attribute assignment
+        # mutate objects in place without rebinding them
+        self.names: Set[str] = set()
+        # Names that functions defined in this cell declare global, or load and so
+        # may mutate in place (locals are included too; they only cost a check)
+        self.function_globals: Set[str] = set()
+        self.has_calls = False
+        self.opaque = False
+        # Whether a function defined in this cell can rebind arbitrary names when called
+        self.opaque_functions = False
+        self._function_depth = 0
+    
+    def visit_Name(self, node):
+        """Visit Name nodes (loads, stores and deletes)"""
+        self.names.add(node.id)
+        if self._function_depth and isinstance(node.ctx, ast.Load):
+            self.function_globals.add(node.id)
+    
+    def visit_FunctionDef(self, node):
+        """Visit function definitions, which bind their name"""
+        self.names.add(node.name)
+        self._function_depth += 1
+        self.generic_visit(node)
+        self._function_depth -= 1
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_Lambda = visit_FunctionDef
+    
+    def visit_ClassDef(self, node):
+        """Visit class definitions, which bind their name"""
+        self.names.add(node.name)
+        self.generic_visit(node)
+    
+    def visit_Import(self, node):
+        """Visit imports, which bind the alias or top-level package"""
+        for alias in node.names:
+            self.names.add(alias.asname or alias.name.split('.')[0])
+    
+    def visit_ImportFrom(self, node):
+        """Visit from-imports; star imports bind unknown names"""
+        for alias in node.names:
+            if alias.name == '*':
+                self.opaque = True
+            else:
+                self.names.add(alias.asname or alias.name)
+    
+    def visit_Global(self, node):
+        """Visit global declarations, which let later calls rebind the names"""
+        self.function_globals.update(node.names)
+        self.names.update(node.names)
+    
+    def visit_ExceptHandler(self, node):
+        """Visit except clauses, which bind the exception name"""
+        if node.name:
+            self.names.add(node.name)
+        self.generic_visit(node)
+    
+    def visit_MatchAs(self, node):
+        """Visit match capture patterns"""
+        if node.name:
+            self.names.add(node.name)
+        self.generic_visit(node)
+    
+    def visit_MatchStar(self, node):
+        """Visit match star patterns"""
+        if node.name:
+            self.names.add(node.name)
+    
+    def visit_MatchMapping(self, node):
+        """Visit match mapping patterns, which may bind the rest"""
+        if node.rest:
+            self.names.add(node.rest)
+        self.generic_visit(node)
+    
+    def visit_Call(self, node):
+        """Visit Call nodes and flag calls that can rebind arbitrary names"""
+        self.has_calls = True
+        func = node.func
+        if (isinstance(func, ast.Name) and func.id in _OPAQUE_FUNCTIONS) or (
+            isinstance(func, ast.Attribute) and func.attr in _OPAQUE_METHODS
+        ):
+            self.opaque = True
+            if self._function_depth:
+                self.opaque_functions = True
+        self.generic_visit(node)
+
+
+class NamespaceTracker:
+    """
+    Tracks which user namespace names each execution may have touched.
+    
+    A cell is analyzed before it runs (pre_run_cell). The names found there,
+    plus any name that previously defined functions declare global or load
+    (and so may rebind or mutate in place) when the cell makes calls, are
+    reported as dirty after it runs. dirty_names() returns
+    None whenever the set cannot be trusted: silent executions that skip
+    pre_run_cell, opaque constructs such as exec(), star imports and magics,
+    calls made after a function using such constructs was defined, and every
+    FULL_SCAN_INTERVAL-th execution as a safety net. Callers then fall back to
+    a full namespace scan.
+    """
+    
+    FULL_SCAN_INTERVAL = 50
+    
+    def __init__(self):
+        self._function_globals: Set[str] = set()
+        self._has_opaque_functions = False
+        self._pending: Optional[Set[str]] = None
+        self._executions_since_full_scan = 0
+        # Every name the last analyzed cell mentions, even when its dirty set is unknown
+        self.last_cell_names: Set[str] = set()
+    
+    def analyze_cell(self, code: str) -> None:
+        """Record the names the given (already transformed) cell may touch."""
+        self.last_cell_names = set()
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            # The cell cannot run, so it touches nothing
+            self._pending = set()
+            return
+        except Exception as e:
+            logger.warning(f"[VARIABLES] Failed to analyze cell: {e}")
+            self._pending = None
+            return
+        
+        visitor = TouchedNamesVisitor()
+        visitor.visit(tree)
+        self.last_cell_names = set(visitor.names)
+        self._function_globals.update(visitor.function_globals)
+        self._has_opaque_functions |= visitor.opaque_functions
+        
+        # Calls may reach a previously defined function that rebinds arbitrary names
+        if visitor.opaque or (visitor.has_calls and self._has_opaque_functions):
+            self._pending = None
+            return
+        
+        names = visitor.names
+        if visitor.has_calls:
+            names |= self._function_globals
+        self._pending = names
+    
+    def dirty_names(self) -> Optional[Set[str]]:
+        """Consume the names touched since the last call, or None if a full scan is needed."""
+        names, self._pending = self._pending, None
+        
+        self._executions_since_full_scan += 1
+        if names is None or self._executions_since_full_scan >= self.FULL_SCAN_INTERVAL:
+            self._executions_since_full_scan = 0
+            return None
+        return names
+    
+    def reset(self) -> None:
+        """Forget the pending analysis so the next update does a full scan."""
+        self._pending = None
+
+
+def contained_aliases(roots: Iterable[Any], names_by_id: Dict[int, Set[str]]) -> Set[str]:
+    """
+    Return the names bound to objects held inside the given ones.
+    
+    Mutating outer['k'] in place also changes a variable bound to outer['k'],
+    though the cell never mentions it. Containers are walked breadth-first
+    through their inspector referents, at most CONTAINED_ALIAS_DEPTH levels
+    deep and CONTAINED_ALIAS_BUDGET objects in all; anything past that is
+    left to the periodic full scan.
+    """
+    found: Set[str] = set()
+    seen: Set[int] = set()
+    level = list(roots)
+    budget = CONTAINED_ALIAS_BUDGET
+    for _ in range(CONTAINED_ALIAS_DEPTH):
+        next_level = []
+        for obj in level:
+            try:
+                children = get_inspector(obj).referents(obj)[0]
+                for child in children:
+                    budget -= 1
+                    if budget < 0:
+                        return found
+                    child_id = id(child)
+                    if child_id in seen:
+                        continue
+                    seen.add(child_id)
+                    found.update(names_by_id.get(child_id, ()))
+                    next_level.append(child)
+            except Exception as e:
+                logger.debug(f"[VARIABLES] Failed to walk {type(obj).__name__} for aliases: {e}")
+        if not next_level:
+            break
+        level = next_level
+    return found
@@ -0,0 +1,800 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Data explorer views that push sort, filter and windowing down to polars, pyarrow and duckdb."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from .data_explorer import PushdownTableView, TableView, _is_instance, _spec_key, format_values
+from .table_ops import _COMPARE_OPS
+
+logger = logging.getLogger(__name__)
+
+# Row numbers are carried through sorted or filtered polars queries in this column
+_ROW_INDEX = "__erdos_row_index__"
+
+# Largest sorted or filtered pyarrow dataset or duckdb result kept in memory for windowing
+MAX_MATERIALIZED_BYTES = 256 * 1024 * 1024
+
+
+class PolarsTableView(PushdownTableView):
+    """polars.DataFrame and LazyFrame, queried lazily so only the window is collected."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "polars.DataFrame") or _is_instance(table, "polars.LazyFrame")
+
+    def __init__(self, table: Any, path: list[str], display_name: str):
+        super().__init__(table, path, display_name)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._schema: Any | None = None
+        self._total_rows: int | None = None
+        # Row positions of the sorted and filtered table, and the specs they were computed for
+        self._order: Any | None = None
+        self._query_key: tuple[str, str] | None = None
+        self._query_errors = False
+
+    def set_table(self, table: Any) -> None:
+        super().set_table(table)
+        self._reset()
+
+    def _names(self) -> list[str]:
+        if self._schema is None:
+            self._schema = self.table.lazy().collect_schema()
+        return list(self._schema.names())
+
+    def shape(self) -> tuple[int, int]:
+        if self._total_rows is None:
+            import polars as pl
+            if _is_instance(self.table, "polars.DataFrame"):
+                self._total_rows = self.table.height
+            else:
+                # Scans answer this from file metadata where they can
+                self._total_rows = self.table.select(pl.len()).collect().item()
+        return self._total_rows, len(self._names())
+
+    def num_rows(self) -> int:
+        if self._order is None:
+            return self.shape()[0]
+        return len(self._order)
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        name = self._names()[index]
+        dtype = self._schema[name]
+        return {
+            "column_name": name,
+            "column_index": index,
+            "type_name": str(dtype),
+            "type_display": _polars_type_display(dtype),
+        }
+
+    def apply_query(self) -> bool:
+        import polars as pl
+
+        key = (_spec_key(self.sort_keys), _spec_key(self.row_filters))
+        if key == self._query_key:
+            return self._query_errors
+        self._order = None
+        self._query_key = None
+        if not self.sort_keys and not self.row_filters:
+            return False
+
+        names = self._names()
+        query = self.table.lazy().with_row_index(_ROW_INDEX)
+        had_errors = False
+        predicates = []
+        for row_filter in self.row_filters:
+            try:
+                index = int(row_filter["column_index"])
+                type_display = self.column_schema(index)["type_display"]
+                predicate = _polars_predicate(pl.col(names[index]), type_display, row_filter)
+            except Exception as e:
+                logger.warning(f"[DATA EXPLORER] Ignoring invalid filter {row_filter}: {e}")
+                had_errors = True
+                continue
+            predicates.append(predicate)
+        if predicates:
+            query = query.filter(pl.all_horizontal(predicates))
+        if self.sort_keys:
+            query = query.sort(
+                [names[int(key["column_index"])] for key in self.sort_keys],
+                descending=[not key.get("ascending", True) for key in self.sort_keys],
+                nulls_last=True,
+                maintain_order=True
+            )
+        # Sorted and filtered once; windows then gather rows at these positions.
+        # Only the sort and filter columns are read to compute them.
+        self._order = query.select(_ROW_INDEX).collect().get_column(_ROW_INDEX)
+        self._query_key = key
+        self._query_errors = had_errors
+        return had_errors
+
+    def window(
+        self,
+        rows: slice | Any,
+        column_indices: list[int],
+        *,
+        exact: bool = False,
+    ) -> tuple[list[list[str | None]], list[str] | None]:
+        import polars as pl
+
+        names = self._names()
+        selected = [names[i] for i in column_indices]
+        if self._order is None:
+            # Slice before select and collect, so the engine only produces the window
+            frame = self.table.lazy().slice(rows.start, rows.stop - rows.start).select(selected).collect()
+            return [_format_polars(frame.get_column(name), exact=exact) for name in selected], None
+
+        positions = self._order.slice(rows.start, rows.stop - rows.start)
+        frame = self.table.lazy().select([pl.col(name).gather(positions) for name in selected]).collect()
+        labels = [str(label) for label in positions.to_list()]
+        return [_format_polars(frame.get_column(name), exact=exact) for name in selected], labels
+
+    def column_sample(self, index: int, positions: Any | None) -> Any:
+        import polars as pl
+        name = self._names()[index]
+        expr = pl.col(name)
+        if positions is not None:
+            expr = expr.gather(positions)
+        # Projection pushdown means only this column is read
+        return self.table.lazy().select(expr).collect().get_column(name).to_numpy()
+
+
+class ArrowTableView(TableView):
+    """pyarrow.Table and RecordBatch, sorted and filtered with pyarrow.compute kernels."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "pyarrow.Table") or _is_instance(table, "pyarrow.RecordBatch")
+
+    def shape(self) -> tuple[int, int]:
+        return self.table.num_rows, self.table.num_columns
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        field = self.table.schema.field(index)
+        return {
+            "column_name": field.name,
+            "column_index": index,
+            "type_name": str(field.type),
+            "type_display": _arrow_type_display(field.type),
+        }
+
+    def column_data(self, index: int) -> Any:
+        return self.table.column(index)
+
+    def column_values(self, index: int, rows: slice | Any, *, exact: bool = False) -> list[str | None]:
+        column = self.table.column(index)
+        if isinstance(rows, slice):
+            # Zero-copy slice of the window
+            column = column.slice(rows.start, rows.stop - rows.start)
+        else:
+            column = column.take(rows)
+        return _format_arrow(column, exact=exact)
+
+    def column_sample(self, index: int, positions: Any | None) -> Any:
+        column = self.table.column(index)
+        if positions is not None:
+            column = column.take(positions)
+        return column.to_numpy(zero_copy_only=False)
+
+    def sort_order(self, sort_keys: list[dict[str, Any]]) -> Any:
+        import pyarrow.compute as pc
+
+        from .table_ops import _compact_positions
+
+        names = self.table.schema.names
+        keys = [
+            (names[int(key["column_index"])], "ascending" if key.get("ascending", True) else "descending")
+            for key in sort_keys
+        ]
+        # Nulls sort last by default
+        indices = pc.sort_indices(self.table, sort_keys=keys)
+        return _compact_positions(indices.to_numpy())
+
+    def filter_mask(self, row_filter: dict[str, Any]) -> Any:
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        index = int(row_filter["column_index"])
+        schema = self.column_schema(index)
+        expression = _arrow_expression(ds.field(schema["column_name"]), schema["type_display"], row_filter)
+
+        # Filter a row-number column alongside the filtered column to find matching positions
+        num_rows = self.table.num_rows
+        positions = pa.table({
+            schema["column_name"]: self.table.column(index),
+            _ROW_INDEX: pa.array(np.arange(num_rows)),
+        }).filter(expression).column(_ROW_INDEX)
+        mask = np.zeros(num_rows, dtype=bool)
+        mask[positions.to_numpy()] = True
+        return mask
+
+
+class ArrowDatasetView(PushdownTableView):
+    """pyarrow.dataset.Dataset, scanned with filter pushdown and read one window of row groups at a time."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "pyarrow.Dataset")
+
+    def __init__(self, table: Any, path: list[str], display_name: str):
+        super().__init__(table, path, display_name)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._total_rows: int | None = None
+        self._row_groups: list[tuple[int, Any, int]] | None = None
+        # The filtered rows as an Arrow table and the sorted positions within it, or, when
+        # they are too large to keep, the sorted and filtered row positions in the dataset
+        self._result: Any | None = None
+        self._order: Any | None = None
+        self._positions: Any | None = None
+        self._query_key: tuple[str, str] | None = None
+        self._query_errors = False
+
+    def set_table(self, table: Any) -> None:
+        super().set_table(table)
+        self._reset()
+
+    def shape(self) -> tuple[int, int]:
+        if self._total_rows is None:
+            # Parquet datasets count rows from file metadata
+            self._total_rows = self.table.count_rows()
+        return self._total_rows, len(self.table.schema.names)
+
+    def num_rows(self) -> int:
+        if self._result is not None:
+            return self._result.num_rows
+        if self._positions is not None:
+            return len(self._positions)
+        return self.shape()[0]
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        field = self.table.schema.field(index)
+        return {
+            "column_name": field.name,
+            "column_index": index,
+            "type_name": str(field.type),
+            "type_display": _arrow_type_display(field.type),
+        }
+
+    def apply_query(self) -> bool:
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        key = (_spec_key(self.sort_keys), _spec_key(self.row_filters))
+        if key == self._query_key:
+            return self._query_errors
+        self._result = None
+        self._order = None
+        self._positions = None
+        self._query_key = None
+        if not self.sort_keys and not self.row_filters:
+            return False
+
+        names = self.table.schema.names
+        row_filter_expression = None
+        filter_columns = []
+        had_errors = False
+        for row_filter in self.row_filters:
+            try:
+                schema = self.column_schema(int(row_filter["column_index"]))
+                expression = _arrow_expression(ds.field(schema["column_name"]), schema["type_display"], row_filter)
+            except Exception as e:
+                logger.warning(f"[DATA EXPLORER] Ignoring invalid filter {row_filter}: {e}")
+                had_errors = True
+                continue
+            filter_columns.append(schema["column_name"])
+            row_filter_expression = expression if row_filter_expression is None else (row_filter_expression & expression)
+        keys = [
+            (names[int(key["column_index"])], "ascending" if key.get("ascending", True) else "descending")
+            for key in self.sort_keys
+        ]
+
+        # Filtered and sorted once; windows are then slices of the result
+        self._result = self._materialize(row_filter_expression)
+        if self._result is not None:
+            if keys:
+                self._order = pc.sort_indices(self._result, sort_keys=keys).to_numpy()
+        else:
+            # Too large to keep: only the sort and filter columns are read, to find the
+            # dataset positions of the rows, and windows read the row groups holding them
+            columns = list(dict.fromkeys([name for name, _ in keys] + filter_columns))
+            self._positions = self._query_positions(columns, row_filter_expression, keys)
+        self._query_key = key
+        self._query_errors = had_errors
+        return had_errors
+
+    def window(
+        self,
+        rows: slice | Any,
+        column_indices: list[int],
+        *,
+        exact: bool = False,
+    ) -> tuple[list[list[str | None]], list[str] | None]:
+        import pyarrow as pa
+
+        names = self.table.schema.names
+        selected = [names[i] for i in column_indices]
+        if self._result is not None:
+            table = self._result.select(selected)
+            if self._order is not None:
+                table = table.take(pa.array(self._order[rows.start:rows.stop]))
+            else:
+                table = table.slice(rows.start, rows.stop - rows.start)
+        elif self._positions is not None:
+            table = self._take_rows(self._positions[rows.start:rows.stop], selected)
+        else:
+            table = self._read_rows(rows.start, rows.stop, selected)
+        return [_format_arrow(table.column(name), exact=exact) for name in selected], None
+
+    def column_sample(self, index: int, positions: Any | None) -> Any:
+        name = self.table.schema.names[index]
+        if positions is None:
+            column = self.table.to_table(columns=[name]).column(name)
+        else:
+            column = self.table.take(positions, columns=[name]).column(name)
+        return column.to_numpy(zero_copy_only=False)
+
+    def _materialize(self, row_filter: Any | None) -> Any | None:
+        """
+        Scan the filtered rows into an Arrow table.
+
+        Returns None if they exceed MAX_MATERIALIZED_BYTES.
+        """
+        import pyarrow as pa
+
+        batches = []
+        nbytes = 0
+        for batch in self.table.to_batches(filter=row_filter):
+            nbytes += batch.nbytes
+            if nbytes > MAX_MATERIALIZED_BYTES:
+                logger.info("[DATA EXPLORER] Filtered dataset is too large to keep, windows read its row groups")
+                return None
+            batches.append(batch)
+        # One chunk per column, so taking a window's rows does not search chunk offsets
+        return pa.Table.from_batches(batches, schema=self.table.schema).combine_chunks()
+
+    def _query_positions(self, columns: list[str], row_filter: Any | None, keys: list[tuple[str, str]]) -> Any:
+        """Dataset row positions of the filtered rows, in sorted order."""
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        table = self.table.to_table(columns=columns)
+        table = table.append_column(_ROW_INDEX, pa.array(np.arange(table.num_rows)))
+        if row_filter is not None:
+            table = ds.dataset(table).to_table(filter=row_filter)
+        positions = table.column(_ROW_INDEX)
+        if keys:
+            positions = positions.take(pc.sort_indices(table, sort_keys=keys))
+        return positions.to_numpy()
+
+    def _row_group_starts(self) -> list[tuple[int, Any, int]] | None:
+        """(first row, fragment, row group id) of each Parquet row group, or None if not Parquet."""
+        if self._row_groups is None:
+            row_groups = []
+            offset = 0
+            for fragment in self.table.get_fragments():
+                fragment_row_groups = getattr(fragment, "row_groups", None)
+                if fragment_row_groups is None:
+                    return None
+                for row_group in fragment_row_groups:
+                    row_groups.append((offset, fragment, row_group.id))
+                    offset += row_group.num_rows
+            self._row_groups = row_groups
+        return self._row_groups
+
+    def _read_rows(self, start: int, stop: int, columns: list[str]) -> Any:
+        """Read rows [start, stop) touching only the Parquet row groups that hold them."""
+        import numpy as np
+
+        return self._take_rows(np.arange(start, min(stop, self.shape()[0])), columns)
+
+    def _take_rows(self, positions: Any, columns: list[str]) -> Any:
+        """Read the rows at the given dataset positions, touching only the Parquet row groups that hold them."""
+        import numpy as np
+        import pyarrow as pa
+
+        row_groups = self._row_group_starts()
+        if row_groups is None:
+            # Not Parquet: fall back to a positional take over the scan
+            return self.table.take(pa.array(positions), columns=columns)
+        if not len(positions):
+            return self.table.schema.empty_table().select(columns)
+
+        starts = np.array([start for start, _, _ in row_groups])
+        groups = np.searchsorted(starts, positions, side="right") - 1
+        pieces = []
+        picked = []
+        for group in np.unique(groups):
+            selected = np.flatnonzero(groups == group)
+            start, fragment, row_group_id = row_groups[group]
+            table = fragment.subset(row_group_ids=[row_group_id]).to_table(columns=columns)
+            pieces.append(table.take(pa.array(positions[selected] - start)))
+            picked.append(selected)
+
+        # Put the rows, read row group by row group, back in the requested order
+        order = np.empty(len(positions), dtype=np.int64)
+        order[np.concatenate(picked)] = np.arange(len(positions))
+        return pa.concat_tables(pieces).take(pa.array(order))
+
+
+class DuckDBRelationView(PushdownTableView):
+    """duckdb relations, queried with SQL so duckdb only produces the window."""
+
+    @staticmethod
+    def accepts(table: Any) -> bool:
+        return _is_instance(table, "_duckdb.DuckDBPyRelation") or _is_instance(table, "duckdb.DuckDBPyRelation")
+
+    def __init__(self, table: Any, path: list[str], display_name: str):
+        super().__init__(table, path, display_name)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._total_rows: int | None = None
+        self._query: Any | None = None
+        self._query_rows: int | None = None
+        # The sorted and filtered result as an Arrow table, and the specs it was computed for
+        self._result: Any | None = None
+        self._query_key: tuple[str, str] | None = None
+        self._query_errors = False
+
+    def set_table(self, table: Any) -> None:
+        super().set_table(table)
+        self._reset()
+
+    def shape(self) -> tuple[int, int]:
+        if self._total_rows is None:
+            self._total_rows = self.table.aggregate("count(*)").fetchone()[0]
+        return self._total_rows, len(self.table.columns)
+
+    def num_rows(self) -> int:
+        if self._query is None:
+            return self.shape()[0]
+        if self._result is not None:
+            return self._result.num_rows
+        if self._query_rows is None:
+            self._query_rows = self._query.aggregate("count(*)").fetchone()[0]
+        return self._query_rows
+
+    def column_schema(self, index: int) -> dict[str, Any]:
+        type_name = str(self.table.types[index])
+        return {
+            "column_name": self.table.columns[index],
+            "column_index": index,
+            "type_name": type_name,
+            "type_display": _sql_type_display(type_name),
+        }
+
+    def apply_query(self) -> bool:
+        key = (_spec_key(self.sort_keys), _spec_key(self.row_filters))
+        if key == self._query_key:
+            return self._query_errors
+        self._query = None
+        self._query_rows = None
+        self._result = None
+        self._query_key = None
+        if not self.sort_keys and not self.row_filters:
+            return False
+
+        query = self.table
+        had_errors = False
+        for row_filter in self.row_filters:
+            try:
+                schema = self.column_schema(int(row_filter["column_index"]))
+                condition = _sql_condition(_sql_identifier(schema["column_name"]), schema["type_display"], row_filter)
+            except Exception as e:
+                logger.warning(f"[DATA EXPLORER] Ignoring invalid filter {row_filter}: {e}")
+                had_errors = True
+                continue
+            query = query.filter(condition)
+        if self.sort_keys:
+            query = query.order(", ".join(
+                f"{_sql_identifier(self.table.columns[int(key['column_index'])])} "
+                f"{'ASC' if key.get('ascending', True) else 'DESC'} NULLS LAST"
+                for key in self.sort_keys
+            ))
+        self._query = query
+        self._result = _materialize_relation(query)
+        self._query_key = key
+        self._query_errors = had_errors
+        return had_errors
+
+    def window(
+        self,
+        rows: slice | Any,
+        column_indices: list[int],
+        *,
+        exact: bool = False,
+    ) -> tuple[list[list[str | None]], list[str] | None]:
+        import numpy as np
+
+        if self._result is not None:
+            # Windows of a sorted or filtered result are slices of its materialization
+            names = [self.table.columns[i] for i in column_indices]
+            table = self._result.select(names).slice(rows.start, rows.stop - rows.start)
+            return [_format_arrow(table.column(name), exact=exact) for name in names], None
+
+        query = self._query if self._query is not None else self.table
+        projection = ", ".join(_sql_identifier(self.table.columns[i]) for i in column_indices)
+        # fetchnumpy returns masked arrays, so formatting stays vectorized
+        result = query.project(projection).limit(rows.stop - rows.start, offset=rows.start).fetchnumpy()
+        columns = [
+            format_values(np.ma.getdata(values), np.ma.getmaskarray(values), exact=exact)
+            for values in result.values()
+        ]
+        return columns, None
+
+    def column_sample(self, index: int, positions: Any | None) -> Any:
+        import numpy as np
+
+        identifier = _sql_identifier(self.table.columns[index])
+        relation = self.table.project(identifier)
+        if positions is not None:
+            # Row positions mean nothing to a SQL engine, so sample the same number of rows there
+            relation = relation.query(
+                "erdos_sample",
+                f"SELECT * FROM erdos_sample USING SAMPLE reservoir({len(positions)} ROWS) REPEATABLE (0)"
+            )
+        values = next(iter(relation.fetchnumpy().values()))
+        if not np.ma.isMaskedArray(values):
+            return values
+        type_display = self.column_schema(index)["type_display"]
+        if type_display == "number":
+            return values.astype(float).filled(np.nan)
+        if values.dtype.kind in "mM":
+            return values.filled(np.datetime64("NaT"))
+        return values.astype(object).filled(None)
+
+
+# Checked after the pandas and numpy views
+native_table_view_types: list[type] = [PolarsTableView, ArrowTableView, ArrowDatasetView, DuckDBRelationView]
+
+
+def _materialize_relation(query: Any) -> Any | None:
+    """
+    Run a duckdb relation once into an Arrow table.
+
+    Returns None if the result exceeds MAX_MATERIALIZED_BYTES; windows then run
+    the query again with LIMIT and OFFSET.
+    """
+    import pyarrow as pa
+
+    reader = query.fetch_arrow_reader()
+    batches = []
+    nbytes = 0
+    for batch in reader:
+        nbytes += batch.nbytes
+        if nbytes > MAX_MATERIALIZED_BYTES:
+            logger.info("[DATA EXPLORER] Sorted duckdb result is too large to keep, windows re-run the query")
+            return None
+        batches.append(batch)
+    return pa.Table.from_batches(batches, schema=reader.schema)
+
+
+def _coerce_literal(type_display: str, value: Any) -> Any:
+    """Convert a filter value sent as a string to a Python literal of the column's type."""
+    if not isinstance(value, str):
+        return value
+    if type_display == "number":
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    if type_display == "boolean":
+        return value.strip().lower() in ("true", "1", "yes")
+    if type_display in ("datetime", "date"):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _polars_predicate(column: Any, type_display: str, row_filter: dict[str, Any]) -> Any:
+    """Translate a row filter into a polars expression."""
+    import polars as pl
+
+    filter_type = row_filter.get("filter_type")
+
+    def literal(value: Any) -> Any:
+        return _coerce_literal(type_display, value)
+
+    if filter_type == "is_null":
+        return column.is_null()
+    if filter_type == "not_null":
+        return column.is_not_null()
+    if filter_type == "compare":
+        return _COMPARE_OPS[row_filter["op"]](column, pl.lit(literal(row_filter["value"])))
+    if filter_type in ("between", "not_between"):
+        between = column.is_between(literal(row_filter["left_value"]), literal(row_filter["right_value"]))
+        return ~between if filter_type == "not_between" else between
+    if filter_type in ("is_true", "is_false"):
+        return column == (filter_type == "is_true")
+    if filter_type in ("is_empty", "not_empty"):
+        empty = column.cast(pl.String) == ""
+        return ~empty if filter_type == "not_empty" else empty
+    if filter_type == "search":
+        strings = column.cast(pl.String)
+        term = str(row_filter.get("term", ""))
+        search_type = row_filter.get("search_type", "contains")
+        case_sensitive = bool(row_filter.get("case_sensitive", False))
+        if search_type == "regex_match":
+            return strings.str.contains(term if case_sensitive else f"(?i){term}")
+        if not case_sensitive:
+            strings = strings.str.to_lowercase()
+            term = term.lower()
+        if search_type == "starts_with":
+            return strings.str.starts_with(term)
+        if search_type == "ends_with":
+            return strings.str.ends_with(term)
+        return strings.str.contains(term, literal=True)
+    if filter_type == "set_membership":
+        member = column.is_in([literal(value) for value in row_filter.get("values", [])])
+        return member if row_filter.get("inclusive", True) else ~member
+    raise ValueError(f"Unknown filter type: {filter_type}")
+
+
+def _arrow_expression(field: Any, type_display: str, row_filter: dict[str, Any]) -> Any:
+    """Translate a row filter into a pyarrow.dataset expression."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    filter_type = row_filter.get("filter_type")
+
+    def literal(value: Any) -> Any:
+        return _coerce_literal(type_display, value)
+
+    if filter_type == "is_null":
+        return field.is_null()
+    if filter_type == "not_null":
+        return field.is_valid()
+    if filter_type == "compare":
+        return _COMPARE_OPS[row_filter["op"]](field, literal(row_filter["value"]))
+    if filter_type in ("between", "not_between"):
+        between = (field >= literal(row_filter["left_value"])) & (field <= literal(row_filter["right_value"]))
+        return ~between if filter_type == "not_between" else between
+    if filter_type in ("is_true", "is_false"):
+        return field == (filter_type == "is_true")
+    if filter_type in ("is_empty", "not_empty"):
+        empty = field.cast(pa.string()) == ""
+        return ~empty if filter_type == "not_empty" else empty
+    if filter_type == "search":
+        strings = field.cast(pa.string())
+        term = str(row_filter.get("term", ""))
+        ignore_case = not row_filter.get("case_sensitive", False)
+        search_type = row_filter.get("search_type", "contains")
+        if search_type == "regex_match":
+            return pc.match_substring_regex(strings, pattern=term, ignore_case=ignore_case)
+        if search_type == "starts_with":
+            return pc.starts_with(strings, pattern=term, ignore_case=ignore_case)
+        if search_type == "ends_with":
+            return pc.ends_with(strings, pattern=term, ignore_case=ignore_case)
+        return pc.match_substring(strings, pattern=term, ignore_case=ignore_case)
+    if filter_type == "set_membership":
+        member = field.isin([literal(value) for value in row_filter.get("values", [])])
+        return member if row_filter.get("inclusive", True) else ~member
+    raise ValueError(f"Unknown filter type: {filter_type}")
+
+
+def _sql_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_literal(value: Any) -> str:
+    """Render a coerced filter value as a SQL literal; values never reach SQL unquoted."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sql_condition(identifier: str, type_display: str, row_filter: dict[str, Any]) -> str:
+    """Translate a row filter into a SQL condition."""
+    filter_type = row_filter.get("filter_type")
+
+    def literal(value: Any) -> str:
+        return _sql_literal(_coerce_literal(type_display, value))
+
+    sql_ops = {"=": "=", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    if filter_type == "is_null":
+        return f"{identifier} IS NULL"
+    if filter_type == "not_null":
+        return f"{identifier} IS NOT NULL"
+    if filter_type == "compare":
+        return f"{identifier} {sql_ops[row_filter['op']]} {literal(row_filter['value'])}"
+    if filter_type in ("between", "not_between"):
+        negate = "NOT " if filter_type == "not_between" else ""
+        return f"{identifier} {negate}BETWEEN {literal(row_filter['left_value'])} AND {literal(row_filter['right_value'])}"
+    if filter_type in ("is_true", "is_false"):
+        return f"{identifier} = {'TRUE' if filter_type == 'is_true' else 'FALSE'}"
+    if filter_type in ("is_empty", "not_empty"):
+        return f"CAST({identifier} AS VARCHAR) {'=' if filter_type == 'is_empty' else '<>'} ''"
+    if filter_type == "search":
+        strings = f"CAST({identifier} AS VARCHAR)"
+        term = _sql_literal(str(row_filter.get("term", "")))
+        case_sensitive = bool(row_filter.get("case_sensitive", False))
+        search_type = row_filter.get("search_type", "contains")
+        if search_type == "regex_match":
+            options = "" if case_sensitive else ", 'i'"
+            return f"regexp_matches({strings}, {term}{options})"
+        if not case_sensitive:
+            strings, term = f"lower({strings})", f"lower({term})"
+        if search_type == "starts_with":
+            return f"starts_with({strings}, {term})"
+        if search_type == "ends_with":
+            return f"ends_with({strings}, {term})"
+        return f"contains({strings}, {term})"
+    if filter_type == "set_membership":
+        values = ", ".join(literal(value) for value in row_filter.get("values", [])) or "NULL"
+        return f"{identifier} {'IN' if row_filter.get('inclusive', True) else 'NOT IN'} ({values})"
+    raise ValueError(f"Unknown filter type: {filter_type}")
+
+
+def _format_polars(series: Any, *, exact: bool = False) -> list[str | None]:
+    return format_values(series.to_numpy(), series.is_null().to_numpy(), exact=exact)
+
+
+def _format_arrow(column: Any, *, exact: bool = False) -> list[str | None]:
+    return format_values(
+        column.to_numpy(zero_copy_only=False), column.is_null().to_numpy(zero_copy_only=False), exact=exact
+    )
+
+
+def _polars_type_display(dtype: Any) -> str:
+    if dtype.is_numeric():
+        return "number"
+    name = str(dtype)
+    if name == "Boolean":
+        return "boolean"
+    if name in ("String", "Utf8"):
+        return "string"
+    if name.startswith("Datetime") or name == "Date":
+        return "datetime"
+    if name.startswith("Duration"):
+        return "interval"
+    if name.startswith(("Categorical", "Enum")):
+        return "categorical"
+    return "object"
+
+
+def _arrow_type_display(arrow_type: Any) -> str:
+    import pyarrow.types as types
+
+    if types.is_boolean(arrow_type):
+        return "boolean"
+    if types.is_integer(arrow_type) or types.is_floating(arrow_type) or types.is_decimal(arrow_type):
+        return "number"
+    if types.is_string(arrow_type) or types.is_large_string(arrow_type):
+        return "string"
+    if types.is_timestamp(arrow_type) or types.is_date(arrow_type):
+        return "datetime"
+    if types.is_duration(arrow_type):
+        return "interval"
+    if types.is_dictionary(arrow_type):
+        return "categorical"
+    return "object"
+
+
+def _sql_type_display(type_name: str) -> str:
+    type_name = type_name.upper()
+    if type_name == "BOOLEAN":
+        return "boolean"
+    if type_name.startswith(("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+                             "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "REAL", "DECIMAL")):
+        return "number"
+    if type_name.startswith("VARCHAR"):
+        return "string"
+    if type_name.startswith(("TIMESTAMP", "DATE")):
+        return "datetime"
+    if type_name == "INTERVAL":
+        return "interval"
+    return "object"
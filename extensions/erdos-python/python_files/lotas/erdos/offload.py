@@ -0,0 +1,158 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Spill large arrays and tables to memory-mapped files in a session scratch directory, and load them back."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from .data_explorer import _is_instance
+
+logger = logging.getLogger(__name__)
+
+
+class OffloadStore:
+    """
+    Files backing offloaded variables, one per variable name.
+    
+    numpy arrays are saved as .npy files and replaced by read-write np.memmap
+    views, so they keep working (and stay writable) while the OS pages the data
+    in and out. pandas, polars and Arrow tables are written as Arrow IPC files
+    and replaced by memory-mapped pyarrow Tables. reload() turns a mapped
+    variable back into an in-memory object of its original type.
+    """
+    
+    def __init__(self):
+        self._directory: Optional[str] = None
+        # name -> (file path, original kind, weak reference to the mapped replacement)
+        self._files: Dict[str, Tuple[str, str, Any]] = {}
+    
+    def is_offloaded(self, name: str, obj: Any) -> bool:
+        """Whether name is still bound to the mapped object its offload produced."""
+        entry = self._files.get(name)
+        return entry is not None and entry[2]() is obj
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._files
+    
+    def offload(self, name: str, obj: Any) -> Tuple[Any, str]:
+        """Write obj to a file and return (memory-mapped replacement, file path)."""
+        kind = storage_kind(obj)
+        if kind is None:
+            raise ValueError(f"Cannot offload {type(obj).__name__}; only numpy arrays and tables are supported")
+        
+        self.discard(name)
+        path = os.path.join(self._scratch_directory(), f"{name}.{'npy' if kind == 'numpy' else 'arrow'}")
+        try:
+            if kind == "numpy":
+                replacement = _offload_array(obj, path)
+            else:
+                write_table(obj, kind, path)
+                # Pandas metadata in the schema lets reload() restore the index and dtypes
+                replacement = memory_mapped_table(path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            raise
+        
+        self._files[name] = (path, kind, weakref.ref(replacement))
+        logger.info(f"[OFFLOAD] Offloaded {name} ({kind}) to {path}")
+        return replacement, path
+    
+    def reload(self, name: str, obj: Any) -> Any:
+        """Return an in-memory copy of an offloaded variable, in its original type, and drop its file."""
+        if not self.is_offloaded(name, obj):
+            raise ValueError(f"{name} is not offloaded")
+        path, kind, _ = self._files[name]
+        if kind == "numpy":
+            import numpy as np
+            loaded = np.array(obj)
+        else:
+            loaded = load_table(path, kind)
+        self.discard(name)
+        return loaded
+    
+    def discard(self, name: str) -> None:
+        """Forget an offloaded variable and remove its file."""
+        entry = self._files.pop(name, None)
+        if entry is not None:
+            # Open maps keep the data readable on POSIX; elsewhere the file stays until cleanup()
+            with contextlib.suppress(OSError):
+                os.remove(entry[0])
+    
+    def cleanup(self) -> None:
+        """Remove the scratch directory and every file in it."""
+        self._files.clear()
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+    
+    def _scratch_directory(self) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="erdos-offload-")
+        return self._directory
+
+
+def storage_kind(obj: Any) -> Optional[str]:
+    """Return "numpy", "pandas", "polars" or "arrow" for objects stored as raw buffers, else None."""
+    if _is_instance(obj, "numpy.ndarray"):
+        # Object arrays hold pointers, which cannot be mapped
+        return None if obj.dtype.hasobject else "numpy"
+    for kind, type_name in (
+        ("pandas", "pandas.DataFrame"),
+        ("polars", "polars.DataFrame"),
+        ("arrow", "pyarrow.Table"),
+    ):
+        if _is_instance(obj, type_name):
+            return kind
+    return None
+
+
+def _offload_array(obj: Any, path: str) -> Any:
+    import numpy as np
+    
+    np.save(path, obj, allow_pickle=False)
+    return np.load(path, mmap_mode='r+' if obj.flags.writeable else 'r')
+
+
+def write_table(obj: Any, kind: str, path: str) -> None:
+    """Write a pandas, polars or Arrow table to an Arrow IPC file."""
+    import pyarrow as pa
+    
+    if kind == "pandas":
+        table = pa.Table.from_pandas(obj)
+    elif kind == "polars":
+        table = obj.to_arrow()
+    else:
+        table = obj
+    
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def memory_mapped_table(path: str) -> Any:
+    """Open an Arrow IPC file as a pyarrow Table whose buffers map the file."""
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def load_table(path: str, kind: str) -> Any:
+    """Read an Arrow IPC file into memory as a table of the given kind."""
+    import pyarrow as pa
+    
+    with pa.OSFile(path, 'rb') as source:
+        table = pa.ipc.open_file(source).read_all()
+    if kind == "pandas":
+        return table.to_pandas()
+    if kind == "polars":
+        import polars as pl
+        return pl.from_arrow(table)
+    return table
@@ -0,0 +1,145 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""In-process inventory of installed Python distributions, cached until site-packages changes."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class PackageInventory:
+    """
+    Installed distributions read with importlib.metadata, without spawning pip.
+
+    The inventory is read once and reused until a sys.path directory changes:
+    installing or removing a distribution adds or deletes its .dist-info
+    directory, which updates the containing directory's mtime. Checking that
+    only stats the sys.path entries. As with pip, the first distribution of a
+    name on sys.path wins.
+    """
+
+    def __init__(self):
+        self._stamp: Optional[Tuple[Tuple[str, int], ...]] = None
+        # normalized name -> record
+        self._packages: Dict[str, Dict[str, Any]] = {}
+
+    def packages(self) -> List[Dict[str, Any]]:
+        """Return a record per installed distribution, sorted by name."""
+        self._refresh()
+        return sorted(self._packages.values(), key=lambda package: package["name"].lower())
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the record of one distribution, with the names of those requiring it."""
+        self._refresh()
+        key = normalize_name(name)
+        package = self._packages.get(key)
+        if package is None:
+            return None
+        required_by = sorted(
+            other["name"] for other in self._packages.values()
+            if any(requirement_name(requirement) == key for requirement in other["requires"])
+        )
+        return {**package, "required_by": required_by}
+
+    def invalidate(self) -> None:
+        """Re-read the inventory on next use."""
+        self._stamp = None
+
+    def _refresh(self) -> None:
+        stamp = _path_stamp()
+        if stamp == self._stamp:
+            return
+
+        from importlib import metadata
+
+        packages: Dict[str, Dict[str, Any]] = {}
+        for dist in metadata.distributions():
+            try:
+                package = _package_record(dist)
+            except Exception as e:
+                logger.warning(f"[ENV SERVICE] Skipping unreadable distribution: {e}")
+                continue
+            if package is not None:
+                packages.setdefault(normalize_name(package["name"]), package)
+
+        self._packages = packages
+        self._stamp = stamp
+        logger.info(f"[ENV SERVICE] Read {len(packages)} installed distributions")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name as in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def requirement_name(requirement: str) -> str:
+    """Return the normalized distribution name a requirement specifier refers to."""
+    match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+    return normalize_name(match.group(1)) if match else ""
+
+
+def _package_record(dist: Any) -> Optional[Dict[str, Any]]:
+    meta = dist.metadata
+    name = meta["Name"] if meta is not None else None
+    if not name:
+        return None
+
+    editable_location = _editable_location(dist)
+    return {
+        "name": name,
+        "version": meta["Version"] or dist.version,
+        "summary": meta["Summary"] or None,
+        "location": editable_location or _install_location(dist),
+        "editable": editable_location is not None,
+        # Like pip show, only requirements that do not depend on an extra
+        "requires": [
+            requirement for requirement in dist.requires or []
+            if not re.search(r";.*\bextra\s*==", requirement)
+        ],
+    }
+
+
+def _install_location(dist: Any) -> Optional[str]:
+    try:
+        return os.fspath(dist.locate_file(""))
+    except Exception:
+        return None
+
+
+def _editable_location(dist: Any) -> Optional[str]:
+    """The project directory of an editable install, from its PEP 610 direct_url.json."""
+    text = dist.read_text("direct_url.json")
+    if not text:
+        return None
+    try:
+        direct_url = json.loads(text)
+    except ValueError:
+        return None
+    if not direct_url.get("dir_info", {}).get("editable"):
+        return None
+    url = urlparse(direct_url.get("url", ""))
+    path = unquote(url.path)
+    # file:///C:/project on Windows
+    if sys.platform == "win32" and re.match(r"^/[A-Za-z]:", path):
+        path = path[1:]
+    return path or None
+
+
+def _path_stamp() -> Tuple[Tuple[str, int], ...]:
+    """The mtime of every sys.path entry; distributions are discovered from these."""
+    stamp = []
+    for entry in sys.path:
+        try:
+            stamp.append((entry, os.stat(entry or ".").st_mtime_ns))
+        except OSError:
+            stamp.append((entry, -1))
+    return tuple(stamp)
@@ -0,0 +1,303 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""
+Budgeted one-line previews of arbitrary objects.
+
+Shared by the Variables pane inspectors and python_files/get_variable_info.py,
+which runs as a standalone script, so this module only uses the standard library.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import OrderedDict, deque
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+# Collections rendered item by item: type, prefix, suffix, trailing comma after a single item
+_COLLECTION_TYPES = (
+    (tuple, "(", ")", True),
+    (list, "[", "]", False),
+    (frozenset, "frozenset({", "})", False),
+    (set, "{", "}", False),
+    (deque, "deque([", "])", False),
+)
+
+# Mappings rendered item by item: type, prefix, suffix, item prefix, key/value separator, item suffix
+_MAPPING_TYPES = (
+    (OrderedDict, "OrderedDict([", "])", "(", ", ", ")"),
+    (dict, "{", "}", "", ": ", ""),
+)
+
+# Collections whose subclasses may override __repr__ with a full walk of their items
+_LONG_ITER_TYPES = (list, tuple, dict, set, frozenset, deque)
+
+
+class _BudgetSpent(Exception):
+    pass
+
+
+class _Writer:
+    """Collects output parts and raises _BudgetSpent as soon as the budget is used up."""
+
+    __slots__ = ("parts", "remaining", "truncated")
+
+    def __init__(self, budget: int):
+        self.parts: List[str] = []
+        self.remaining = budget
+        self.truncated = False
+
+    def write(self, text: str) -> None:
+        if len(text) > self.remaining:
+            self.parts.append(text[:self.remaining])
+            self.remaining = 0
+            raise _BudgetSpent
+        self.parts.append(text)
+        self.remaining -= len(text)
+
+
+class BudgetedRepr:
+    """
+    Renders repr-like previews in a single pass that stops when a character budget is spent.
+
+    Built-in collections and mappings are rendered item by item, showing at most
+    max_items[level] items at each nesting level and "..." past the last level,
+    so a preview never walks more than it shows. str, bytes, bytearray and
+    memoryview are sliced before repr, so previewing a gigabyte buffer only
+    copies a few hundred bytes. Strings longer than max_string (outer limit at
+    the top level, inner limit inside collections) show their head and tail.
+    Other objects are repr()'d and trimmed to max_other the same way; their
+    cost is up to their own __repr__.
+    """
+
+    def __init__(
+        self,
+        max_items: Tuple[int, ...] = (60, 20),
+        max_string: Tuple[int, int] = (2**16, 128),
+        max_other: Tuple[int, int] = (2**16, 128),
+        budget: int = 2**16
+    ):
+        self.max_items = max_items
+        self.max_string = max_string
+        self.max_other = max_other
+        self.budget = budget
+
+    def __call__(self, obj: Any, budget: Optional[int] = None) -> str:
+        return self.preview(obj, budget)[0]
+
+    def preview(self, obj: Any, budget: Optional[int] = None) -> Tuple[str, bool]:
+        """Return (preview, is_truncated), with at most budget characters before a final "..."."""
+        return self._run(lambda writer: self._render(obj, 0, writer, set()), budget)
+
+    def preview_sequence(
+        self,
+        obj: Any,
+        prefix: str,
+        suffix: str,
+        budget: Optional[int] = None,
+        single_comma: bool = False
+    ) -> Tuple[str, bool]:
+        """Preview any iterable item by item, even if its type overrides __repr__."""
+        return self._run(
+            lambda writer: self._render_items(obj, 0, writer, set(), prefix, suffix, single_comma),
+            budget
+        )
+
+    def preview_mapping(self, obj: Any, budget: Optional[int] = None) -> Tuple[str, bool]:
+        """Preview any mapping as {key: value, ...}, even if its type overrides __repr__."""
+        return self._run(
+            lambda writer: self._render_mapping(obj, 0, writer, set(), "{", "}", "", ": ", ""),
+            budget
+        )
+
+    def _run(self, render: Callable[[_Writer], None], budget: Optional[int]) -> Tuple[str, bool]:
+        writer = _Writer(self.budget if budget is None else max(0, budget))
+        try:
+            render(writer)
+        except _BudgetSpent:
+            return "".join(writer.parts) + "...", True
+        except Exception as e:
+            try:
+                return f"An exception was raised: {e!r}", False
+            except Exception:
+                return "An exception was raised", False
+        return "".join(writer.parts), writer.truncated
+
+    def _render(self, obj: Any, level: int, writer: _Writer, active: Set[int]) -> None:
+        obj_type = type(obj)
+        try:
+            obj_repr = obj_type.__repr__
+        except Exception:
+            obj_repr = None
+
+        for base, prefix, suffix, single_comma in _COLLECTION_TYPES:
+            if isinstance(obj, base) and obj_repr is base.__repr__:
+                return self._render_items(obj, level, writer, active, prefix, suffix, single_comma)
+
+        for base, prefix, suffix, item_prefix, separator, item_suffix in _MAPPING_TYPES:
+            if isinstance(obj, base) and obj_repr is base.__repr__:
+                return self._render_mapping(
+                    obj, level, writer, active, prefix, suffix, item_prefix, separator, item_suffix
+                )
+
+        for base in (str, bytes):
+            if isinstance(obj, base) and obj_repr is base.__repr__:
+                return self._render_text(obj, len(obj), level, writer, "", "")
+
+        if isinstance(obj, bytearray) and obj_repr is bytearray.__repr__:
+            return self._render_text(obj, len(obj), level, writer, "bytearray(", ")", bytes)
+
+        if isinstance(obj, memoryview) and obj.ndim == 1 and obj.format in ("B", "b", "c"):
+            return self._render_text(obj, len(obj), level, writer, "memoryview(", ")", memoryview.tobytes)
+
+        if isinstance(obj, int) and obj_repr is int.__repr__ and obj.bit_length() > 3 * min(writer.remaining, 4000):
+            # repr() of a huge int is quadratic (and refused past 4300 digits by default)
+            writer.truncated = True
+            return writer.write(f"<int with {obj.bit_length()} bits>")
+
+        if isinstance(obj, _LONG_ITER_TYPES):
+            # A subclass with its own repr: summarize it rather than let it walk every item
+            try:
+                length = len(obj)
+            except Exception:
+                length = None
+            if length is not None and (level >= len(self.max_items) or length > self.max_items[level]):
+                writer.truncated = True
+                return writer.write(f"<{obj_type.__name__}, len() = {length}>")
+
+        return self._render_other(obj, level, writer)
+
+    def _render_items(
+        self,
+        obj: Any,
+        level: int,
+        writer: _Writer,
+        active: Set[int],
+        prefix: str,
+        suffix: str,
+        single_comma: bool
+    ) -> None:
+        if len(obj) == 0:
+            return writer.write(repr(obj))
+        if level >= len(self.max_items) or id(obj) in active:
+            writer.truncated = True
+            return writer.write(prefix + "..." + suffix)
+
+        writer.write(prefix)
+        active.add(id(obj))
+        limit = self.max_items[level]
+        count = 0
+        for item in obj:
+            if count:
+                writer.write(", ")
+            if count >= limit:
+                writer.truncated = True
+                writer.write("...")
+                break
+            self._render(item, level + 1, writer, active)
+            count += 1
+        else:
+            if single_comma and count == 1:
+                writer.write(",")
+        active.discard(id(obj))
+        writer.write(suffix)
+
+    def _render_mapping(
+        self,
+        obj: Any,
+        level: int,
+        writer: _Writer,
+        active: Set[int],
+        prefix: str,
+        suffix: str,
+        item_prefix: str,
+        separator: str,
+        item_suffix: str
+    ) -> None:
+        if len(obj) == 0:
+            return writer.write(prefix + suffix)
+        if level >= len(self.max_items) or id(obj) in active:
+            writer.truncated = True
+            return writer.write(prefix + "..." + suffix)
+
+        writer.write(prefix)
+        active.add(id(obj))
+        limit = self.max_items[level]
+        count = 0
+        for key, value in obj.items():
+            if count:
+                writer.write(", ")
+            if count >= limit:
+                writer.truncated = True
+                writer.write("...")
+                break
+            writer.write(item_prefix)
+            self._render(key, level + 1, writer, active)
+            writer.write(separator)
+            self._render(value, level + 1, writer, active)
+            writer.write(item_suffix)
+            count += 1
+        active.discard(id(obj))
+        writer.write(suffix)
+
+    def _render_text(
+        self,
+        obj: Any,
+        length: int,
+        level: int,
+        writer: _Writer,
+        prefix: str,
+        suffix: str,
+        to_literal: Optional[Callable[[Any], Any]] = None
+    ) -> None:
+        def literal(start: int, stop: int) -> str:
+            part = obj[start:stop]
+            return repr(to_literal(part) if to_literal is not None else part)
+
+        # Every element takes at least one character, so no more than this can be shown
+        visible = writer.remaining + 1
+        limit = self.max_string[min(level, 1)]
+        writer.write(prefix)
+        if length <= limit or limit >= writer.remaining:
+            # The budget cuts the text first, so only its head is shown
+            writer.write(literal(0, min(length, visible)))
+        else:
+            # Head and tail, each sliced before repr; the head may be cut by the budget
+            head_count, tail_count = max(1, 2 * limit // 3), max(1, limit // 3)
+            head = literal(0, min(head_count, visible))
+            tail = literal(length - tail_count, length)
+            writer.truncated = True
+            writer.write(head[:-1])
+            writer.write("...")
+            writer.write(tail[tail.index(tail[-1]) + 1:])
+        writer.write(suffix)
+
+    def _render_other(self, obj: Any, level: int, writer: _Writer) -> None:
+        try:
+            text = repr(obj)
+        except Exception:
+            try:
+                text = object.__repr__(obj)
+            except Exception:
+                text = f"<no repr available for {type(obj).__name__}>"
+
+        limit = self.max_other[min(level, 1)]
+        if len(text) <= limit or limit >= writer.remaining:
+            return writer.write(text)
+        writer.truncated = True
+        head_count, tail_count = max(1, 2 * limit // 3), max(1, limit // 3)
+        writer.write(text[:head_count])
+        writer.write("...")
+        writer.write(text[-tail_count:])
+
+
+# Limits for the one-line value column of the Variables pane
+PANE_MAX_ITEMS = 5
+PANE_MAX_STRING = 100
+
+
+@functools.lru_cache(maxsize=None)
+def pane_repr(max_items: int = PANE_MAX_ITEMS) -> BudgetedRepr:
+    """Return the engine for the Variables pane value column, showing max_items top-level items."""
+    limits = (PANE_MAX_STRING, PANE_MAX_STRING)
+    return BudgetedRepr((max_items, PANE_MAX_ITEMS), limits, limits, PANE_MAX_STRING)
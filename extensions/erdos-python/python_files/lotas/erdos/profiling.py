@@ -0,0 +1,340 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Column profiles for table summaries - vectorized, sampled for large tables, cached per table version."""
+
+from __future__ import annotations
+
+import logging
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from .table_ops import null_mask
+
+if TYPE_CHECKING:
+    from .data_explorer import TableView
+
+logger = logging.getLogger(__name__)
+
+# Tables with more rows are profiled from a uniform sample of this many rows
+SAMPLE_THRESHOLD = 200_000
+SAMPLE_SIZE = 100_000
+
+HISTOGRAM_BINS = 20
+TOP_K = 10
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Longer values in frequency tables are truncated
+MAX_VALUE_LENGTH = 100
+
+# id(table) -> (weakref to table, fingerprint, request key, summary)
+_summary_cache: OrderedDict[int, tuple] = OrderedDict()
+_CACHE_MAX_ENTRIES = 16
+
+
+def summarize_table(
+    view: TableView,
+    query_types: Sequence[str],
+    fingerprint: Any = None,
+    column_indices: Optional[Sequence[int]] = None
+) -> Dict[str, Any]:
+    """
+    Return the schema of a table and, for each requested query type, column profiles.
+    
+    Query types are "null_count", "summary_stats", "histogram" and
+    "frequency_table". Every column is profiled in one vectorized pass over its
+    values, or over the same uniform row sample for tables with more than
+    SAMPLE_THRESHOLD rows. Sampled counts are scaled to the full table, and
+    distinct counts are estimated. Results are cached against the table's
+    fingerprint, so asking again about an unchanged table is free.
+    """
+    request_key = (tuple(query_types), None if column_indices is None else tuple(column_indices))
+    cached = _cache_lookup(view.table, fingerprint, request_key)
+    if cached is not None:
+        return cached
+    
+    num_rows, num_columns = view.shape()
+    if column_indices is None:
+        column_indices = range(num_columns)
+    column_indices = [int(i) for i in column_indices if 0 <= int(i) < num_columns]
+    
+    positions = _sample_positions(num_rows)
+    sample_size = num_rows if positions is None else len(positions)
+    
+    schemas = [view.column_schema(i) for i in column_indices]
+    profiles: List[Dict[str, Any]] = []
+    if query_types:
+        for index, schema in zip(column_indices, schemas):
+            try:
+                column = view.column_sample(index, positions)
+                profile = profile_column(column, schema["type_display"], query_types, num_rows)
+            except Exception as e:
+                logger.warning(f"[PROFILING] Failed to profile column {schema['column_name']}: {e}")
+                profile = {}
+            profiles.append({
+                "column_name": schema["column_name"],
+                "column_index": index,
+                "type_display": schema["type_display"],
+                **profile
+            })
+    
+    summary = {
+        "num_rows": int(num_rows),
+        "num_columns": int(num_columns),
+        "column_schemas": schemas,
+        "column_profiles": profiles,
+        "sampled": positions is not None,
+        "sample_size": int(sample_size)
+    }
+    _cache_store(view.table, fingerprint, request_key, summary)
+    return summary
+
+
+def profile_column(column: Any, type_display: str, query_types: Sequence[str], num_rows: int) -> Dict[str, Any]:
+    """
+    Profile one column (a numpy array or pandas Series, possibly a sample of num_rows rows).
+    
+    Counts are scaled from the sample to num_rows.
+    """
+    import numpy as np
+    
+    sample_size = len(column)
+    scale = num_rows / sample_size if sample_size else 1.0
+    nulls = null_mask(column)
+    null_count = int(np.count_nonzero(nulls))
+    
+    profile: Dict[str, Any] = {}
+    if "null_count" in query_types or "summary_stats" in query_types:
+        profile["null_count"] = _scaled(null_count, scale)
+    
+    wants_stats = "summary_stats" in query_types
+    wants_histogram = "histogram" in query_types
+    wants_frequencies = "frequency_table" in query_types
+    if not (wants_stats or wants_histogram or wants_frequencies):
+        return profile
+    
+    if type_display in ("number", "boolean"):
+        values = _float_values(column, nulls)
+        if type_display == "boolean":
+            if wants_stats:
+                true_count = int(np.count_nonzero(values))
+                profile["summary_stats"] = {
+                    "true_count": _scaled(true_count, scale),
+                    "false_count": _scaled(len(values) - true_count, scale)
+                }
+            return profile
+        if wants_stats:
+            profile["summary_stats"] = _number_stats(values, num_rows, scale)
+        if wants_histogram:
+            profile["histogram"] = _histogram(values, scale)
+        if wants_frequencies:
+            profile["frequency_table"] = _frequency_table(values, scale)
+        return profile
+    
+    if type_display == "datetime" and isinstance(column.dtype, np.dtype):
+        values = np.asarray(column)[~nulls]
+        if wants_stats:
+            profile["summary_stats"] = _datetime_stats(values, num_rows, scale)
+        if wants_frequencies:
+            profile["frequency_table"] = _frequency_table(values, scale)
+        return profile
+    
+    # Strings, categoricals, objects and tz-aware datetimes: everything comes from the value counts
+    codes, uniques = _factorize(column)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if wants_stats:
+        stats: Dict[str, Any] = {"num_unique": _distinct_count(counts, num_rows, scale)}
+        if type_display == "string":
+            empty = [i for i, value in enumerate(uniques) if value == ""]
+            stats["num_empty"] = _scaled(int(counts[empty].sum()) if empty else 0, scale)
+        profile["summary_stats"] = stats
+    if wants_frequencies:
+        profile["frequency_table"] = _top_values(counts, uniques, scale)
+    return profile
+
+
+def clear_summary_cache() -> None:
+    """Forget all cached table summaries."""
+    _summary_cache.clear()
+
+
+def _number_stats(values: Any, num_rows: int, scale: float) -> Dict[str, Any]:
+    import numpy as np
+    
+    if not len(values):
+        return {}
+    finite = values[np.isfinite(values)]
+    stats: Dict[str, Any] = {
+        "min_value": _json_number(values.min()),
+        "max_value": _json_number(values.max()),
+    }
+    if len(finite):
+        # One partition pass yields every quantile
+        quantiles = np.quantile(finite, QUANTILES)
+        stats.update({
+            "mean": _json_number(finite.mean()),
+            "stdev": _json_number(finite.std(ddof=1)) if len(finite) > 1 else None,
+            "q25": _json_number(quantiles[0]),
+            "median": _json_number(quantiles[1]),
+            "q75": _json_number(quantiles[2]),
+        })
+    _, counts = np.unique(values, return_counts=True)
+    stats["num_unique"] = _distinct_count(counts, num_rows, scale)
+    return stats
+
+
+def _datetime_stats(values: Any, num_rows: int, scale: float) -> Dict[str, Any]:
+    import numpy as np
+    
+    if not len(values):
+        return {}
+    ticks = np.sort(values.view('i8'))
+    _, counts = np.unique(ticks, return_counts=True)
+    
+    def as_datetime(tick: Any) -> str:
+        return str(np.int64(tick).astype(values.dtype))
+    
+    return {
+        "min_date": as_datetime(ticks[0]),
+        "max_date": as_datetime(ticks[-1]),
+        "median_date": as_datetime(ticks[len(ticks) // 2]),
+        "num_unique": _distinct_count(counts, num_rows, scale),
+    }
+
+
+def _histogram(values: Any, scale: float) -> Dict[str, Any]:
+    import numpy as np
+    
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {"bin_edges": [], "bin_counts": []}
+    bin_counts, bin_edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+    return {
+        "bin_edges": [_json_number(edge) for edge in bin_edges],
+        "bin_counts": [_scaled(int(count), scale) for count in bin_counts],
+    }
+
+
+def _frequency_table(values: Any, scale: float) -> Dict[str, Any]:
+    import numpy as np
+    
+    uniques, counts = np.unique(values, return_counts=True)
+    return _top_values(counts, uniques, scale)
+
+
+def _top_values(counts: Any, uniques: Any, scale: float) -> Dict[str, Any]:
+    """The TOP_K most frequent values and their (scaled) counts."""
+    import numpy as np
+    
+    k = min(TOP_K, len(counts))
+    if not k:
+        return {"values": [], "counts": [], "other_count": 0}
+    top = np.argpartition(counts, len(counts) - k)[-k:]
+    top = top[np.argsort(-counts[top], kind='stable')]
+    top_total = int(counts[top].sum())
+    return {
+        "values": [str(uniques[i])[:MAX_VALUE_LENGTH] for i in top.tolist()],
+        "counts": [_scaled(int(counts[i]), scale) for i in top.tolist()],
+        "other_count": _scaled(int(counts.sum()) - top_total, scale),
+    }
+
+
+def _distinct_count(counts: Any, num_rows: int, scale: float) -> int:
+    """
+    Number of distinct values, estimated when counts come from a sample.
+    
+    Uses the GEE estimator: values seen once in the sample are scaled by
+    sqrt(num_rows / sample size), values seen more often are counted once.
+    """
+    import numpy as np
+    
+    if scale <= 1.0:
+        return int(len(counts))
+    singletons = int(np.count_nonzero(counts == 1))
+    if singletons == len(counts):
+        # Every sampled value is unique: most likely a key-like column
+        return int(num_rows)
+    return min(int(round(np.sqrt(scale) * singletons)) + int(len(counts)) - singletons, int(num_rows))
+
+
+def _factorize(column: Any):
+    """Return (integer codes with -1 for missing values, distinct values)."""
+    import numpy as np
+    
+    try:
+        import pandas as pd
+    except ImportError:
+        nulls = null_mask(column)
+        uniques, codes = np.unique(column.astype(str), return_inverse=True)
+        codes[nulls] = -1
+        return codes, uniques
+    codes, uniques = pd.factorize(column)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _float_values(column: Any, nulls: Any) -> Any:
+    """Non-missing values of a numeric or boolean column as a numpy array."""
+    import numpy as np
+    
+    if isinstance(column, np.ndarray):
+        values = column
+    elif isinstance(column.dtype, np.dtype):
+        values = column.to_numpy()
+    else:
+        # Nullable extension dtypes
+        values = column.to_numpy(dtype=float, na_value=np.nan)
+    if values.dtype.kind == 'c':
+        values = np.abs(values)
+    return values[~nulls]
+
+
+def _sample_positions(num_rows: int) -> Optional[Any]:
+    """Sorted uniform sample of row positions, or None if the whole table is profiled."""
+    import numpy as np
+    
+    if num_rows <= SAMPLE_THRESHOLD:
+        return None
+    # Fixed seed, so the same table always gets the same summary
+    rng = np.random.default_rng(0)
+    return np.sort(rng.choice(num_rows, size=SAMPLE_SIZE, replace=False))
+
+
+def _scaled(count: int, scale: float) -> int:
+    return int(round(count * scale))
+
+
+def _json_number(value: Any) -> Any:
+    """Convert a numpy scalar to a JSON-safe value (non-finite values become strings)."""
+    import math
+    value = value.item() if hasattr(value, 'item') else value
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    return value
+
+
+def _cache_lookup(table: Any, fingerprint: Any, request_key: Any) -> Optional[Dict[str, Any]]:
+    if fingerprint is None:
+        return None
+    entry = _summary_cache.get(id(table))
+    if entry is None:
+        return None
+    ref, cached_fingerprint, cached_request, summary = entry
+    if ref() is not table or cached_fingerprint != fingerprint or cached_request != request_key:
+        return None
+    _summary_cache.move_to_end(id(table))
+    return summary
+
+
+def _cache_store(table: Any, fingerprint: Any, request_key: Any, summary: Dict[str, Any]) -> None:
+    # Only weak-referenceable tables are cached, so a recycled id() is never trusted
+    if fingerprint is None:
+        return
+    try:
+        ref = weakref.ref(table)
+    except TypeError:
+        return
+    _summary_cache[id(table)] = (ref, fingerprint, request_key, summary)
+    _summary_cache.move_to_end(id(table))
+    while len(_summary_cache) > _CACHE_MAX_ENTRIES:
+        _summary_cache.popitem(last=False)
@@ -0,0 +1,316 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Background sampling of the kernel process tree's memory, CPU, threads and file descriptors."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from comm.base_comm import BaseComm
+
+logger = logging.getLogger(__name__)
+
+# Seconds between samples
+DEFAULT_INTERVAL = 2.0
+MIN_INTERVAL = 0.25
+
+# Events are sent at most this often (seconds), and when nothing changed much only this often
+MIN_EVENT_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 30.0
+
+# A sample is sent early when RSS moved by this fraction, or CPU by this many percentage points
+RSS_CHANGE = 0.02
+CPU_CHANGE = 10.0
+
+# Fraction of the memory limit at which a memory_warning event is sent
+DEFAULT_WARNING_FRACTION = 0.8
+
+
+class ResourceMonitorService:
+    """
+    Streams the resource usage of the kernel and its child processes.
+
+    While at least one comm is open, a daemon thread samples RSS, CPU percent,
+    thread count and open file descriptors (handles on Windows) summed over
+    the kernel process tree. Samples are sent as "resource_usage" events when
+    they differ noticeably from the last one sent, at most once per
+    MIN_EVENT_INTERVAL and at least once per HEARTBEAT_INTERVAL.
+
+    The soft memory limit defaults to the container's cgroup limit, or the
+    machine's physical memory. Crossing warning_fraction of it sends one
+    "memory_warning" event; the warning re-arms once usage drops back below
+    the threshold.
+    """
+
+    def __init__(self):
+        # Store active comm channels by comm_id
+        self._comms: Dict[str, BaseComm] = {}
+
+        self.interval = DEFAULT_INTERVAL
+        self.memory_limit: Optional[int] = None
+        self.warning_fraction = DEFAULT_WARNING_FRACTION
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # pid -> psutil.Process, kept so cpu_percent() measures from the previous sample
+        self._processes: Dict[int, Any] = {}
+        self._last_sent: Optional[Dict[str, Any]] = None
+        self._last_sent_time = 0.0
+        self._warned = False
+
+    def on_comm_open(self, comm: BaseComm, msg: Dict[str, Any]) -> None:
+        """Handle comm_open - register handlers and start sampling."""
+        logger.info(f"[RESOURCE MONITOR] on_comm_open called for comm_id: {comm.comm_id}")
+        self._comms[comm.comm_id] = comm
+        comm.on_msg(lambda msg: self.handle_msg(comm, msg))
+        comm.on_close(lambda msg: self._on_comm_close(comm))
+
+        data = msg.get("content", {}).get("data", {}) or {}
+        try:
+            self.configure(**data)
+        except Exception as e:
+            logger.warning(f"[RESOURCE MONITOR] Ignoring invalid settings {data}: {e}")
+        # The new comm gets a sample right away rather than after the next change
+        self._last_sent = None
+        self.start()
+
+    def handle_msg(self, comm: BaseComm, msg: Dict[str, Any]) -> None:
+        """Handle JSON-RPC messages received from the client."""
+        data = msg.get("content", {}).get("data", {})
+        method = data.get("method")
+        request_id = data.get("id")
+        params = data.get("params", {}) or {}
+
+        result = None
+        error = None
+        reply_method = None
+        try:
+            if method == "configure":
+                result = self.configure(**params)
+                reply_method = "configure_reply"
+
+            elif method == "get_usage":
+                result = self.sample()
+                reply_method = "get_usage_reply"
+
+            else:
+                error = f"Method not found: {method}"
+
+        except Exception as e:
+            logger.error(f"[RESOURCE MONITOR] Error in handler: {e}", exc_info=True)
+            error = f"Internal error: {str(e)}"
+
+        response: Dict[str, Any] = {"jsonrpc": "2.0"}
+        if error:
+            response["error"] = {"message": error}
+        else:
+            method_name = ''.join(word.capitalize() for word in reply_method.split('_'))
+            response["result"] = {"method": method_name, "result": result}
+        if request_id:
+            response["id"] = request_id
+        comm.send(response)
+
+    def configure(
+        self,
+        interval: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        warning_fraction: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Change the sampling interval and memory limit; return the current settings."""
+        if interval is not None:
+            self.interval = max(MIN_INTERVAL, float(interval))
+        if memory_limit is not None:
+            # 0 goes back to the detected limit
+            self.memory_limit = int(memory_limit) or None
+            self._warned = False
+        if warning_fraction is not None:
+            if not 0 < float(warning_fraction) <= 1:
+                raise ValueError(f"warning_fraction must be in (0, 1], got {warning_fraction}")
+            self.warning_fraction = float(warning_fraction)
+            self._warned = False
+        return {
+            "interval": self.interval,
+            "memory_limit": self._memory_limit(),
+            "warning_fraction": self.warning_fraction,
+        }
+
+    def start(self) -> None:
+        """Start the sampling thread if it is not running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            try:
+                import psutil  # noqa: F401
+            except ImportError:
+                logger.warning("[RESOURCE MONITOR] psutil is not installed; resource monitoring is disabled")
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="erdos-resource-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampling thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def shutdown(self) -> None:
+        """Shutdown the service and close all comms."""
+        self.stop()
+        for comm in list(self._comms.values()):
+            with contextlib.suppress(Exception):
+                comm.close()
+        self._comms.clear()
+
+    def sample(self) -> Dict[str, Any]:
+        """Measure the kernel process tree now."""
+        import psutil
+
+        root = self._process(os.getpid())
+        processes = [root]
+        with contextlib.suppress(psutil.Error):
+            processes.extend(self._process(child.pid) for child in root.children(recursive=True))
+
+        rss = 0
+        cpu_percent = 0.0
+        num_threads = 0
+        num_fds = 0
+        alive = set()
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    cpu_percent += process.cpu_percent(None)
+                    num_threads += process.num_threads()
+                    num_fds += process.num_fds() if hasattr(process, 'num_fds') else process.num_handles()
+                alive.add(process.pid)
+            except psutil.Error:
+                # Exited or not ours to inspect
+                continue
+        # Forget processes that have exited
+        for pid in list(self._processes):
+            if pid not in alive:
+                del self._processes[pid]
+
+        memory_limit = self._memory_limit()
+        return {
+            "timestamp": time.time(),
+            "rss": rss,
+            "cpu_percent": round(cpu_percent, 1),
+            "num_threads": num_threads,
+            "num_fds": num_fds,
+            "num_processes": len(alive),
+            "memory_limit": memory_limit,
+            "memory_fraction": rss / memory_limit if memory_limit else None,
+            "available_memory": psutil.virtual_memory().available,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                usage = self.sample()
+                self._check_memory(usage)
+                if self._should_send(usage):
+                    self._send_event("resource_usage", usage)
+            except Exception as e:
+                logger.error(f"[RESOURCE MONITOR] Sampling failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _should_send(self, usage: Dict[str, Any]) -> bool:
+        now = time.monotonic()
+        last = self._last_sent
+        elapsed = now - self._last_sent_time
+        if last is not None and elapsed < MIN_EVENT_INTERVAL:
+            return False
+        if (
+            last is None
+            or elapsed >= HEARTBEAT_INTERVAL
+            or abs(usage["rss"] - last["rss"]) > RSS_CHANGE * max(last["rss"], 1)
+            or abs(usage["cpu_percent"] - last["cpu_percent"]) >= CPU_CHANGE
+            or usage["num_threads"] != last["num_threads"]
+            or usage["num_fds"] != last["num_fds"]
+            or usage["num_processes"] != last["num_processes"]
+        ):
+            self._last_sent = usage
+            self._last_sent_time = now
+            return True
+        return False
+
+    def _check_memory(self, usage: Dict[str, Any]) -> None:
+        limit = usage["memory_limit"]
+        if not limit:
+            return
+        threshold = limit * self.warning_fraction
+        if usage["rss"] < threshold:
+            self._warned = False
+            return
+        if self._warned:
+            return
+        self._warned = True
+        logger.warning(f"[RESOURCE MONITOR] Kernel memory {usage['rss']} bytes is above {threshold:.0f} of {limit}")
+        self._send_event("memory_warning", {
+            "rss": usage["rss"],
+            "memory_limit": limit,
+            "threshold": int(threshold),
+            "memory_fraction": usage["memory_fraction"],
+        })
+
+    def _send_event(self, method: str, params: Dict[str, Any]) -> None:
+        for comm in list(self._comms.values()):
+            try:
+                comm.send({"method": method, "params": params})
+            except Exception as e:
+                logger.error(f"[RESOURCE MONITOR] Failed to send {method}: {e}")
+
+    def _on_comm_close(self, comm: BaseComm) -> None:
+        self._comms.pop(comm.comm_id, None)
+        if not self._comms:
+            self.stop()
+
+    def _process(self, pid: int) -> Any:
+        import psutil
+
+        process = self._processes.get(pid)
+        if process is None:
+            process = self._processes[pid] = psutil.Process(pid)
+            # The first cpu_percent() call only starts the measurement
+            with contextlib.suppress(psutil.Error):
+                process.cpu_percent(None)
+        return process
+
+    def _memory_limit(self) -> Optional[int]:
+        if self.memory_limit:
+            return self.memory_limit
+        limit = _cgroup_memory_limit()
+        if limit is None:
+            with contextlib.suppress(Exception):
+                import psutil
+                limit = psutil.virtual_memory().total
+        return limit
+
+
+def _cgroup_memory_limit() -> Optional[int]:
+    """The memory limit of the container the kernel runs in, if any (Linux cgroups v2 or v1)."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            limit = int(value)
+            # cgroups v1 reports "no limit" as a huge page-aligned number
+            if limit < 1 << 60:
+                return limit
+        return None
+    return None
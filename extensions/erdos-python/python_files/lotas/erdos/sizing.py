@@ -0,0 +1,158 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Deep memory accounting for the Variables pane - bounded, deduplicated size estimates."""
+
+from __future__ import annotations
+
+import logging
+import sys
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional, Set
+
+from .inspectors import get_inspector
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of objects visited per estimate; the rest is extrapolated
+DEFAULT_BUDGET = 20_000
+
+# Containers nested deeper than this are counted shallowly
+MAX_DEPTH = 64
+
+# Subtrees that took at least this many visits are remembered between estimates
+_CACHE_MIN_VISITS = 64
+_CACHE_MAX_ENTRIES = 4096
+
+# id(obj) -> (weakref to obj, fingerprint, size)
+_size_cache: OrderedDict[int, tuple] = OrderedDict()
+
+
+class SizeEstimator:
+    """
+    Estimates the memory retained by an object graph.
+    
+    Native buffers are measured through each type's inspector (numpy nbytes,
+    pandas memory_usage, Arrow buffer sizes). Python containers are walked
+    depth-first, counting every object at most once. The walk stops after
+    `budget` objects, and the unvisited part of a container is extrapolated
+    from the average size of its visited elements. Sizes of large subtrees are
+    cached against the inspector fingerprint, so unchanged parts of the
+    namespace are not walked again on the next estimate.
+    """
+    
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self._seen: Set[int] = set()
+        self._seen_buffers: Set[int] = set()
+    
+    def estimate(self, obj: Any) -> int:
+        """Return the estimated number of bytes retained by obj."""
+        try:
+            return self._size(obj, 0)
+        except RecursionError:
+            logger.warning(f"[SIZING] Recursion limit reached sizing {type(obj).__name__}")
+            return 0
+    
+    def _size(self, obj: Any, depth: int) -> int:
+        obj_id = id(obj)
+        if obj_id in self._seen:
+            return 0
+        self._seen.add(obj_id)
+        self.budget -= 1
+        
+        inspector = get_inspector(obj)
+        fingerprint = _safe_fingerprint(inspector, obj)
+        cached = _cache_lookup(obj, fingerprint)
+        if cached is not None:
+            return cached
+        
+        budget_before = self.budget
+        try:
+            owner = inspector.buffer_owner(obj)
+            if owner is None:
+                total = inspector.size(obj)
+            elif id(owner) in self._seen_buffers:
+                # Another view of the same buffer was already counted
+                total = sys.getsizeof(obj) if owner is not obj else 0
+            else:
+                # A view retains its whole base buffer, so that is what gets counted
+                self._seen_buffers.add(id(owner))
+                total = get_inspector(owner).size(owner)
+                if owner is not obj:
+                    self._seen.add(id(owner))
+                    total += sys.getsizeof(obj)
+        except Exception:
+            total = 0
+        
+        if depth < MAX_DEPTH:
+            total += self._size_referents(inspector, obj, depth)
+        
+        if budget_before - self.budget >= _CACHE_MIN_VISITS:
+            _cache_store(obj, fingerprint, total)
+        return total
+    
+    def _size_referents(self, inspector: Any, obj: Any, depth: int) -> int:
+        try:
+            referents, count = inspector.referents(obj)
+        except Exception:
+            return 0
+        
+        visited = 0
+        subtotal = 0
+        try:
+            for child in referents:
+                if self.budget <= 0:
+                    break
+                subtotal += self._size(child, depth + 1)
+                visited += 1
+        except Exception as e:
+            logger.debug(f"[SIZING] Failed walking {type(obj).__name__}: {e}")
+            return subtotal
+        
+        # Out of budget: extrapolate the rest from the average visited element
+        if visited and visited < count:
+            subtotal += subtotal // visited * (count - visited)
+        return subtotal
+
+
+def estimate_size(obj: Any, budget: int = DEFAULT_BUDGET) -> int:
+    """Estimate the memory retained by obj, visiting at most `budget` objects."""
+    return SizeEstimator(budget).estimate(obj)
+
+
+def clear_size_cache() -> None:
+    """Forget all cached subtree sizes."""
+    _size_cache.clear()
+
+
+def _safe_fingerprint(inspector: Any, obj: Any) -> Any:
+    try:
+        return inspector.fingerprint(obj)
+    except Exception:
+        return None
+
+
+def _cache_lookup(obj: Any, fingerprint: Any) -> Optional[int]:
+    entry = _size_cache.get(id(obj))
+    if entry is None:
+        return None
+    ref, cached_fingerprint, size = entry
+    if ref() is not obj or cached_fingerprint != fingerprint:
+        del _size_cache[id(obj)]
+        return None
+    _size_cache.move_to_end(id(obj))
+    return size
+
+
+def _cache_store(obj: Any, fingerprint: Any, size: int) -> None:
+    # Only weak-referenceable objects are cached, so a recycled id() is never trusted
+    try:
+        ref = weakref.ref(obj)
+    except TypeError:
+        return
+    _size_cache[id(obj)] = (ref, fingerprint, size)
+    _size_cache.move_to_end(id(obj))
+    while len(_size_cache) > _CACHE_MAX_ENTRIES:
+        _size_cache.popitem(last=False)
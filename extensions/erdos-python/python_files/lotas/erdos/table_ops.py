@@ -0,0 +1,330 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Vectorized sort and filter for data explorer tables, and the cache of their results."""
+
+from __future__ import annotations
+
+import logging
+import operator
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_COMPARE_OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class RowOrderCache:
+    """
+    LRU cache of sort permutations, filter masks and combined row orders.
+    
+    Keys include the viewer id, the table version and the sort or filter spec,
+    so entries for stale table versions are never returned; they just age out.
+    The cache is bounded by the total nbytes of the cached arrays.
+    """
+    
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._total_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached array for key, if any."""
+        array = self._entries.get(key)
+        if array is not None:
+            self._entries.move_to_end(key)
+        return array
+    
+    def put(self, key: Hashable, array: Any) -> None:
+        """Cache an array, evicting least recently used entries."""
+        self.discard(key)
+        if array.nbytes > self.max_bytes:
+            return
+        self._entries[key] = array
+        self._total_bytes += array.nbytes
+        while self._total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.nbytes
+    
+    def discard(self, key: Hashable) -> None:
+        """Drop the entry for key, if any."""
+        array = self._entries.pop(key, None)
+        if array is not None:
+            self._total_bytes -= array.nbytes
+    
+    def discard_viewer(self, viewer_id: str) -> None:
+        """Drop every entry of a viewer (keys start with the viewer id)."""
+        for key in [key for key in self._entries if key[0] == viewer_id]:
+            self.discard(key)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._total_bytes = 0
+
+
+def sort_order(columns: List[Tuple[Any, bool]]) -> Any:
+    """
+    Return the stable permutation sorting a table by the given columns.
+    
+    columns holds (column, ascending) pairs, most significant first; a column is
+    a numpy array or a pandas Series. Missing values sort last in either
+    direction.
+    """
+    import numpy as np
+    
+    # np.lexsort treats its last key as the most significant
+    keys = []
+    for column, ascending in reversed(columns):
+        key, nulls = _sort_key(column, ascending)
+        keys.append(key)
+        if nulls is not None and nulls.any():
+            keys.append(nulls)
+    
+    if len(keys) == 1:
+        order = np.argsort(keys[0], kind='stable')
+    else:
+        order = np.lexsort(keys)
+    return _compact_positions(order)
+
+
+def combine_row_order(permutation: Any, mask: Any) -> Any:
+    """Combine an optional sort permutation and an optional filter mask into row positions."""
+    import numpy as np
+    
+    if mask is None:
+        return permutation
+    if permutation is None:
+        return _compact_positions(np.flatnonzero(mask))
+    # Filtering a cached permutation keeps it sorted, nothing is re-sorted
+    return permutation[mask[permutation]]
+
+
+def filter_mask(column: Any, row_filter: Dict[str, Any]) -> Any:
+    """Evaluate one row filter over a whole column, returning a boolean numpy mask."""
+    import numpy as np
+    
+    filter_type = row_filter.get("filter_type")
+    nulls = null_mask(column)
+    
+    if filter_type == "is_null":
+        return nulls
+    if filter_type == "not_null":
+        return ~nulls
+    
+    if filter_type == "compare":
+        op = _COMPARE_OPS[row_filter["op"]]
+        mask = _as_bool(op(column, _coerce(column, row_filter["value"])))
+    elif filter_type in ("between", "not_between"):
+        left = _coerce(column, row_filter["left_value"])
+        right = _coerce(column, row_filter["right_value"])
+        mask = _as_bool(column >= left) & _as_bool(column <= right)
+        if filter_type == "not_between":
+            mask = ~mask
+    elif filter_type in ("is_true", "is_false"):
+        mask = _as_bool(column == (filter_type == "is_true"))
+    elif filter_type in ("is_empty", "not_empty"):
+        mask = _string_mask(column, lambda strings: strings == "")
+        if filter_type == "not_empty":
+            mask = ~mask
+    elif filter_type == "search":
+        predicate = _search_predicate(
+            str(row_filter.get("term", "")),
+            row_filter.get("search_type", "contains"),
+            bool(row_filter.get("case_sensitive", False))
+        )
+        mask = _string_mask(column, predicate)
+    elif filter_type == "set_membership":
+        values = [_coerce(column, value) for value in row_filter.get("values", [])]
+        if _is_numeric(column):
+            mask = _as_bool(np.isin(_values(column), values))
+        else:
+            strings = [str(value) for value in values]
+            mask = _string_mask(column, lambda column_strings: np.isin(column_strings, strings))
+        if not row_filter.get("inclusive", True):
+            mask = ~mask
+    else:
+        raise ValueError(f"Unknown filter type: {filter_type}")
+    
+    # Missing values never match a value filter
+    return mask & ~nulls
+
+
+def null_mask(column: Any) -> Any:
+    """Return a boolean numpy mask of the missing values of a column."""
+    import numpy as np
+    
+    if not isinstance(column, np.ndarray):
+        return np.asarray(column.isna(), dtype=bool)
+    
+    kind = column.dtype.kind
+    if kind in 'fc':
+        return np.isnan(column)
+    if kind in 'mM':
+        return np.isnat(column)
+    if kind == 'O':
+        is_missing = np.frompyfunc(lambda value: value is None or value != value, 1, 1)
+        return is_missing(column).astype(bool)
+    return np.zeros(len(column), dtype=bool)
+
+
+def _sort_key(column: Any, ascending: bool) -> Tuple[Any, Optional[Any]]:
+    """Return an order-preserving numeric key for a column and its missing-value mask."""
+    import numpy as np
+    
+    values = _values(column) if _is_numeric(column) or _is_datetime(column) else None
+    if values is not None and values.dtype.kind in 'biufmM':
+        kind = values.dtype.kind
+        if kind in 'mM':
+            nulls = np.isnat(values)
+            key = values.view('i8')
+        elif kind == 'f':
+            nulls = np.isnan(values)
+            key = values
+        elif kind == 'b':
+            nulls = None
+            key = values.view(np.uint8)
+        else:
+            nulls = None
+            key = values
+    else:
+        # Strings, categoricals and objects sort by their rank among the distinct values
+        key = _factorize(column)
+        nulls = key < 0
+    
+    if not ascending:
+        # Bitwise not reverses integer order without overflowing
+        key = -key if key.dtype.kind == 'f' else ~key
+    return key, nulls
+
+
+def _factorize(column: Any) -> Any:
+    """Return sorted integer codes for a column, with -1 for missing values."""
+    import numpy as np
+    
+    try:
+        import pandas as pd
+    except ImportError:
+        _, codes = np.unique(column.astype(str), return_inverse=True)
+        return codes
+    
+    try:
+        codes, _ = pd.factorize(column, sort=True)
+    except TypeError:
+        # Values of mixed, unorderable types sort by their string form
+        nulls = null_mask(column)
+        codes, _ = pd.factorize(_values(column.astype(str)), sort=True)
+        codes[nulls] = -1
+    return codes
+
+
+def _string_mask(column: Any, predicate: Callable[[Any], Any]) -> Any:
+    """
+    Evaluate a predicate over the string form of a column.
+    
+    The predicate runs once per distinct value, on a numpy str array, and the
+    result is mapped back to rows through the factorized codes.
+    """
+    import numpy as np
+    
+    try:
+        import pandas as pd
+    except ImportError:
+        return np.asarray(predicate(column.astype(str)), dtype=bool)
+    
+    codes, uniques = pd.factorize(column)
+    matches = np.asarray(predicate(np.asarray(uniques, dtype=object).astype(str)), dtype=bool)
+    # Code -1 (missing) picks the appended False
+    return np.append(matches, False)[codes]
+
+
+def _search_predicate(term: str, search_type: str, case_sensitive: bool) -> Callable[[Any], Any]:
+    import numpy as np
+    
+    if search_type == "regex_match":
+        pattern = re.compile(term, 0 if case_sensitive else re.IGNORECASE)
+        return lambda strings: np.frompyfunc(lambda value: pattern.search(value) is not None, 1, 1)(strings)
+    
+    def predicate(strings: Any) -> Any:
+        needle = term
+        if not case_sensitive:
+            strings = np.char.lower(strings)
+            needle = term.lower()
+        if search_type == "starts_with":
+            return np.char.startswith(strings, needle)
+        if search_type == "ends_with":
+            return np.char.endswith(strings, needle)
+        return np.char.find(strings, needle) >= 0
+    
+    return predicate
+
+
+def _coerce(column: Any, value: Any) -> Any:
+    """Convert a filter value sent as a string to the column's type."""
+    if not isinstance(value, str):
+        return value
+    dtype = getattr(column, 'dtype', None)
+    kind = getattr(dtype, 'kind', 'O')
+    if kind == 'b':
+        return value.strip().lower() in ("true", "1", "yes")
+    if kind in 'iu':
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    if kind in 'fc':
+        return float(value)
+    if kind == 'M':
+        try:
+            import pandas as pd
+            return pd.Timestamp(value)
+        except ImportError:
+            import numpy as np
+            return np.datetime64(value)
+    return value
+
+
+def _is_numeric(column: Any) -> bool:
+    kind = getattr(getattr(column, 'dtype', None), 'kind', 'O')
+    return kind in 'biufc'
+
+
+def _is_datetime(column: Any) -> bool:
+    import numpy as np
+    dtype = getattr(column, 'dtype', None)
+    # Only naive datetimes have an int64 representation in numpy
+    return isinstance(dtype, np.dtype) and dtype.kind in 'mM'
+
+
+def _values(column: Any) -> Any:
+    """Return the numpy values of an array or Series."""
+    import numpy as np
+    if isinstance(column, np.ndarray):
+        return column
+    return column.to_numpy()
+
+
+def _as_bool(result: Any) -> Any:
+    """Convert a comparison result (possibly with pandas NA) to a boolean numpy array."""
+    import numpy as np
+    if isinstance(result, np.ndarray):
+        return result.astype(bool, copy=False)
+    return result.to_numpy(dtype=bool, na_value=False)
+
+
+def _compact_positions(positions: Any) -> Any:
+    """Store row positions as int32 when they fit, halving the cache footprint."""
+    import numpy as np
+    if len(positions) < 2 ** 31:
+        return positions.astype(np.int32, copy=False)
+    return positions
@@ -0,0 +1,83 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Columnar encoding of Variables pane events, with field-level deltas against what was last sent."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List
+
+# Fields of a Variable record, in wire order
+VARIABLE_FIELDS = (
+    "access_key",
+    "display_name",
+    "display_value",
+    "display_type",
+    "type_info",
+    "size",
+    "kind",
+    "length",
+    "has_children",
+    "has_viewer",
+    "is_truncated",
+    "updated_time",
+)
+
+# Comms that pass this encoding in their comm_open data receive columnar events
+COLUMNAR_ENCODING = "columnar"
+
+
+def encode_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Lay out variable records as parallel arrays, one per field."""
+    return {field: [record[field] for record in records] for field in VARIABLE_FIELDS}
+
+
+class VariableDeltaEncoder:
+    """
+    Encodes changed variables as only the fields that differ from what was last sent.
+    
+    A delta is {"access_key": [keys], "fields": {field: {"rows": [...], "values": [...]}}}:
+    rows index into access_key, and a field is listed only for the rows where it
+    changed. Variables never sent before carry every field. Comms list and page
+    variables independently, so each columnar comm has its own encoder.
+    """
+    
+    def __init__(self):
+        # access key -> record last sent
+        self._sent: Dict[str, Dict[str, Any]] = {}
+    
+    def reset(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Start over from a full listing."""
+        self._sent = {record["access_key"]: record for record in records}
+    
+    def update(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Add the records of a partial listing, such as one page, keeping the rest of the baseline."""
+        for record in records:
+            self._sent[record["access_key"]] = record
+    
+    def forget(self, access_keys: Iterable[str]) -> None:
+        """Drop removed variables from the baseline."""
+        for access_key in access_keys:
+            self._sent.pop(access_key, None)
+    
+    def delta(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Encode records against the baseline, then make them the new baseline."""
+        access_keys: List[str] = []
+        fields: Dict[str, Dict[str, List[Any]]] = {
+            field: {"rows": [], "values": []} for field in VARIABLE_FIELDS[1:]
+        }
+        for row, record in enumerate(records):
+            access_key = record["access_key"]
+            access_keys.append(access_key)
+            previous = self._sent.get(access_key)
+            for field, column in fields.items():
+                value = record[field]
+                if previous is None or previous[field] != value:
+                    column["rows"].append(row)
+                    column["values"].append(value)
+            self._sent[access_key] = record
+        
+        return {
+            "access_key": access_keys,
+            "fields": {field: column for field, column in fields.items() if column["rows"]},
+        }
@@ -0,0 +1,104 @@
+# Copyright (C) 2025 Lotas Inc. All rights reserved.
+# Licensed under the AGPL-3.0 License. See License.txt in the project root for license information.
+
+"""Filtering, sorting and paging of the Variables pane listing."""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Params that turn a list request into a query; without any of them every variable is listed
+QUERY_PARAMS = ("filter", "match", "case_sensitive", "kinds", "sort_by", "descending", "start", "limit")
+
+MATCH_MODES = ("prefix", "glob", "regex")
+SORT_KEYS = ("name", "size", "updated_time")
+
+
+class VariableQuery:
+    """
+    Which variables a list request wants, in which order, and which page of them.
+
+    Names are filtered by prefix, glob or regular expression (case-insensitive
+    unless case_sensitive is set), then by inspector kind. Sorting by size or
+    update time falls back to name order for ties. Only names are needed to
+    filter by name, so the listing never formats variables outside the page.
+    """
+
+    def __init__(
+        self,
+        name_filter: Optional[str] = None,
+        match: str = "prefix",
+        case_sensitive: bool = False,
+        kinds: Optional[Sequence[str]] = None,
+        sort_by: str = "name",
+        descending: bool = False,
+        start: int = 0,
+        limit: Optional[int] = None
+    ):
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode {match}; expected one of {', '.join(MATCH_MODES)}")
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort_by}; expected one of {', '.join(SORT_KEYS)}")
+        self.kinds = frozenset(kinds) if kinds else None
+        self.sort_by = sort_by
+        self.descending = descending
+        self.start = max(0, int(start))
+        self.limit = None if limit is None else max(0, int(limit))
+        self._matches = _name_matcher(name_filter, match, case_sensitive)
+
+    @classmethod
+    def from_params(cls, params: Optional[Dict[str, Any]]) -> Optional[VariableQuery]:
+        """Build a query from list request params, or return None for a plain listing."""
+        if not params or not any(params.get(key) is not None for key in QUERY_PARAMS):
+            return None
+        return cls(
+            name_filter=params.get("filter"),
+            match=params.get("match") or "prefix",
+            case_sensitive=bool(params.get("case_sensitive")),
+            kinds=params.get("kinds"),
+            sort_by=params.get("sort_by") or "name",
+            descending=bool(params.get("descending")),
+            start=params.get("start") or 0,
+            limit=params.get("limit"),
+        )
+
+    def matches_name(self, name: str) -> bool:
+        return self._matches(name)
+
+    def matches_kind(self, kind: str) -> bool:
+        return self.kinds is None or kind in self.kinds
+
+    def order(self, names: List[str], sort_key: Optional[Callable[[str], Any]] = None) -> List[str]:
+        """Sort names by name, then by sort_key if given; both follow descending."""
+        names = sorted(names, reverse=self.descending)
+        if sort_key is not None:
+            # Stable, so ties keep name order
+            names.sort(key=sort_key, reverse=self.descending)
+        return names
+
+    def page(self, names: List[str]) -> List[str]:
+        stop = None if self.limit is None else self.start + self.limit
+        return names[self.start:stop]
+
+
+def _name_matcher(name_filter: Optional[str], match: str, case_sensitive: bool) -> Callable[[str], bool]:
+    if not name_filter:
+        return lambda name: True
+
+    if match == "regex":
+        try:
+            pattern = re.compile(name_filter, 0 if case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression {name_filter!r}: {e}") from e
+        return lambda name: pattern.search(name) is not None
+
+    if match == "glob":
+        pattern = re.compile(fnmatch.translate(name_filter), 0 if case_sensitive else re.IGNORECASE)
+        return lambda name: pattern.match(name) is not None
+
+    if case_sensitive:
+        return lambda name: name.startswith(name_filter)
+    prefix = name_filter.casefold()
+    return lambda name: name.casefold().startswith(prefix)
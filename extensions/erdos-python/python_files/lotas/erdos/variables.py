@@ -7,12 +7,29 @@ from __future__ import annotations
 
 import contextlib
 import logging
-import sys
 import time
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+import types
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AbstractSet, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .array_slices import ENCODINGS, chunk_message, select_array_slice
+from .checkpoint import CheckpointManager
+from .data_explorer import create_table_view
+from .export import cleanup_exports, export_table, export_text, is_export_format
+from .format_governor import FormatGovernor
+from .handles import ChildHandleTable
+from .inspectors import get_inspector
+from .namespace_tracking import NamespaceTracker, contained_aliases
+from .offload import OffloadStore
+from .profiling import summarize_table
+from .sizing import estimate_size
+from .variable_encoding import COLUMNAR_ENCODING, VariableDeltaEncoder, encode_columns
+from .variable_query import VariableQuery
 
 if TYPE_CHECKING:
     from comm.base_comm import BaseComm
+    
+    from .data_explorer import DataExplorerService
 
 logger = logging.getLogger(__name__)
 
@@ -47,9 +64,15 @@ class Variable:
         self.has_viewer = has_viewer
         self.is_truncated = is_truncated
         self.updated_time = updated_time
+        self._record: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
+        """Convert to dictionary for JSON serialization (built once, records are immutable)."""
+        if self._record is None:
+            self._record = self._build_record()
+        return self._record
+    
+    def _build_record(self) -> Dict[str, Any]:
         return {
             "access_key": self.access_key,
             "display_name": self.display_name,
@@ -66,6 +89,82 @@ class Variable:
         }
 
 
+class VariableCache:
+    """
+    LRU cache of formatted Variable records for top-level variables.
+    
+    Entries are keyed by variable name and are only valid while the name is still
+    bound to the same object with the same change fingerprint. Each entry holds a
+    reference to its object so that its id() cannot be recycled while cached.
+    The cache is bounded both by entry count and by the estimated serialized size
+    of the cached records.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # name -> (obj, binding, variable, estimated bytes)
+        self._entries: OrderedDict[str, Tuple[Any, Tuple[int, Any], Variable, int]] = OrderedDict()
+        self._total_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, name: str, binding: Tuple[int, Any]) -> Optional[Variable]:
+        """Return the cached record for name if it still matches binding."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if entry[1] != binding:
+            self.discard(name)
+            return None
+        self._entries.move_to_end(name)
+        return entry[2]
+    
+    def put(self, name: str, obj: Any, binding: Tuple[int, Any], variable: Variable) -> None:
+        """Cache the formatted record for name, evicting least recently used entries."""
+        self.discard(name)
+        nbytes = self._estimate_bytes(variable)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[name] = (obj, binding, variable, nbytes)
+        self._total_bytes += nbytes
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            _, (_, _, _, evicted_bytes) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_bytes
+    
+    def discard(self, name: str) -> None:
+        """Drop the entry for name, if any."""
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._total_bytes -= entry[3]
+    
+    def retain(self, names: AbstractSet[str]) -> None:
+        """Drop entries for names that are no longer bound."""
+        for name in [name for name in self._entries if name not in names]:
+            self.discard(name)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._total_bytes = 0
+    
+    @staticmethod
+    def _estimate_bytes(variable: Variable) -> int:
+        """Estimate the serialized size of a record from its string fields."""
+        return 128 + sum(
+            len(field) for field in (
+                variable.access_key,
+                variable.display_name,
+                variable.display_value,
+                variable.display_type,
+                variable.type_info,
+            )
+        )
+
+
 class VariablesService:
     """Manages Python variables and handles JSON-RPC requests from frontend."""
     
@@ -73,36 +172,80 @@ class VariablesService:
     MAX_DISPLAY_VALUE_LENGTH = 100
     MAX_DISPLAY_VALUE_ENTRIES = 1000
     
+    # Seconds of formatting allowed per update; the rest is deferred to idle batches
+    UPDATE_TIME_BUDGET = 0.2
+    PENDING_BATCH_DELAY = 0.05
+    
     # Snapshot of initial kernel namespace to filter out built-in variables
     _initial_namespace: Optional[Set[str]] = None
     
-    def __init__(self):
+    def __init__(self, data_explorer: Optional[DataExplorerService] = None):
         # Store active comm channels by comm_id
         self._comms: Dict[str, BaseComm] = {}
         
-        # Track current variables and their object IDs for change detection
-        self._current_bindings: Dict[str, int] = {}  # name -> id(obj)
+        # Serves the views opened by view requests
+        self._data_explorer = data_explorer
+        
+        # Track current variables, their object IDs and mutation fingerprints for change detection
+        self._current_bindings: Dict[str, Tuple[int, Any]] = {}  # name -> (id(obj), fingerprint)
+        self._names_by_id: Dict[int, Set[str]] = {}  # id(obj) -> names bound to it
+        self._updated_times: Dict[str, int] = {}  # name -> ms timestamp of its last change
         self._version: int = 0
         
+        # Names each execution may have touched, so updates need not scan all of user_ns
+        self._tracker = NamespaceTracker()
+        
+        # Opaque access keys for nested children
+        self._handles = ChildHandleTable()
+        
+        # Formatted records for top-level variables, reused across list/refresh
+        self._cache = VariableCache()
+        
+        # Per-type display formatting costs; slow types fall back to cheap summaries
+        self._governor = FormatGovernor()
+        
+        # Array slices sent to viewers, numbered for their chunk events
+        self._transfer_count = 0
+        
+        # Files backing variables offloaded to memory-mapped storage
+        self._offload = OffloadStore()
+        
+        # Namespace checkpoints, and the large restored variables not loaded yet
+        self._checkpoints = CheckpointManager()
+        
+        # Comms that asked for columnar events, each with the baseline its deltas are taken against
+        self._columnar_comms: Dict[str, VariableDeltaEncoder] = {}
+        
+        # Changed variables sent as unevaluated placeholders, still waiting to be formatted
+        self._pending_names: Set[str] = set()
+        self._pending_scheduled = False
+        
         # Capture initial namespace snapshot if not already done
         if VariablesService._initial_namespace is None:
             self._capture_initial_namespace()
     
-    def on_comm_open(self, comm: BaseComm, _msg: Dict[str, Any]) -> None:
+    def on_comm_open(self, comm: BaseComm, msg: Dict[str, Any]) -> None:
         """Handle comm_open - register message handler."""
         logger.info(f"[VARIABLES] on_comm_open called for comm_id: {comm.comm_id}")
         self._comms[comm.comm_id] = comm
         
-        # Register handler for incoming messages
+        # Clients opt into columnar events with {"encoding": "columnar"} in the open data
+        open_data = (msg or {}).get("content", {}).get("data", {}) or {}
+        if open_data.get("encoding") == COLUMNAR_ENCODING:
+            self._columnar_comms[comm.comm_id] = VariableDeltaEncoder()
+        
+        # Register handlers for incoming messages and close
         comm.on_msg(lambda msg: self.handle_msg(comm, msg))
+        comm.on_close(lambda msg: self._on_comm_close(comm))
         
-        # Send initial refresh with all variables
-        variables = self._list_variables()
-        self._send_event(comm, "refresh", {
-            "variables": [v.to_dict() for v in variables],
-            "length": len(variables),
-            "version": self._version
-        })
+        # Send initial refresh with all variables, or the page a {"query": {...}} in the open data asks for
+        query = VariableQuery.from_params(open_data.get("query"))
+        if query is None:
+            variables = self._list_variables()
+            self._send_event(comm, "refresh", self._list_result(comm, variables))
+        else:
+            variables, total = self._list_page(query)
+            self._send_event(comm, "refresh", self._list_result(comm, variables, total, query.start))
     
     def handle_msg(self, comm: BaseComm, msg: Dict[str, Any]) -> None:
         """Handle JSON-RPC messages received from the client."""
@@ -126,22 +269,26 @@ class VariablesService:
         result = None
         error = None
         reply_method = None
+        # Work that must follow the reply, such as streaming chunks the reply announced
+        after_reply: Optional[Callable[[], None]] = None
         
         # Route to appropriate handler
         try:
             if method == "list":
-                variables = self._list_variables()
-                result = {
-                    "variables": [v.to_dict() for v in variables],
-                    "length": len(variables),
-                    "version": self._version
-                }
+                query = VariableQuery.from_params(params)
+                if query is None:
+                    variables = self._list_variables()
+                    result = self._list_result(comm, variables)
+                else:
+                    variables, total = self._list_page(query)
+                    result = self._list_result(comm, variables, total, query.start)
                 reply_method = "list_reply"
             
             elif method == "clear":
                 include_hidden = params.get("include_hidden_objects", False)
                 self._clear(include_hidden)
                 # Send update after clearing
+                self._tracker.reset()
                 self.update()
                 result = {}
                 reply_method = "clear_reply"
@@ -150,26 +297,46 @@ class VariablesService:
                 names = params.get("names", [])
                 self._delete(names)
                 # Send update after deleting
-                self.update()
+                self.update(set(names))
                 result = {}
                 reply_method = "delete_reply"
             
             elif method == "inspect":
                 path = params.get("path", [])
-                children = self._inspect(path)
+                start = params.get("start", 0) or 0
+                limit = params.get("limit")
+                children, total = self._inspect(path, start, limit)
                 result = {
                     "children": [v.to_dict() for v in children],
-                    "length": len(children)
+                    "length": total,
+                    "start": start
                 }
                 reply_method = "inspect_reply"
             
             elif method == "clipboard_format":
                 path = params.get("path", [])
                 format_type = params.get("format", "text/plain")
-                content = self._clipboard_format(path, format_type)
-                result = {"content": content}
+                result = self._clipboard_format(comm, path, format_type)
                 reply_method = "clipboard_format_reply"
             
+            elif method == "offload":
+                path = params.get("path", [])
+                result = self._offload_variable(path)
+                reply_method = "offload_reply"
+            
+            elif method == "reload":
+                path = params.get("path", [])
+                result = self._reload_variable(path)
+                reply_method = "reload_reply"
+            
+            elif method == "checkpoint":
+                result = self.checkpoint(params.get("directory"))
+                reply_method = "checkpoint_reply"
+            
+            elif method == "restore":
+                result = self.restore(params.get("directory"))
+                reply_method = "restore_reply"
+            
             elif method == "view":
                 path = params.get("path", [])
                 viewer_id = self._view(path)
@@ -183,6 +350,16 @@ class VariablesService:
                 result = summary
                 reply_method = "query_table_summary_reply"
             
+            elif method == "get_array_slice":
+                result, after_reply = self._array_slice(comm, params)
+                reply_method = "get_array_slice_reply"
+            
+            elif method == "get_format_costs":
+                result = {"types": self._governor.slowest(params.get("limit", 20))}
+                if params.get("reset"):
+                    self._governor.reset()
+                reply_method = "get_format_costs_reply"
+            
             else:
                 error = f"Method not found: {method}"
         
@@ -211,6 +388,9 @@ class VariablesService:
             response["id"] = request_id
         
         comm.send(response)
+        
+        if after_reply is not None and not error:
+            after_reply()
     
     def shutdown(self) -> None:
         """Shutdown variables service and close all comms."""
@@ -218,50 +398,287 @@ class VariablesService:
             with contextlib.suppress(Exception):
                 comm.close()
         self._comms.clear()
+        self._columnar_comms.clear()
+        self._cache.clear()
+        cleanup_exports()
+        self._offload.cleanup()
     
-    def update(self) -> None:
-        """Check for variable changes and send update events."""
+    def pre_run_cell(self, info: Any) -> None:
+        """IPython pre_run_cell hook - record the names the cell may touch."""
+        try:
+            from IPython import get_ipython
+            ipython = get_ipython()
+            raw_cell = getattr(info, 'raw_cell', None) or ''
+            self._tracker.analyze_cell(ipython.transform_cell(raw_cell))
+            
+            # Restored variables that were deferred load before the first cell that uses them
+            if self._checkpoints.deferred_names:
+                self._checkpoints.load_deferred(self._tracker.last_cell_names)
+        except Exception as e:
+            logger.warning(f"[VARIABLES] Failed to analyze cell, next update does a full scan: {e}")
+            self._tracker.reset()
+    
+    def checkpoint(self, directory: Optional[str] = None) -> Dict[str, Any]:
+        """Save all user variables to a checkpoint (see erdos.checkpoint) and return the report."""
+        from IPython import get_ipython
+        # Imported modules are not listed as variables, but restored functions look them up
+        modules = {
+            name: obj for name, obj in get_ipython().user_ns.items()
+            if isinstance(obj, types.ModuleType) and not name.startswith('_')
+            and not (VariablesService._initial_namespace and name in VariablesService._initial_namespace)
+        }
+        return self._checkpoints.save({**self._get_user_variables(), **modules}, directory)
+    
+    def restore(self, directory: Optional[str] = None) -> Dict[str, Any]:
+        """Restore a checkpoint into the user namespace and return the report."""
+        from IPython import get_ipython
+        report = self._checkpoints.restore(get_ipython().user_ns, directory)
+        self.update(set(report["restored"]) | set(report["deferred"]))
+        return report
+    
+    def update(self, names: Optional[AbstractSet[str]] = None) -> None:
+        """
+        Check for variable changes and send update events.
+        
+        Only the given names (by default, the names the last execution may have
+        touched) are checked; a full namespace scan is done when that set is unknown.
+        Formatting is bounded by UPDATE_TIME_BUDGET. Changed variables that do not fit
+        are sent as unevaluated placeholders and formatted later in idle batches.
+        """
         logger.info(f"[VARIABLES] update() called")
+        deadline = time.perf_counter() + self.UPDATE_TIME_BUDGET
+        
+        # Any nested object may have been replaced or mutated
+        self._handles.invalidate()
+        
+        if names is None:
+            names = self._tracker.dirty_names()
         
         # Get current variable state
-        current_vars = self._get_user_variables()
-        new_bindings: Dict[str, int] = {}
+        if names is None:
+            current_vars = self._get_user_variables()
+            removed = [name for name in self._current_bindings if name not in current_vars]
+        else:
+            names = self._expand_aliases(names)
+            current_vars = self._get_user_variables(names)
+            # Variables held inside touched containers may have been mutated through them
+            contained = contained_aliases(current_vars.values(), self._names_by_id) - names
+            if contained:
+                names |= contained
+                current_vars.update(self._get_user_variables(contained))
+            removed = [name for name in names if name in self._current_bindings and name not in current_vars]
         
         assigned: List[Variable] = []
-        removed: List[str] = []
+        unevaluated: List[Variable] = []
+        changed: Set[str] = set()
         
-        # Build new bindings and detect changes
+        # Detect changes (rebinding or in-place mutation)
         for name, obj in current_vars.items():
-            obj_id = id(obj)
-            new_bindings[name] = obj_id
+            binding = (id(obj), self._fingerprint(obj))
             
             # Check if variable is new or changed
-            if name not in self._current_bindings or self._current_bindings[name] != obj_id:
-                var = self._format_variable(name, obj)
-                assigned.append(var)
+            if self._current_bindings.get(name) != binding:
+                if name in self._offload and not self._offload.is_offloaded(name, obj):
+                    # Rebound since it was offloaded; its file is no longer needed
+                    self._offload.discard(name)
+                self._set_binding(name, binding)
+                changed.add(name)
+                if time.perf_counter() < deadline:
+                    var = self._format_variable(name, obj)
+                    self._cache.put(name, obj, binding, var)
+                    self._pending_names.discard(name)
+                    assigned.append(var)
+                else:
+                    self._cache.discard(name)
+                    self._pending_names.add(name)
+                    unevaluated.append(self._format_placeholder(name, obj))
         
-        # Detect removed variables
-        for name in self._current_bindings:
-            if name not in new_bindings:
-                removed.append(name)
+        # Forget removed variables
+        for name in removed:
+            self._remove_binding(name)
+            self._cache.discard(name)
+            self._offload.discard(name)
+            self._pending_names.discard(name)
         
         # Update state
-        if assigned or removed:
-            self._current_bindings = new_bindings
+        if assigned or unevaluated or removed:
             self._version += 1
+            self._broadcast_update(assigned, unevaluated, removed)
             
-            # Send update event to all comms
-            event_params = {
-                "assigned": [v.to_dict() for v in assigned],
-                "removed": removed,
-                "unevaluated": [],
-                "version": self._version
-            }
+            logger.info(
+                f"[VARIABLES] Sent update: {len(assigned)} assigned, {len(unevaluated)} unevaluated, "
+                f"{len(removed)} removed"
+            )
+        
+        # Keep open data explorer views in sync with their variables
+        if self._data_explorer is not None and (changed or removed):
+            try:
+                self._data_explorer.refresh(changed, set(removed), self._resolve_path)
+            except Exception as e:
+                logger.warning(f"[VARIABLES] Failed to refresh data explorer views: {e}")
+        
+        self._schedule_pending()
+    
+    def _schedule_pending(self) -> None:
+        """Schedule formatting of unevaluated variables for when the kernel is idle."""
+        if self._pending_scheduled or not self._pending_names:
+            return
+        
+        try:
+            from IPython import get_ipython
+            kernel = getattr(get_ipython(), 'kernel', None)
+            io_loop = getattr(kernel, 'io_loop', None)
+            if io_loop is None:
+                logger.warning("[VARIABLES] No kernel event loop; unevaluated variables wait for next update")
+                return
+            io_loop.call_later(self.PENDING_BATCH_DELAY, self._process_pending)
+            self._pending_scheduled = True
+        except Exception as e:
+            logger.error(f"[VARIABLES] Failed to schedule pending variables: {e}")
+    
+    def _process_pending(self) -> None:
+        """Format one time-budgeted batch of unevaluated variables and send it as an update."""
+        self._pending_scheduled = False
+        if not self._pending_names:
+            return
+        
+        deadline = time.perf_counter() + self.UPDATE_TIME_BUDGET
+        current_vars = self._get_user_variables(self._pending_names)
+        assigned: List[Variable] = []
+        
+        for name in list(self._pending_names):
+            if time.perf_counter() >= deadline:
+                break
+            self._pending_names.discard(name)
             
-            for comm in self._comms.values():
-                self._send_event(comm, "update", event_params)
+            # Skip variables that were removed or rebound since they were deferred;
+            # the next update() reports those
+            binding = self._current_bindings.get(name)
+            if name not in current_vars or binding is None or binding[0] != id(current_vars[name]):
+                continue
             
-            logger.info(f"[VARIABLES] Sent update: {len(assigned)} assigned, {len(removed)} removed")
+            obj = current_vars[name]
+            var = self._format_variable(name, obj)
+            self._cache.put(name, obj, binding, var)
+            assigned.append(var)
+        
+        if assigned:
+            self._version += 1
+            self._broadcast_update(assigned, [], [])
+            
+            logger.info(
+                f"[VARIABLES] Sent deferred update: {len(assigned)} assigned, "
+                f"{len(self._pending_names)} still pending"
+            )
+        
+        self._schedule_pending()
+    
+    def _set_binding(self, name: str, binding: Tuple[int, Any]) -> None:
+        """Record a variable's binding, keeping the id -> names index in sync."""
+        old = self._current_bindings.get(name)
+        if old is not None and old[0] != binding[0]:
+            self._unindex_name(name, old[0])
+        if old != binding:
+            self._updated_times[name] = int(time.time() * 1000)
+        self._current_bindings[name] = binding
+        self._names_by_id.setdefault(binding[0], set()).add(name)
+    
+    def _remove_binding(self, name: str) -> None:
+        """Forget a variable's binding."""
+        old = self._current_bindings.pop(name, None)
+        self._updated_times.pop(name, None)
+        if old is not None:
+            self._unindex_name(name, old[0])
+    
+    def _unindex_name(self, name: str, obj_id: int) -> None:
+        names = self._names_by_id.get(obj_id)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._names_by_id[obj_id]
+    
+    def _expand_aliases(self, names: AbstractSet[str]) -> Set[str]:
+        """Add names bound to the same objects, since mutating one changes all of them."""
+        expanded = set(names)
+        for name in names:
+            binding = self._current_bindings.get(name)
+            if binding is not None:
+                expanded.update(self._names_by_id.get(binding[0], ()))
+        return expanded
+    
+    def _broadcast_update(self, assigned: List[Variable], unevaluated: List[Variable], removed: List[str]) -> None:
+        """
+        Send an update event to all comms.
+        
+        Records are built once per update and shared by every comm. Legacy comms
+        share one set of row-oriented params; each columnar comm gets params
+        holding only the fields that changed since what that comm last received.
+        """
+        assigned_records = [v.to_dict() for v in assigned]
+        unevaluated_records = [v.to_dict() for v in unevaluated]
+        legacy_params = None
+        for comm_id, comm in list(self._comms.items()):
+            deltas = self._columnar_comms.get(comm_id)
+            if deltas is not None:
+                columnar_params = {
+                    "encoding": COLUMNAR_ENCODING,
+                    "assigned": deltas.delta(assigned_records),
+                    "removed": removed,
+                    "unevaluated": deltas.delta(unevaluated_records),
+                    "version": self._version
+                }
+                deltas.forget(removed)
+                self._send_event(comm, "update", columnar_params)
+            else:
+                if legacy_params is None:
+                    legacy_params = {
+                        "assigned": assigned_records,
+                        "removed": removed,
+                        "unevaluated": unevaluated_records,
+                        "version": self._version
+                    }
+                self._send_event(comm, "update", legacy_params)
+    
+    def _list_result(
+        self,
+        comm: BaseComm,
+        variables: List[Variable],
+        total: Optional[int] = None,
+        start: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Encode a variable listing for comm, updating its delta baseline if it is columnar.
+        
+        A full listing replaces the baseline. A page of a query listing only adds
+        its records to it, and also reports where it starts and how many variables matched.
+        """
+        records = [v.to_dict() for v in variables]
+        deltas = self._columnar_comms.get(comm.comm_id)
+        if deltas is None:
+            result = {
+                "variables": records,
+                "length": len(records),
+                "version": self._version
+            }
+        else:
+            if total is None:
+                deltas.reset(records)
+            else:
+                deltas.update(records)
+            result = {
+                "encoding": COLUMNAR_ENCODING,
+                "columns": encode_columns(records),
+                "length": len(records),
+                "version": self._version
+            }
+        if total is not None:
+            result["total"] = total
+            result["start"] = start
+        return result
+    
+    def _on_comm_close(self, comm: BaseComm) -> None:
+        self._comms.pop(comm.comm_id, None)
+        self._columnar_comms.pop(comm.comm_id, None)
     
     def _send_event(self, comm: BaseComm, method: str, params: Dict[str, Any]) -> None:
         """Send an event to the frontend."""
@@ -277,18 +694,88 @@ class VariablesService:
     
     def _list_variables(self) -> List[Variable]:
         """List all user variables in the global namespace."""
-        variables: List[Variable] = []
+        current_vars = self._refresh_bindings()
+        variables = [self._cached_variable(name, current_vars[name]) for name in sorted(current_vars)]
+        
+        # Everything has been formatted now, so nothing is left unevaluated
+        self._settle_pending(variables)
+        self._pending_names.clear()
+        
+        return variables
+    
+    def _list_page(self, query: VariableQuery) -> Tuple[List[Variable], int]:
+        """
+        List one page of the user variables a query selects, and how many it selects in all.
+        
+        Filtering by name and kind and sorting by name or update time never format a
+        variable; sorting by size only estimates sizes. Only the page is formatted.
+        """
+        current_vars = self._refresh_bindings()
+        names = [name for name in current_vars if query.matches_name(name)]
+        if query.kinds is not None:
+            names = [name for name in names if query.matches_kind(get_inspector(current_vars[name]).kind)]
+        
+        sort_key = None
+        if query.sort_by == "size":
+            sizes = {name: self._variable_size(name, current_vars[name]) for name in names}
+            sort_key = sizes.__getitem__
+        elif query.sort_by == "updated_time":
+            def updated_time(name: str) -> int:
+                return self._updated_times.get(name, 0)
+            sort_key = updated_time
+        names = query.order(names, sort_key)
+        
+        variables = [self._cached_variable(name, current_vars[name]) for name in query.page(names)]
+        self._settle_pending(variables)
+        return variables, len(names)
+    
+    def _settle_pending(self, variables: List[Variable]) -> None:
+        """
+        Send the pending variables a listing just formatted to every comm.
+        
+        Only the comm that asked for the listing receives it; the others still show
+        those variables as unevaluated placeholders, and once they leave the pending
+        set no idle batch would replace them.
+        """
+        settled = [var for var in variables if var.display_name in self._pending_names]
+        if not settled:
+            return
+        for var in settled:
+            self._pending_names.discard(var.display_name)
+        self._version += 1
+        self._broadcast_update(settled, [], [])
+    
+    def _refresh_bindings(self) -> Dict[str, Any]:
+        """Re-read the whole namespace, recording every binding; return the user variables."""
         current_vars = self._get_user_variables()
+        self._handles.invalidate()
         
-        # Update bindings
-        self._current_bindings = {name: id(obj) for name, obj in current_vars.items()}
+        for name in [name for name in self._current_bindings if name not in current_vars]:
+            self._remove_binding(name)
+        for name, obj in current_vars.items():
+            self._set_binding(name, (id(obj), self._fingerprint(obj)))
         
-        # Convert to Variable objects
-        for name, obj in sorted(current_vars.items()):
+        self._cache.retain(self._current_bindings.keys())
+        return current_vars
+    
+    def _cached_variable(self, name: str, obj: Any) -> Variable:
+        """Return the record for a top-level variable, formatting it only if it changed."""
+        binding = self._current_bindings[name]
+        var = self._cache.get(name, binding)
+        if var is None:
             var = self._format_variable(name, obj)
-            variables.append(var)
-        
-        return variables
+            self._cache.put(name, obj, binding, var)
+        return var
+    
+    def _variable_size(self, name: str, obj: Any) -> int:
+        """Size of a variable, from its cached record when it has one."""
+        var = self._cache.get(name, self._current_bindings[name])
+        if var is not None:
+            return var.size
+        try:
+            return estimate_size(obj)
+        except Exception:
+            return 0
     
     def _capture_initial_namespace(self) -> None:
         """Capture the initial kernel namespace to filter out kernel-injected variables."""
@@ -306,10 +793,8 @@ class VariablesService:
             logger.error(f"[VARIABLES] Failed to capture initial namespace: {e}")
             VariablesService._initial_namespace = set()
     
-    def _get_user_variables(self) -> Dict[str, Any]:
-        """Get user-defined variables from the kernel's user namespace."""
-        import types
-        
+    def _get_user_variables(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Get user-defined variables from the kernel's user namespace, optionally only the given names."""
         try:
             from IPython import get_ipython
             ipython = get_ipython()
@@ -319,66 +804,72 @@ class VariablesService:
         except Exception:
             return {}
         
-        # Filter out built-ins, private variables, and kernel-injected variables
-        filtered = {}
-        for name, obj in user_ns.items():
-            # Skip if name starts with underscore (private/internal)
-            if name.startswith('_'):
-                continue
-            
-            # Skip variables that were present in initial kernel namespace
-            if VariablesService._initial_namespace and name in VariablesService._initial_namespace:
-                continue
-            
-            # Skip ALL module objects (both with and without __file__)
-            if isinstance(obj, types.ModuleType):
-                continue
-            
-            filtered[name] = obj
+        if names is None:
+            items = user_ns.items()
+        else:
+            items = ((name, user_ns[name]) for name in names if name in user_ns)
         
-        return filtered
+        return {name: obj for name, obj in items if self._is_user_variable(name, obj)}
+    
+    def _is_user_variable(self, name: str, obj: Any) -> bool:
+        """Filter out built-ins, private variables, and kernel-injected variables."""
+        # Skip if name starts with underscore (private/internal)
+        if name.startswith('_'):
+            return False
+        
+        # Skip variables that were present in initial kernel namespace
+        if VariablesService._initial_namespace and name in VariablesService._initial_namespace:
+            return False
+        
+        # Skip ALL module objects (both with and without __file__)
+        return not isinstance(obj, types.ModuleType)
+    
+    def _fingerprint(self, obj: Any) -> Any:
+        """Compute the inspector's cheap fingerprint of an object's mutable state."""
+        try:
+            return get_inspector(obj).fingerprint(obj)
+        except Exception:
+            return None
     
-    def _format_variable(self, name: str, obj: Any) -> Variable:
-        """Format a Python object as a Variable."""
+    def _format_variable(self, name: str, obj: Any, access_key: Optional[str] = None) -> Variable:
+        """Format a Python object as a Variable using its type's inspector."""
         # Get basic type information
         obj_type = type(obj)
         type_name = obj_type.__name__
-        
-        # Determine kind based on type
-        kind = self._determine_kind(obj)
-        
-        # Get display value (truncated representation)
-        display_value, is_truncated = self._format_display_value(obj)
-        
-        # Get display type
-        display_type = self._format_display_type(obj)
+        inspector = get_inspector(obj)
         
         # Get type info (full module path)
         type_info = f"{obj_type.__module__}.{type_name}" if hasattr(obj_type, '__module__') else type_name
         
-        # Calculate size in bytes (approximate)
-        size = self._calculate_size(obj)
-        
-        # Get length if applicable
-        length = self._get_length(obj)
-        
-        # Determine if has children
-        has_children = self._has_children(obj)
-        
-        # Determine if has viewer (data frames, arrays, etc.)
-        has_viewer = self._has_viewer(obj)
+        try:
+            display_value, is_truncated = self._governor.format(
+                obj, inspector.display_value, self.MAX_DISPLAY_VALUE_LENGTH
+            )
+            display_type = inspector.display_type(obj)
+            size = estimate_size(obj)
+            length = inspector.length(obj)
+            has_children = inspector.has_children(obj)
+            has_viewer = inspector.has_viewer(obj)
+        except Exception as e:
+            logger.warning(f"[VARIABLES] {type(inspector).__name__} failed for {name}: {e}")
+            display_value, is_truncated = f"<{type_name} object>", False
+            display_type = type_name
+            size = 0
+            length = 0
+            has_children = False
+            has_viewer = False
         
         # Current timestamp
         updated_time = int(time.time() * 1000)
         
         return Variable(
-            access_key=name,
+            access_key=access_key or name,
             display_name=name,
             display_value=display_value,
             display_type=display_type,
             type_info=type_info,
             size=size,
-            kind=kind,
+            kind=inspector.kind,
             length=length,
             has_children=has_children,
             has_viewer=has_viewer,
@@ -386,238 +877,25 @@ class VariablesService:
             updated_time=updated_time
         )
     
-    def _determine_kind(self, obj: Any) -> str:
-        """Determine the VariableKind for a Python object."""
-        obj_type = type(obj)
-        
-        # Check for None
-        if obj is None:
-            return "empty"
-        
-        # Check for booleans (must come before numbers since bool is subclass of int)
-        if isinstance(obj, bool):
-            return "boolean"
-        
-        # Check for numbers
-        if isinstance(obj, (int, float, complex)):
-            return "number"
-        
-        # Check for strings
-        if isinstance(obj, str):
-            return "string"
-        
-        # Check for bytes
-        if isinstance(obj, (bytes, bytearray)):
-            return "bytes"
-        
-        # Check for functions/callables
-        if callable(obj):
-            return "function"
-        
-        # Check for pandas DataFrames
-        if obj_type.__name__ == 'DataFrame':
-            return "table"
-        
-        # Check for numpy arrays or other array-like objects
-        if obj_type.__name__ in ('ndarray', 'Array', 'Tensor'):
-            return "collection"
-        
-        # Check for dictionaries
-        if isinstance(obj, dict):
-            return "map"
-        
-        # Check for other collections
-        if isinstance(obj, (list, tuple, set, frozenset)):
-            return "collection"
-        
-        # Check for classes
-        if isinstance(obj, type):
-            return "class"
-        
-        # Default to other
-        return "other"
-    
-    def _format_display_value(self, obj: Any) -> tuple[str, bool]:
-        """Format the display value for an object, returning (value, is_truncated)."""
-        # Handle None
-        if obj is None:
-            return "None", False
-        
-        # Handle booleans
-        if isinstance(obj, bool):
-            return str(obj), False
-        
-        # Handle numbers
-        if isinstance(obj, (int, float)):
-            return str(obj), False
-        
-        if isinstance(obj, complex):
-            return str(obj), False
-        
-        # Handle strings
-        if isinstance(obj, str):
-            if len(obj) > self.MAX_DISPLAY_VALUE_LENGTH:
-                truncated = obj[:self.MAX_DISPLAY_VALUE_LENGTH] + "..."
-                return repr(truncated), True
-            return repr(obj), False
-        
-        # Handle bytes
-        if isinstance(obj, (bytes, bytearray)):
-            display = repr(obj)
-            if len(display) > self.MAX_DISPLAY_VALUE_LENGTH:
-                return display[:self.MAX_DISPLAY_VALUE_LENGTH] + "...", True
-            return display, False
-        
-        # Handle functions
-        if callable(obj) and not isinstance(obj, type):
-            try:
-                module = getattr(obj, '__module__', '')
-                name = getattr(obj, '__name__', repr(obj))
-                if module and module != '__main__':
-                    return f"<function {module}.{name}>", False
-                return f"<function {name}>", False
-            except Exception:
-                return "<function>", False
-        
-        # Handle pandas DataFrames
-        if type(obj).__name__ == 'DataFrame':
-            try:
-                rows, cols = obj.shape
-                return f"[{rows} rows x {cols} columns]", False
-            except Exception:
-                return "<DataFrame>", False
-        
-        # Handle numpy arrays
-        if type(obj).__name__ in ('ndarray', 'Array'):
-            try:
-                import numpy as np
-                if hasattr(obj, 'shape'):
-                    return f"<{type(obj).__name__} shape={obj.shape} dtype={getattr(obj, 'dtype', 'unknown')}>", False
-                return f"<{type(obj).__name__}>", False
-            except Exception:
-                return f"<{type(obj).__name__}>", False
-        
-        # Handle lists, tuples, sets
-        if isinstance(obj, (list, tuple, set)):
-            length = len(obj)
-            if length == 0:
-                return "[]" if isinstance(obj, list) else "()" if isinstance(obj, tuple) else "set()", False
-            
-            try:
-                # Try to show a preview
-                items_str = []
-                for i, item in enumerate(obj):
-                    if i >= 5:  # Show max 5 items
-                        items_str.append("...")
-                        break
-                    items_str.append(repr(item))
-                
-                if isinstance(obj, list):
-                    preview = f"[{', '.join(items_str)}]"
-                elif isinstance(obj, tuple):
-                    preview = f"({', '.join(items_str)})"
-                else:
-                    preview = f"{{{', '.join(items_str)}}}"
-                
-                if len(preview) > self.MAX_DISPLAY_VALUE_LENGTH:
-                    return preview[:self.MAX_DISPLAY_VALUE_LENGTH] + "...", True
-                return preview, len(obj) > 5
-            except Exception:
-                return f"<{type(obj).__name__} length={length}>", False
-        
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            length = len(obj)
-            if length == 0:
-                return "{}", False
-            
-            try:
-                # Show a preview
-                items_str = []
-                for i, (key, value) in enumerate(obj.items()):
-                    if i >= 3:  # Show max 3 items for dicts
-                        items_str.append("...")
-                        break
-                    items_str.append(f"{repr(key)}: {repr(value)}")
-                
-                preview = f"{{{', '.join(items_str)}}}"
-                if len(preview) > self.MAX_DISPLAY_VALUE_LENGTH:
-                    return preview[:self.MAX_DISPLAY_VALUE_LENGTH] + "...", True
-                return preview, len(obj) > 3
-            except Exception:
-                return f"<dict length={length}>", False
-        
-        # Handle classes
-        if isinstance(obj, type):
-            return f"<class '{obj.__name__}'>", False
-        
-        # Default: use repr() with truncation
-        try:
-            display = repr(obj)
-            if len(display) > self.MAX_DISPLAY_VALUE_LENGTH:
-                return display[:self.MAX_DISPLAY_VALUE_LENGTH] + "...", True
-            return display, False
-        except Exception:
-            return f"<{type(obj).__name__} object>", False
-    
-    def _format_display_type(self, obj: Any) -> str:
-        """Format the display type for an object."""
+    def _format_placeholder(self, name: str, obj: Any) -> Variable:
+        """Build a cheap placeholder record for a variable whose formatting was deferred."""
         obj_type = type(obj)
         type_name = obj_type.__name__
         
-        # Special handling for numpy types
-        if type_name in ('ndarray', 'Array'):
-            if hasattr(obj, 'dtype'):
-                return f"{type_name}[{obj.dtype}]"
-        
-        # Special handling for DataFrames
-        if type_name == 'DataFrame':
-            return "DataFrame"
-        
-        # For generic types, just return the type name
-        return type_name
-    
-    def _calculate_size(self, obj: Any) -> int:
-        """Calculate approximate size in bytes."""
-        try:
-            return sys.getsizeof(obj)
-        except Exception:
-            return 0
-    
-    def _get_length(self, obj: Any) -> int:
-        """Get the length of the object if applicable."""
-        try:
-            return len(obj)
-        except Exception:
-            return 0
-    
-    def _has_children(self, obj: Any) -> bool:
-        """Determine if the object has inspectable children."""
-        # Lists, tuples, sets, dicts have children
-        if isinstance(obj, (list, tuple, set, dict)):
-            return len(obj) > 0
-        
-        # DataFrames have children (columns)
-        if type(obj).__name__ == 'DataFrame':
-            return True
-        
-        # Objects with __dict__ have children
-        if hasattr(obj, '__dict__') and not isinstance(obj, type):
-            return len(obj.__dict__) > 0
-        
-        return False
-    
-    def _has_viewer(self, obj: Any) -> bool:
-        """Determine if object has a data viewer available."""
-        # DataFrames can be viewed
-        if type(obj).__name__ == 'DataFrame':
-            return True
-        
-        # Numpy arrays can be viewed
-        if type(obj).__name__ in ('ndarray', 'Array'):
-            return True
-        
-        return False
+        return Variable(
+            access_key=name,
+            display_name=name,
+            display_value="...",
+            display_type=type_name,
+            type_info=f"{getattr(obj_type, '__module__', '')}.{type_name}".lstrip('.'),
+            size=0,
+            kind=get_inspector(obj).kind,
+            length=0,
+            has_children=False,
+            has_viewer=False,
+            is_truncated=True,
+            updated_time=int(time.time() * 1000)
+        )
     
     def _clear(self, include_hidden: bool) -> None:
         """Clear all user variables."""
@@ -669,65 +947,58 @@ class VariablesService:
             except Exception as e:
                 logger.warning(f"Failed to delete variable {name}: {e}")
     
-    def _inspect(self, path: List[str]) -> List[Variable]:
-        """Inspect a variable and return its children."""
-        logger.info(f"[VARIABLES] _inspect called with path: {path}")
+    def _inspect(
+        self,
+        path: List[str],
+        start: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Variable], int]:
+        """Inspect a variable and return one page of its children plus the total child count."""
+        logger.info(f"[VARIABLES] _inspect called with path: {path}, start: {start}, limit: {limit}")
         if not path:
             logger.warning("[VARIABLES] _inspect: Empty path provided")
-            return []
+            return [], 0
         
         # Resolve the object from the path
-        logger.info(f"[VARIABLES] _inspect: Resolving path")
-        obj = self._resolve_path(path)
-        if obj is None:
+        node = self._resolve_node(path)
+        if node is None:
             logger.warning(f"[VARIABLES] _inspect: Failed to resolve path {path}")
-            return []
+            return [], 0
+        parent, obj = node
         
-        logger.info(f"[VARIABLES] _inspect: Resolved object type: {type(obj).__name__}")
-        children: List[Variable] = []
+        if limit is None:
+            limit = self.MAX_DISPLAY_VALUE_ENTRIES
+        start = max(0, int(start))
+        stop = start + max(0, int(limit))
         
-        # Handle dictionaries
-        if isinstance(obj, dict):
-            logger.info(f"[VARIABLES] _inspect: Object is dict with {len(obj)} items")
-            for key, value in obj.items():
-                child_name = str(key)
-                var = self._format_variable(child_name, value)
-                children.append(var)
-        
-        # Handle lists/tuples
-        elif isinstance(obj, (list, tuple)):
-            logger.info(f"[VARIABLES] _inspect: Object is list/tuple with {len(obj)} items")
-            for i, item in enumerate(obj):
-                child_name = f"[{i}]"
-                var = self._format_variable(child_name, item)
-                children.append(var)
-        
-        # Handle DataFrames (columns)
-        elif type(obj).__name__ == 'DataFrame':
-            logger.info(f"[VARIABLES] _inspect: Object is DataFrame with {len(obj.columns)} columns")
-            for col_name in obj.columns:
-                try:
-                    col_data = obj[col_name]
-                    var = self._format_variable(str(col_name), col_data)
-                    children.append(var)
-                except Exception as e:
-                    logger.warning(f"Failed to inspect DataFrame column {col_name}: {e}")
-        
-        # Handle objects with __dict__
-        elif hasattr(obj, '__dict__'):
-            logger.info(f"[VARIABLES] _inspect: Object has __dict__ with {len(obj.__dict__)} attributes")
-            for attr_name, attr_value in obj.__dict__.items():
-                if not attr_name.startswith('_'):
-                    var = self._format_variable(attr_name, attr_value)
-                    children.append(var)
-        else:
-            logger.warning(f"[VARIABLES] _inspect: Object type {type(obj).__name__} not handled")
+        inspector = get_inspector(obj)
+        total = inspector.count_children(obj)
+        logger.info(f"[VARIABLES] _inspect: {type(obj).__name__} has {total} children")
+        
+        # Only the requested page is ever formatted; the full child list is never built
+        children: List[Variable] = []
+        for key, value in inspector.iter_children(obj, start, stop):
+            try:
+                handle = self._handles.handle_for(parent, key, value)
+                children.append(self._format_variable(inspector.child_name(obj, key), value, handle))
+            except Exception as e:
+                logger.warning(f"Failed to inspect child {key!r}: {e}")
         
-        logger.info(f"[VARIABLES] _inspect: Returning {len(children)} children")
-        return children
+        logger.info(f"[VARIABLES] _inspect: Returning {len(children)} of {total} children")
+        return children, total
     
     def _resolve_path(self, path: List[str]) -> Optional[Any]:
         """Resolve an object from a path of access keys."""
+        node = self._resolve_node(path)
+        return node[1] if node is not None else None
+    
+    def _resolve_node(self, path: List[str]) -> Optional[Tuple[str, Any]]:
+        """
+        Resolve a path to (handle or root name, object).
+        
+        Paths end in a child handle, which resolves in one lookup. Plain keys after
+        the last handle (from older frontends) are walked and given handles.
+        """
         logger.info(f"[VARIABLES] _resolve_path called with path: {path}")
         if not path:
             logger.warning("[VARIABLES] _resolve_path: Empty path")
@@ -744,140 +1015,159 @@ class VariablesService:
             logger.error(f"[VARIABLES] _resolve_path: Failed to get IPython: {e}")
             return None
         
-        # Start with the root variable
-        if path[0] not in user_ns:
-            logger.warning(f"[VARIABLES] _resolve_path: Root variable '{path[0]}' not found in namespace")
-            logger.info(f"[VARIABLES] _resolve_path: Available variables: {list(user_ns.keys())}")
-            return None
+        # Start from the deepest handle in the path, or else the root variable
+        start = len(path) - 1
+        while start > 0 and not self._handles.is_handle(path[start]):
+            start -= 1
         
-        obj = user_ns[path[0]]
-        logger.info(f"[VARIABLES] _resolve_path: Found root variable '{path[0]}' with type {type(obj).__name__}")
+        token = path[start]
+        try:
+            if start:
+                obj = self._handles.resolve(token, user_ns.__getitem__)
+            else:
+                obj = user_ns[token]
+        except Exception as e:
+            logger.warning(f"[VARIABLES] _resolve_path: Failed to resolve '{token}' in path {path}: {e}")
+            return None
         
-        # Traverse the path
-        for i, key in enumerate(path[1:], 1):
-            logger.info(f"[VARIABLES] _resolve_path: Traversing path[{i}] = '{key}'")
+        # Traverse the rest of the path
+        for key in path[start + 1:]:
             try:
-                # Try dictionary access
-                if isinstance(obj, dict):
-                    logger.info(f"[VARIABLES] _resolve_path: Trying dict access for key '{key}'")
-                    obj = obj[key]
-                # Try attribute access
-                elif hasattr(obj, key):
-                    logger.info(f"[VARIABLES] _resolve_path: Trying attribute access for key '{key}'")
-                    obj = getattr(obj, key)
-                # Try list/tuple index
-                elif isinstance(obj, (list, tuple)):
-                    logger.info(f"[VARIABLES] _resolve_path: Trying list/tuple index for key '{key}'")
-                    # Remove brackets from key like "[0]"
-                    index = int(key.strip('[]'))
-                    obj = obj[index]
-                # Try DataFrame column access
-                elif type(obj).__name__ == 'DataFrame':
-                    logger.info(f"[VARIABLES] _resolve_path: Trying DataFrame column access for key '{key}'")
-                    obj = obj[key]
-                else:
-                    logger.warning(f"[VARIABLES] _resolve_path: Cannot access key '{key}' on type {type(obj).__name__}")
-                    return None
-                logger.info(f"[VARIABLES] _resolve_path: Successfully accessed '{key}', now at type {type(obj).__name__}")
+                # Each type's inspector knows how its children are keyed
+                obj = get_inspector(obj).get_child(obj, key)
+                token = self._handles.handle_for(token, key, obj)
             except Exception as e:
                 logger.error(f"[VARIABLES] Failed to resolve path {path} at key {key}: {e}", exc_info=True)
                 return None
         
         logger.info(f"[VARIABLES] _resolve_path: Successfully resolved path, final type: {type(obj).__name__}")
-        return obj
+        return token, obj
     
-    def _clipboard_format(self, path: List[str], format_type: str) -> str:
-        """Format a variable for clipboard copying."""
+    def _clipboard_format(self, comm: BaseComm, path: List[str], format_type: str) -> Dict[str, Any]:
+        """
+        Format a variable for clipboard copying.
+        
+        Tables are exported in chunks (see erdos.export), with "clipboard_format_progress"
+        events along the way. Large results come back as a temp file path instead of content.
+        """
+        obj = self._resolve_path(path)
+        if obj is None:
+            return export_text("", format_type)
+        
+        if is_export_format(format_type):
+            view = create_table_view(obj, list(path), path[0])
+            if view is not None:
+                def progress(params: Dict[str, Any]) -> None:
+                    self._send_event(comm, "clipboard_format_progress", {"path": path, **params})
+                return export_table(view, format_type, progress)
+        
+        # Plain text, and other formats of objects that are not tables
+        return export_text(str(obj), format_type)
+    
+    def _array_slice(self, comm: BaseComm, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Callable[[], None]]:
+        """
+        Select a slice of a numeric array for an array viewer (see erdos.array_slices).
+        
+        The reply describes the slice (dtype, shape, byte and chunk counts) and
+        carries a transfer_id; the raw bytes follow in "array_slice_chunk" events,
+        as comm buffers or base64 strings depending on the requested encoding.
+        """
+        path = params.get("path", [])
+        encoding = params.get("encoding", "buffers")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding}; expected one of {', '.join(ENCODINGS)}")
+        
         obj = self._resolve_path(path)
         if obj is None:
-            return ""
-        
-        if format_type == "text/plain":
-            # Return plain text representation
-            return str(obj)
-        elif format_type == "text/html":
-            # For DataFrames, return HTML representation
-            if type(obj).__name__ == 'DataFrame':
+            raise KeyError(f"No variable at {path}")
+        
+        options = {key: params[key] for key in ("max_bytes", "chunk_bytes") if params.get(key)}
+        array_slice = select_array_slice(obj, params.get("slices"), **options)
+        self._transfer_count += 1
+        transfer_id = f"array-{self._transfer_count}"
+        
+        def send_chunks() -> None:
+            offset = 0
+            for index, chunk in enumerate(array_slice.chunks()):
+                chunk_params, buffers = chunk_message(transfer_id, index, offset, chunk, encoding)
+                offset += len(chunk)
                 try:
-                    return obj.to_html()
-                except Exception:
-                    return str(obj)
-            return str(obj)
+                    comm.send({"method": "array_slice_chunk", "params": chunk_params}, buffers=buffers)
+                except Exception as e:
+                    logger.error(f"[VARIABLES] Failed to send chunk {index} of {transfer_id}: {e}")
+                    return
         
-        return str(obj)
+        return {"transfer_id": transfer_id, "encoding": encoding, **array_slice.header()}, send_chunks
+    
+    def _offload_variable(self, path: List[str]) -> Dict[str, Any]:
+        """Replace a top-level array or table with a memory-mapped copy (see erdos.offload)."""
+        name = self._top_level_name(path)
+        obj = self._get_user_variables([name])[name]
+        if self._offload.is_offloaded(name, obj):
+            raise ValueError(f"{name} is already offloaded")
+        
+        replacement, file_path = self._offload.offload(name, obj)
+        names = self._rebind(obj, replacement, name)
+        return {"file": file_path, "names": names}
+    
+    def _reload_variable(self, path: List[str]) -> Dict[str, Any]:
+        """Load an offloaded variable back into memory as its original type."""
+        name = self._top_level_name(path)
+        obj = self._get_user_variables([name])[name]
+        loaded = self._offload.reload(name, obj)
+        return {"names": self._rebind(obj, loaded, name)}
+    
+    def _top_level_name(self, path: List[str]) -> str:
+        if len(path) != 1:
+            raise ValueError("Only top-level variables can be offloaded or reloaded")
+        name = path[0]
+        if name not in self._get_user_variables([name]):
+            raise KeyError(f"No variable named {name}")
+        return name
+    
+    def _rebind(self, obj: Any, replacement: Any, name: str) -> List[str]:
+        """Rebind name and every alias of obj to replacement, so the old object can be freed."""
+        from IPython import get_ipython
+        user_ns = get_ipython().user_ns
+        names = {name} | self._names_by_id.get(id(obj), set())
+        rebound = sorted(alias for alias in names if user_ns.get(alias) is obj)
+        for alias in rebound:
+            user_ns[alias] = replacement
+        self.update(set(rebound))
+        return rebound
     
     def _view(self, path: List[str]) -> Optional[str]:
-        """Open a viewer for the variable."""
-        # This would integrate with the data explorer/viewer system
-        # For now, just return None (no viewer opened)
+        """Open a data explorer view of the variable and return its viewer id."""
         logger.info(f"[VARIABLES] View requested for path: {path}")
-        return None
-    
-    def _query_table_summary(self, path: List[str], query_types: List[str]) -> Dict[str, Any]:
-        """Query table summary information."""
-        obj = self._resolve_path(path)
-        if obj is None:
-            return {
-                "num_rows": 0,
-                "num_columns": 0,
-                "column_schemas": [],
-                "column_profiles": []
-            }
+        if self._data_explorer is None or not path:
+            return None
         
-        # Handle DataFrames
-        if type(obj).__name__ == 'DataFrame':
-            try:
-                num_rows, num_columns = obj.shape
-                
-                # Get column schemas
-                column_schemas = []
-                for col_name in obj.columns:
-                    schema = {
-                        "column_name": str(col_name),
-                        "type_display": str(obj[col_name].dtype)
-                    }
-                    column_schemas.append(schema)
-                
-                # Get column profiles if requested
-                column_profiles = []
-                if "summary_stats" in query_types:
-                    for col_name in obj.columns:
-                        try:
-                            col_data = obj[col_name]
-                            profile = {
-                                "column_name": str(col_name),
-                                "type_display": str(col_data.dtype),
-                                "summary_stats": self._get_column_summary_stats(col_data)
-                            }
-                            column_profiles.append(profile)
-                        except Exception as e:
-                            logger.warning(f"Failed to get summary for column {col_name}: {e}")
-                
-                return {
-                    "num_rows": int(num_rows),
-                    "num_columns": int(num_columns),
-                    "column_schemas": [str(s) for s in column_schemas],
-                    "column_profiles": [str(p) for p in column_profiles]
-                }
-            except Exception as e:
-                logger.error(f"Failed to query table summary: {e}")
+        obj = self._resolve_path(path)
+        if obj is None or not get_inspector(obj).has_viewer(obj):
+            return None
         
-        return {
+        return self._data_explorer.open_view(obj, list(path), path[0])
+    
+    def _query_table_summary(self, path: List[str], query_types: List[str]) -> Dict[str, Any]:
+        """Query table shape, column schemas and (if requested) column profiles."""
+        empty = {
             "num_rows": 0,
             "num_columns": 0,
             "column_schemas": [],
             "column_profiles": []
         }
-    
-    def _get_column_summary_stats(self, series: Any) -> Dict[str, Any]:
-        """Get summary statistics for a pandas Series."""
-        try:
-            # Use pandas describe() if available
-            if hasattr(series, 'describe'):
-                desc = series.describe()
-                return desc.to_dict()
-        except Exception:
-            pass
         
-        return {}
-
+        obj = self._resolve_path(path)
+        if obj is None:
+            return empty
+        
+        view = create_table_view(obj, list(path), path[0])
+        if view is None:
+            return empty
+        
+        try:
+            # Immutable tables have no fingerprint, but their identity still keys the cache
+            return summarize_table(view, query_types, (id(obj), self._fingerprint(obj)))
+        except Exception as e:
+            logger.error(f"Failed to query table summary: {e}")
+            return empty
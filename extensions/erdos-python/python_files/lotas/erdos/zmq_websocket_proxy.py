@@ -4,6 +4,7 @@
 """Minimal ZMQ-to-WebSocket proxy for standard ipykernel."""
 
 import asyncio
+import base64
 import json
 import logging
 import os
@@ -89,6 +90,9 @@ from erdos.environment import EnvironmentService
 from erdos.ui import UiService
 from erdos.help import HelpService
 from erdos.variables import VariablesService
+from erdos.data_explorer import DataExplorerService
+from erdos.execution_profiler import ExecutionProfilerService
+from erdos.resource_monitor import ResourceMonitorService
 
 from IPython import get_ipython
 _kernel = get_ipython().kernel
@@ -103,14 +107,26 @@ _help_service = HelpService()
 _kernel.comm_manager.register_target('help', _help_service.on_comm_open)
 _help_service.start()
 
-_variables_service = VariablesService()
+_data_explorer_service = DataExplorerService()
+_kernel.comm_manager.register_target('erdos.dataExplorer', _data_explorer_service.on_comm_open)
+
+_variables_service = VariablesService(_data_explorer_service)
 _kernel.comm_manager.register_target('variables', _variables_service.on_comm_open)
 
+_execution_profiler = ExecutionProfilerService()
+_kernel.comm_manager.register_target('erdos.executionProfiler', _execution_profiler.on_comm_open)
+
+_resource_monitor = ResourceMonitorService()
+_kernel.comm_manager.register_target('erdos.resourceMonitor', _resource_monitor.on_comm_open)
+
 _kernel.session_mode = {repr(self.session_mode)}
 _kernel.ui_service = _ui_service
 _kernel.environment_service = _env_service
 _kernel.help_service = _help_service
 _kernel.variables_service = _variables_service
+_kernel.data_explorer_service = _data_explorer_service
+_kernel.execution_profiler = _execution_profiler
+_kernel.resource_monitor = _resource_monitor
 
 # Track working directory changes
 _kernel._erdos_last_cwd = os.getcwd()
@@ -141,8 +157,43 @@ def _check_variables_change():
         except Exception:
             pass
 
+def _track_variables_cell(info):
+    \"\"\"Pre-run-cell hook to record which variables a cell may touch.\"\"\"
+    if hasattr(_kernel, 'variables_service'):
+        try:
+            _kernel.variables_service.pre_run_cell(info)
+        except Exception:
+            pass
+
+def _profile_cell_start(info):
+    \"\"\"Pre-run-cell hook to take the execution's starting measurements.\"\"\"
+    try:
+        _kernel.execution_profiler.pre_run_cell(info)
+    except Exception:
+        pass
+
+def _profile_cell_stop():
+    \"\"\"Post-execute hook to take the execution's closing measurements.\"\"\"
+    try:
+        _kernel.execution_profiler.post_execute()
+    except Exception:
+        pass
+
+def _profile_cell_end(result):
+    \"\"\"Post-run-cell hook to report the execution's measurements.\"\"\"
+    try:
+        _kernel.execution_profiler.post_run_cell(result)
+    except Exception:
+        pass
+
+get_ipython().events.register('pre_run_cell', _track_variables_cell)
 get_ipython().events.register('post_execute', _check_cwd_change)
 get_ipython().events.register('post_execute', _check_variables_change)
+# Started after the other pre_run_cell hooks and stopped before the other post_execute
+# hooks, so their work is not part of the measurements
+get_ipython().events.register('pre_run_cell', _profile_cell_start)
+get_ipython().events.callbacks['post_execute'].insert(0, _profile_cell_stop)
+get_ipython().events.register('post_run_cell', _profile_cell_end)
 
 from IPython.core.magic import Magics as _Magics, magics_class as _magics_class, line_magic as _line_magic
 
@@ -154,6 +205,26 @@ class _ErdosMagics(_Magics):
         if hasattr(_kernel, 'ui_service'):
             session_mode = getattr(_kernel, 'session_mode', 'console')
             _kernel.ui_service.clear_console(session_mode=session_mode)
+    
+    @_line_magic
+    def checkpoint(self, line):
+        \"\"\"Save the user namespace: %checkpoint [directory]\"\"\"
+        report = self.shell.kernel.variables_service.checkpoint(line.strip() or None)
+        print(f"Saved {{len(report['saved'])}} variables ({{report['size'] / 2**20:.1f}} MB) to {{report['directory']}} "
+              f"in {{report['seconds']:.1f}}s")
+        for item in report["skipped"]:
+            print(f"  skipped {{item['name']}} ({{item['type']}}): {{item['reason']}}")
+    
+    @_line_magic
+    def restore_checkpoint(self, line):
+        \"\"\"Restore a saved namespace: %restore_checkpoint [directory]\"\"\"
+        report = self.shell.kernel.variables_service.restore(line.strip() or None)
+        print(f"Restored {{len(report['restored'])}} variables from {{report['directory']}} in {{report['seconds']:.1f}}s"
+              + (f"; {{len(report['deferred'])}} large ones load on first use" if report['deferred'] else ""))
+        for item in report["failed"]:
+            print(f"  failed {{item['name']}}: {{item['reason']}}")
+        for item in report["skipped"]:
+            print(f"  not in checkpoint {{item['name']}} ({{item['type']}}): {{item['reason']}}")
 
 get_ipython().register_magics(_ErdosMagics)
 """
@@ -277,6 +348,9 @@ get_ipython().register_magics(_ErdosMagics)
             date = msg_copy['parent_header']['date']
             if hasattr(date, 'isoformat'):
                 msg_copy['parent_header']['date'] = date.isoformat()
+        # Binary comm buffers (such as array slices) travel base64-encoded in the JSON message
+        if msg_copy.get('buffers'):
+            msg_copy['buffers'] = [base64.b64encode(buffer).decode('ascii') for buffer in msg_copy['buffers']]
         
         json_msg = json.dumps(msg_copy)
         disconnected = set()
@@ -305,6 +379,9 @@ get_ipython().register_magics(_ErdosMagics)
             date = msg_copy['parent_header']['date']
             if hasattr(date, 'isoformat'):
                 msg_copy['parent_header']['date'] = date.isoformat()
+        # Binary comm buffers (such as array slices) travel base64-encoded in the JSON message
+        if msg_copy.get('buffers'):
+            msg_copy['buffers'] = [base64.b64encode(buffer).decode('ascii') for buffer in msg_copy['buffers']]
         
         json_msg = json.dumps(msg_copy)
         disconnected = set()
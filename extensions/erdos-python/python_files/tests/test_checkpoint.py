@@ -0,0 +1,125 @@
+import json
+import threading
+
+import pytest
+
+from lotas.erdos.checkpoint import CheckpointManager, DeferredVariable
+from lotas.erdos.inspectors import get_inspector
+from lotas.erdos.sizing import estimate_size
+
+np = pytest.importorskip("numpy")
+
+SESSION_CODE = """
+import numpy as np
+
+scale = 2
+big = np.zeros(1_000_000)
+
+def f(x):
+    return x * scale
+
+def h():
+    return len(big) + int(big[0])
+"""
+
+
+def session_namespace():
+    namespace = {"__name__": "__main__"}
+    exec(SESSION_CODE, namespace)
+    return namespace
+
+
+def user_variables(namespace):
+    return {name: value for name, value in namespace.items() if not name.startswith("_")}
+
+
+def round_trip(tmp_path, namespace, manager=None):
+    CheckpointManager().save(user_variables(namespace), str(tmp_path / "checkpoint"))
+    restored = {"__name__": "__main__"}
+    manager = manager or CheckpointManager()
+    report = manager.restore(restored, str(tmp_path / "checkpoint"))
+    return restored, report
+
+
+def manifest_entries(tmp_path):
+    with (tmp_path / "checkpoint" / "manifest.json").open() as f:
+        return {entry["name"]: entry for entry in json.load(f)["entries"]}
+
+
+def test_round_trip_keeps_aliases_and_shared_objects(tmp_path):
+    shared = [1, 2]
+    array = np.arange(10)
+    namespace = {
+        "a": shared,
+        "b": shared,
+        "nested": {"x": shared},
+        "array": array,
+        "same_array": array,
+        "holder": {"array": array},
+    }
+    restored, report = round_trip(tmp_path, namespace)
+
+    assert report["failed"] == []
+    assert restored["a"] == [1, 2]
+    assert restored["b"] is restored["a"]
+    assert restored["nested"]["x"] is restored["a"]
+    assert restored["same_array"] is restored["array"]
+    assert restored["holder"]["array"] is restored["array"]
+    np.testing.assert_array_equal(restored["array"], array)
+
+
+def test_functions_use_the_restored_namespace_as_globals(tmp_path):
+    restored, report = round_trip(tmp_path, session_namespace())
+
+    assert report["failed"] == []
+    assert restored["f"].__globals__ is restored
+    restored["scale"] = 10
+    assert restored["f"](1) == 10
+
+    # The function does not carry a copy of the array it reads
+    saved = manifest_entries(tmp_path)
+    assert saved["h"]["size"] < 10_000
+    assert saved["np"]["serializer"] == "module"
+
+
+def test_deferred_variable_used_through_a_function(tmp_path):
+    manager = CheckpointManager(defer_threshold=1024)
+    restored, report = round_trip(tmp_path, session_namespace(), manager)
+
+    assert report["deferred"] == ["big"]
+    assert isinstance(restored["big"], DeferredVariable)
+    # The cell only mentions h, so big is loaded when h reaches it
+    assert restored["h"]() == 1_000_000
+    assert isinstance(restored["big"], np.ndarray)
+    assert manager.deferred_names == []
+
+
+def test_deferred_variable_operators_load_the_value(tmp_path):
+    manager = CheckpointManager(defer_threshold=1024)
+    restored, _ = round_trip(tmp_path, session_namespace(), manager)
+
+    placeholder = restored["big"]
+    assert (placeholder + 1)[0] == 1
+    assert np.asarray(placeholder).shape == (1_000_000,)
+    assert isinstance(restored["big"], np.ndarray)
+
+
+def test_deferred_variable_reports_its_stored_size(tmp_path):
+    manager = CheckpointManager(defer_threshold=1024)
+    restored, _ = round_trip(tmp_path, session_namespace(), manager)
+
+    placeholder = restored["big"]
+    entry = placeholder.checkpoint_entry
+    assert get_inspector(placeholder).size(placeholder) == entry["size"]
+    assert estimate_size(placeholder) == entry["size"]
+    assert isinstance(restored["big"], DeferredVariable)
+
+
+def test_unpicklable_variable_is_skipped_without_breaking_the_stream(tmp_path):
+    shared = [1, 2]
+    namespace = {"a": shared, "lock": threading.Lock(), "z": {"shared": shared}}
+    restored, report = round_trip(tmp_path, namespace)
+
+    assert report["failed"] == []
+    assert [skipped["name"] for skipped in report["skipped"]] == ["lock"]
+    assert restored["z"] == {"shared": [1, 2]}
@@ -1,3 +1,5 @@
+import json
+
 import get_variable_info
 
 
@@ -112,3 +114,69 @@ def test_get_nested_children():
     found = assert_property(found, "a")
     found = assert_indexed_child(found, 0, 0)
     assert found["value"] == "'hello'"
+
+
+def test_long_string():
+    found = assert_variable_found("a" * 1_000_000 + "z", None, "str", None)
+    value = found["value"]
+    assert value.startswith("'aaaa")
+    assert value.endswith("...")
+    assert len(value) <= 2**16 + 3
+
+
+def test_large_bytes_in_list():
+    found = assert_variable_found([b"x" * 10_000_000], None, "list", 1)
+    value = found["value"]
+    assert value.startswith("[b'xxx")
+    assert value.endswith("xxx']")
+    assert len(value) < 200
+
+
+def test_long_set():
+    found = assert_variable_found({(i, -i) for i in range(1_000_000)}, None, "set", 1_000_000)
+    first = assert_indexed_child(found, 0, 0)
+    assert_indexed_child(found, 50, 0)
+    child = assert_indexed_child(found, 100, 10)
+    assert child["propertyChain"] == [110]
+    # Expanding the item resolves the same element through the cursor
+    item = [assert_indexed_child(child, 0, i)["value"] for i in range(2)]
+    assert child["value"] == f"({item[0]}, {item[1]})"
+    assert first["name"] == "0"
+
+
+def test_long_dict():
+    found = assert_variable_found({f"k{i}": i for i in range(1000)}, None, "dict", 1000)
+    assert not found["hasNamedChildren"]
+    child = assert_indexed_child(found, 950, 10, "960")
+    assert child["name"] == "k960"
+    assert child["propertyChain"] == [960]
+
+
+def test_long_dict_with_tuple_keys():
+    found = assert_variable_found({(i, "x"): [i] for i in range(100)}, None, "dict", 100)
+    child = assert_indexed_child(found, 50, 10, "[60]")
+    assert child["name"] == "(60, 'x')"
+    # The chain holds the position, so it serializes and resolves through the key snapshot
+    assert json.loads(json.dumps(child["propertyChain"])) == [60]
+    assert_indexed_child(child, 0, 0, "60")
+
+
+def test_frozenset():
+    found = assert_variable_found(frozenset(range(100)), None, "frozenset", 100)
+    assert_indexed_child(found, 50, 49)
+
+
+def test_deque():
+    from collections import deque
+
+    found = assert_variable_found(deque(range(100)), None, "collections.deque", 100)
+    assert_indexed_child(found, 50, 1, "51")
+
+
+def test_generator():
+    generator = (i * 2 for i in range(60))
+    found = assert_variable_found(generator, None, "generator")
+    assert not found["hasNamedChildren"]
+    assert get_variable_info.getAllChildrenDescriptions("test_variable", [], 0) == []
+    # Inspecting it does not consume the user's generator
+    assert next(generator) == 0
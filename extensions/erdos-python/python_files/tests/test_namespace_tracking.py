@@ -0,0 +1,44 @@
+from lotas.erdos.namespace_tracking import NamespaceTracker, contained_aliases
+
+
+def dirty_after(tracker, code):
+    tracker.analyze_cell(code)
+    return tracker.dirty_names()
+
+
+def test_assignment():
+    tracker = NamespaceTracker()
+    assert dirty_after(tracker, "x = 1\ny = x + 1") == {"x", "y"}
+
+
+def test_function_mutating_global():
+    tracker = NamespaceTracker()
+    dirty_after(tracker, "lst = []\ndef add(v):\n    lst.append(v)")
+    assert "lst" in dirty_after(tracker, "add(1)")
+
+
+def test_function_globals_need_a_call():
+    tracker = NamespaceTracker()
+    dirty_after(tracker, "lst = []\ndef add(v):\n    lst.append(v)")
+    assert "lst" not in dirty_after(tracker, "y = 2")
+
+
+def test_opaque_cell_needs_full_scan():
+    tracker = NamespaceTracker()
+    assert dirty_after(tracker, "exec('z = 1')") is None
+
+
+def test_contained_alias():
+    inner = [1]
+    outer = {"k": inner}
+    names_by_id = {id(inner): {"inner"}, id(outer): {"outer"}}
+    tracker = NamespaceTracker()
+    assert dirty_after(tracker, "outer['k'].append(2)") == {"outer"}
+    assert contained_aliases([outer], names_by_id) == {"inner"}
+
+
+def test_nested_contained_alias():
+    inner = [1]
+    outer = {"a": [{"b": inner}]}
+    names_by_id = {id(inner): {"inner"}}
+    assert contained_aliases([outer], names_by_id) == {"inner"}
@@ -0,0 +1,130 @@
+import pytest
+
+from lotas.erdos.variable_encoding import COLUMNAR_ENCODING, VariableDeltaEncoder
+
+
+def record(access_key, display_value="1", updated_time=0):
+    return {
+        "access_key": access_key,
+        "display_name": access_key,
+        "display_value": display_value,
+        "display_type": "int",
+        "type_info": "int",
+        "size": 28,
+        "kind": "number",
+        "length": 0,
+        "has_children": False,
+        "has_viewer": False,
+        "is_truncated": False,
+        "updated_time": updated_time,
+    }
+
+
+def test_delta_sends_every_field_of_new_records():
+    delta = VariableDeltaEncoder().delta([record("x")])
+    assert delta["access_key"] == ["x"]
+    assert set(delta["fields"]) == set(record("x")) - {"access_key"}
+
+
+def test_delta_omits_unchanged_fields():
+    encoder = VariableDeltaEncoder()
+    encoder.reset([record("x"), record("y")])
+    delta = encoder.delta([record("x", display_value="2", updated_time=5), record("y")])
+    assert delta["access_key"] == ["x", "y"]
+    assert delta["fields"] == {
+        "display_value": {"rows": [0], "values": ["2"]},
+        "updated_time": {"rows": [0], "values": [5]},
+    }
+
+
+def test_forget_after_removal():
+    encoder = VariableDeltaEncoder()
+    encoder.reset([record("x")])
+    encoder.forget(["x"])
+    # Rebound after removal, so the client has no fields left to compare against
+    assert set(encoder.delta([record("x")])["fields"]) == set(record("x")) - {"access_key"}
+
+
+def test_page_update_keeps_baseline():
+    encoder = VariableDeltaEncoder()
+    encoder.reset([record("x"), record("y")])
+    encoder.update([record("y", display_value="2")])
+    assert encoder.delta([record("x"), record("y", display_value="2")])["fields"] == {}
+
+
+def test_full_reset_replaces_baseline():
+    encoder = VariableDeltaEncoder()
+    encoder.reset([record("x"), record("y")])
+    encoder.reset([record("y")])
+    assert encoder.delta([record("x")])["fields"]
+
+
+class FakeComm:
+    def __init__(self, comm_id):
+        self.comm_id = comm_id
+        self.sent = []
+
+    def send(self, data, buffers=None):  # noqa: ARG002
+        self.sent.append(data)
+
+    def on_msg(self, callback):
+        self.msg_callback = callback
+
+    def on_close(self, callback):
+        self.close_callback = callback
+
+
+@pytest.fixture
+def service():
+    interactiveshell = pytest.importorskip("IPython.core.interactiveshell")
+    from lotas.erdos.variables import VariablesService
+
+    shell = interactiveshell.InteractiveShell.instance()
+    service = VariablesService()
+    # Bound after the service captured the initial namespace, so they are user variables
+    shell.user_ns.update({f"v{i}": i for i in range(5)})
+    yield service, shell.user_ns
+    for i in range(5):
+        shell.user_ns.pop(f"v{i}", None)
+
+
+def open_comm(service, comm_id, data=None):
+    comm = FakeComm(comm_id)
+    service.on_comm_open(comm, {"content": {"data": data or {}}})
+    return comm
+
+
+def test_list_result_encodings(service):
+    service, _ = service
+    legacy = open_comm(service, "legacy")
+    columnar = open_comm(service, "columnar", {"encoding": COLUMNAR_ENCODING})
+
+    rows = legacy.sent[0]["params"]
+    assert [variable["display_name"] for variable in rows["variables"]] == [
+        f"v{i}" for i in range(5)
+    ]
+
+    columns = columnar.sent[0]["params"]
+    assert columns["encoding"] == COLUMNAR_ENCODING
+    assert columns["columns"]["display_name"] == [f"v{i}" for i in range(5)]
+    assert columns["length"] == 5
+
+
+def test_update_deltas_are_per_comm(service):
+    service, user_ns = service
+    paged = open_comm(service, "paged", {"encoding": COLUMNAR_ENCODING})
+    full = open_comm(service, "full", {"encoding": COLUMNAR_ENCODING})
+
+    # One page on one comm neither resets its baseline nor touches the other's
+    paged.msg_callback({"content": {"data": {"method": "list", "id": "1", "params": {"limit": 2}}}})
+    user_ns["v4"] = 44
+    paged.sent.clear()
+    full.sent.clear()
+    service.update({"v4"})
+
+    for comm in (paged, full):
+        params = comm.sent[0]["params"]
+        assert params["encoding"] == COLUMNAR_ENCODING
+        assert params["assigned"]["access_key"] == ["v4"]
+        assert "display_name" not in params["assigned"]["fields"]
+        assert params["assigned"]["fields"]["display_value"]["values"] == ["44"]
@@ -0,0 +1,70 @@
+import pytest
+
+from lotas.erdos.variable_query import VariableQuery
+
+NAMES = ["alpha", "Alphabet", "beta", "df_train", "df_test", "gamma"]
+
+
+def matching(**kwargs):
+    query = VariableQuery(**kwargs)
+    return [name for name in NAMES if query.matches_name(name)]
+
+
+def test_prefix_match_is_case_insensitive_by_default():
+    assert matching(name_filter="alp") == ["alpha", "Alphabet"]
+    assert matching(name_filter="Alp", case_sensitive=True) == ["Alphabet"]
+
+
+def test_glob_match():
+    assert matching(name_filter="df_*", match="glob") == ["df_train", "df_test"]
+    assert matching(name_filter="*A", match="glob") == ["alpha", "beta", "gamma"]
+    assert matching(name_filter="*A", match="glob", case_sensitive=True) == []
+
+
+def test_regex_match_searches_anywhere():
+    assert matching(name_filter="t(rain|est)$", match="regex") == ["df_train", "df_test"]
+    assert matching(name_filter="BET", match="regex") == ["Alphabet", "beta"]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="regular expression"):
+        VariableQuery(name_filter="(", match="regex")
+    with pytest.raises(ValueError, match="match mode"):
+        VariableQuery(match="fuzzy")
+    with pytest.raises(ValueError, match="sort key"):
+        VariableQuery(sort_by="type")
+
+
+def test_kinds():
+    query = VariableQuery(kinds=["table", "map"])
+    assert query.matches_kind("table")
+    assert not query.matches_kind("number")
+    assert VariableQuery().matches_kind("number")
+
+
+def test_ties_keep_name_order():
+    sizes = {"a": 10, "b": 20, "c": 10, "d": 20}
+    names = ["d", "c", "b", "a"]
+    assert VariableQuery(sort_by="size").order(names, sizes.__getitem__) == ["a", "c", "b", "d"]
+    # Descending reverses both the key and the name order within ties
+    descending = VariableQuery(sort_by="size", descending=True)
+    assert descending.order(names, sizes.__getitem__) == ["d", "b", "c", "a"]
+
+    updated = {"b": 5, "d": 5}
+    query = VariableQuery(sort_by="updated_time", descending=True)
+    assert query.order(names, lambda name: updated.get(name, 0)) == ["d", "b", "c", "a"]
+
+
+def test_page_past_the_end():
+    names = ["a", "b", "c"]
+    assert VariableQuery(start=2, limit=5).page(names) == ["c"]
+    assert VariableQuery(start=3).page(names) == []
+    assert VariableQuery(start=10, limit=2).page(names) == []
+    assert VariableQuery(limit=0).page(names) == []
+
+
+def test_from_params():
+    assert VariableQuery.from_params({}) is None
+    assert VariableQuery.from_params({"method": "list"}) is None
+    query = VariableQuery.from_params({"filter": "df", "start": 1, "limit": 1})
+    assert query.page([name for name in NAMES if query.matches_name(name)]) == ["df_test"]